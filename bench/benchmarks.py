@@ -176,6 +176,33 @@ def concurrency():
     return results
 
 
+def steal_batch():
+    results = {'1m': [], 'net_sock': []}
+    threads = min(CPU, 8)
+    for label, impl in [('TonIO yield', 'tonio_yi'), ('TonIO async', 'tonio_aw')]:
+        for batch in [1, 8, 32]:
+            extras = {'threads': str(threads), 'steal_batch': str(batch)}
+            res = script_benchmark('1m', impl, **extras)
+            results['1m'].append((label, batch, filter_script_results(res, 2, -1)))
+
+            with net_server(impl, **extras):
+                res = net_benchmark(concurrencies=[NET_SCALE_CONCURRENCY])
+            results['net_sock'].append((label, batch, res))
+
+    return results
+
+
+def worker_spin():
+    results = []
+    threads = min(CPU, 8)
+    for label, impl in [('TonIO yield', 'tonio_yi'), ('TonIO async', 'tonio_aw')]:
+        for spin in [0, 16, 128]:
+            with net_server(impl, threads=str(threads), worker_spin=str(spin)):
+                res = net_benchmark(concurrencies=[NET_SCALE_CONCURRENCY])
+            results.append((label, spin, res))
+    return results
+
+
 def _tonio_version():
     import tonio
 
@@ -187,6 +214,8 @@ def run():
         '1m': one_million,
         'net_sock': net_sock,
         'concurrency': concurrency,
+        'steal_batch': steal_batch,
+        'worker_spin': worker_spin,
     }
 
     inp_benchmarks = sys.argv[1:] or ['1m']
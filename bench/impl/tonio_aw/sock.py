@@ -36,13 +36,13 @@ async def echo_client(conn):
             await _send_all(conn, data)
 
 
-def main(addr, threads, context):
+def main(addr, threads, context, steal_batch, worker_spin):
     addr = args.addr.split(':')
     addr[1] = int(addr[1])
     addr = tuple(addr)
 
     try:
-        tonio.run(echo_server(addr), context=context, threads=threads)
+        tonio.run(echo_server(addr), context=context, threads=threads, steal_batch=steal_batch, worker_spin=worker_spin)
     except Exception:
         pass
 
@@ -52,5 +52,7 @@ if __name__ == '__main__':
     parser.add_argument('--addr', default='127.0.0.1:25000', type=str)
     parser.add_argument('--threads', default=1, type=int, help='no of threads')
     parser.add_argument('--context', default=False, type=bool, help='use context')
+    parser.add_argument('--steal_batch', default=32, type=int, help='max tasks stolen at once')
+    parser.add_argument('--worker_spin', default=0, type=int, help='max idle scans before parking')
     args = parser.parse_args()
     main(**dict(parser.parse_args()._get_kwargs()))
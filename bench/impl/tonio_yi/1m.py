@@ -19,9 +19,9 @@ def _run():
     return (t1 - t0, t2 - t1, t2 - t0)
 
 
-def main(threads, context):
+def main(threads, context, steal_batch):
     res = []
-    runtime = tonio.runtime(context=context, threads=threads)
+    runtime = tonio.runtime(context=context, threads=threads, steal_batch=steal_batch)
     for _ in range(5):
         r = runtime.run_until_complete(_run())
         res.append(r)
@@ -32,4 +32,5 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument('--threads', default=1, type=int, help='no of threads')
     parser.add_argument('--context', default=False, type=bool, help='use context')
+    parser.add_argument('--steal_batch', default=32, type=int, help='max tasks stolen at once')
     main(**dict(parser.parse_args()._get_kwargs()))
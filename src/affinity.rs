@@ -0,0 +1,75 @@
+//: CPU pinning and NUMA topology helpers.
+//  On platforms other than Linux pinning is a no-op and every CPU is reported on node 0.
+
+#[cfg(target_os = "linux")]
+#[allow(clippy::cast_sign_loss)]
+const MAX_CPUS: usize = libc::CPU_SETSIZE as usize;
+
+//: pin the calling thread to the given CPU set
+#[cfg(target_os = "linux")]
+pub(crate) fn pin_current(cpus: &[usize]) -> std::io::Result<()> {
+    let ret = unsafe {
+        let mut set: libc::cpu_set_t = std::mem::zeroed();
+        libc::CPU_ZERO(&mut set);
+        for &cpu in cpus.iter().filter(|&&cpu| cpu < MAX_CPUS) {
+            libc::CPU_SET(cpu, &mut set);
+        }
+        libc::sched_setaffinity(0, std::mem::size_of::<libc::cpu_set_t>(), &raw const set)
+    };
+    if ret != 0 {
+        return Err(std::io::Error::last_os_error());
+    }
+    Ok(())
+}
+
+#[cfg(not(target_os = "linux"))]
+pub(crate) fn pin_current(_cpus: &[usize]) -> std::io::Result<()> {
+    Ok(())
+}
+
+//: the CPU set the calling thread is allowed to run on, if known
+#[cfg(target_os = "linux")]
+pub(crate) fn current_cpus() -> Option<Vec<usize>> {
+    unsafe {
+        let mut set: libc::cpu_set_t = std::mem::zeroed();
+        if libc::sched_getaffinity(0, std::mem::size_of::<libc::cpu_set_t>(), &raw mut set) != 0 {
+            return None;
+        }
+        Some((0..MAX_CPUS).filter(|&cpu| libc::CPU_ISSET(cpu, &set)).collect())
+    }
+}
+
+#[cfg(not(target_os = "linux"))]
+pub(crate) fn current_cpus() -> Option<Vec<usize>> {
+    None
+}
+
+#[cfg(target_os = "linux")]
+fn cpu_node(cpu: usize) -> usize {
+    //: sysfs exposes a `nodeN` link in the CPU directory on NUMA-enabled kernels
+    let Ok(entries) = std::fs::read_dir(format!("/sys/devices/system/cpu/cpu{cpu}")) else {
+        return 0;
+    };
+    entries
+        .flatten()
+        .find_map(|entry| entry.file_name().to_str()?.strip_prefix("node")?.parse().ok())
+        .unwrap_or(0)
+}
+
+#[cfg(not(target_os = "linux"))]
+fn cpu_node(_cpu: usize) -> usize {
+    0
+}
+
+//: per-worker order to visit siblings when stealing: workers pinned to the same NUMA node
+//  come first, then the others; index order is preserved within each group.
+pub(crate) fn steal_order(cpus: &[Option<usize>]) -> Vec<Vec<usize>> {
+    let nodes: Vec<Option<usize>> = cpus.iter().map(|cpu| cpu.map(cpu_node)).collect();
+    (0..cpus.len())
+        .map(|idx| {
+            let mut order: Vec<usize> = (0..cpus.len()).filter(|&sibling| sibling != idx).collect();
+            order.sort_by_key(|&sibling| nodes[sibling] != nodes[idx]);
+            order
+        })
+        .collect()
+}
@@ -236,6 +236,43 @@ impl BlockingRunnerPool {
     }
 }
 
+//: a blocking threads pool isolated from the runtime one, eg: to run CPU-heavy work
+//  without contending threads with the rest of blocking tasks.
+//  NOTE: tasks run without the caller context.
+#[pyclass(frozen, module = "tonio._tonio")]
+pub(crate) struct BlockingExecutor {
+    pool: BlockingRunnerPool,
+}
+
+#[pymethods]
+impl BlockingExecutor {
+    #[new]
+    #[pyo3(signature = (max_threads, idle_timeout=30))]
+    fn new(max_threads: usize, idle_timeout: u64) -> PyResult<Self> {
+        if max_threads == 0 {
+            return Err(pyo3::exceptions::PyValueError::new_err("max_threads must be positive"));
+        }
+        Ok(Self {
+            pool: BlockingRunnerPool::new(max_threads, idle_timeout),
+        })
+    }
+
+    #[pyo3(signature = (f, *args, **kwargs))]
+    fn _spawn(
+        &self,
+        py: Python,
+        f: Py<PyAny>,
+        args: Py<PyAny>,
+        kwargs: Option<Py<PyAny>>,
+    ) -> PyResult<(Py<BlockingTaskCtl>, Py<Event>, Py<ResultHolder>)> {
+        let (task, ctl, event, rh) = BlockingTask::new(py, f, args, kwargs, None);
+        self.pool
+            .run(task)
+            .map_err(|e| pyo3::exceptions::PyRuntimeError::new_err(e.to_string()))?;
+        Ok((ctl, event, rh))
+    }
+}
+
 fn blocking_worker(
     queue: channel::Receiver<BlockingTask>,
     timeout: time::Duration,
@@ -270,6 +307,7 @@ fn blocking_worker(
 }
 
 pub(crate) fn init_pymodule(module: &Bound<PyModule>) -> PyResult<()> {
+    module.add_class::<BlockingExecutor>()?;
     module.add_class::<BlockingTaskCtl>()?;
 
     Ok(())
@@ -8,7 +8,8 @@ use crate::{
     errors::abort,
     handles::{self, BoxedHandle, Handle},
     runtime::Runtime,
-    time::Timer,
+    time::TimerKey,
+    work::coop_consume,
 };
 
 #[pyclass(frozen, subclass, module = "tonio._tonio")]
@@ -46,6 +47,15 @@ impl Event {
         self.dirty.store(true, atomic::Ordering::Relaxed);
     }
 
+    //: an already set event, used to force a suspension point
+    pub(crate) fn ready() -> Self {
+        Self {
+            flag: true.into(),
+            dirty: false.into(),
+            watchers: Mutex::new(VecDeque::new()),
+        }
+    }
+
     #[inline]
     fn rem_stale_wakers(&self) {
         let mut guard = self.watchers.lock().unwrap();
@@ -103,13 +113,17 @@ impl Event {
         if rself.dirty.load(atomic::Ordering::Relaxed) {
             rself.rem_stale_wakers();
         }
+        //: waiting on a set event is a ready operation: it resumes immediately while within budget
+        if rself.flag.load(atomic::Ordering::Acquire) {
+            coop_consume();
+        }
         Waiter::from_event(py, pyself, timeout)
     }
 }
 
 impl Handle for Py<Event> {
     #[inline]
-    fn run(self: Box<Self>, py: Python, _runtime: &Py<Runtime>, _state: &mut crate::work::WorkerState) {
+    fn run(self: Box<Self>, py: Python, _runtime: &Py<Runtime>) {
         self.get().set(py);
     }
 }
@@ -166,12 +180,9 @@ impl Waiter {
             event.get().add_waker(py, waker);
         }
         if let Some(timeout) = self.timeout {
-            let when = runtime.get()._get_clock() + (timeout as u128);
-            let timer = Timer {
-                when,
-                target: suspension.clone(),
-            };
-            runtime.get().add_timer(timer);
+            let rt = runtime.get();
+            let key = rt.add_timer(timeout as u64, suspension.clone());
+            suspension.arm_timer(rt, key);
         }
     }
 
@@ -477,6 +488,29 @@ impl Suspension {
         }
     }
 
+    //: store the timer key on the suspension, so it can be cancelled on resume.
+    //  If the suspension was consumed meanwhile, we cancel it here.
+    fn arm_timer(&self, runtime: &Runtime, key: TimerKey) {
+        let timer = match self {
+            Self::Gen(inner) => &inner.timer,
+            Self::AsyncGen(inner) => &inner.timer,
+        };
+        timer.swap(key, atomic::Ordering::AcqRel);
+        if self.is_dead() {
+            match self {
+                Self::Gen(inner) => inner.disarm_timer(runtime),
+                Self::AsyncGen(inner) => inner.disarm_timer(runtime),
+            }
+        }
+    }
+
+    pub(crate) fn clear_timer(&self) {
+        match self {
+            Self::Gen(inner) => inner.timer.store(0, atomic::Ordering::Release),
+            Self::AsyncGen(inner) => inner.timer.store(0, atomic::Ordering::Release),
+        }
+    }
+
     fn is_dead(&self) -> bool {
         match self {
             Self::Gen(inner) => inner.consumed.load(atomic::Ordering::Acquire),
@@ -505,6 +539,7 @@ pub(crate) struct PyGenSuspension {
     is_checkpoint: bool,
     sentinel: Option<Sentinel>,
     checkpoint: Option<Arc<Py<Waiter>>>,
+    timer: atomic::AtomicU64,
 }
 
 impl PyGenSuspension {
@@ -521,6 +556,7 @@ impl PyGenSuspension {
             is_checkpoint: false,
             sentinel,
             checkpoint,
+            timer: 0.into(),
         }
     }
 
@@ -549,6 +585,7 @@ impl PyGenSuspension {
             is_checkpoint: false,
             sentinel: None,
             checkpoint,
+            timer: 0.into(),
         }
     }
 
@@ -572,6 +609,7 @@ impl PyGenSuspension {
             is_checkpoint: true,
             sentinel: None,
             checkpoint: Some(checkpoint),
+            timer: 0.into(),
         };
         Self {
             parent: Some((Arc::new(new_parent), parent_idx)),
@@ -580,6 +618,7 @@ impl PyGenSuspension {
             is_checkpoint: false,
             sentinel: None,
             checkpoint: None,
+            timer: 0.into(),
         }
     }
 
@@ -648,10 +687,19 @@ impl PyGenSuspension {
         }
     }
 
+    #[inline]
+    fn disarm_timer(&self, runtime: &Runtime) {
+        let key = self.timer.swap(0, atomic::Ordering::AcqRel);
+        if key != 0 {
+            runtime.cancel_timer(key);
+        }
+    }
+
     pub fn resume(&self, py: Python, runtime: &Runtime, value: Py<PyAny>, order: usize) {
         if let Some(sentinel) = &self.sentinel {
             if let Some(composed_value) = sentinel.decrement(py, (order, value)) {
                 // println!("suspension resume call SENTINEL {:?}", composed_value.bind(py));
+                self.disarm_timer(runtime);
                 runtime.add_handle(self.to_handle(py, composed_value));
             }
             return;
@@ -661,6 +709,7 @@ impl PyGenSuspension {
             .compare_exchange(false, true, atomic::Ordering::Relaxed, atomic::Ordering::Relaxed)
             .is_ok()
         {
+            self.disarm_timer(runtime);
             runtime.add_handle(self.to_handle(py, value));
         }
     }
@@ -669,6 +718,7 @@ impl PyGenSuspension {
         // println!("GENSUSP ERR {:?} {:?}", self.target, self.consumed);
         if let Some(sentinel) = &self.sentinel {
             if sentinel.consume() {
+                self.disarm_timer(runtime);
                 runtime.add_handle(self.to_throw_handle(py, value));
             }
             return;
@@ -678,6 +728,7 @@ impl PyGenSuspension {
             .compare_exchange(false, true, atomic::Ordering::Relaxed, atomic::Ordering::Relaxed)
             .is_ok()
         {
+            self.disarm_timer(runtime);
             runtime.add_handle(self.to_throw_handle(py, value));
         }
     }
@@ -698,6 +749,7 @@ pub(crate) struct PyAsyncGenSuspension {
     sentinel: Option<Sentinel>,
     aborted: Arc<atomic::AtomicBool>,
     checkpoint: Option<Arc<Py<Waiter>>>,
+    timer: atomic::AtomicU64,
 }
 
 impl PyAsyncGenSuspension {
@@ -713,6 +765,7 @@ impl PyAsyncGenSuspension {
             sentinel,
             aborted,
             checkpoint,
+            timer: 0.into(),
         }
     }
 
@@ -771,12 +824,21 @@ impl PyAsyncGenSuspension {
         }
     }
 
+    #[inline]
+    fn disarm_timer(&self, runtime: &Runtime) {
+        let key = self.timer.swap(0, atomic::Ordering::AcqRel);
+        if key != 0 {
+            runtime.cancel_timer(key);
+        }
+    }
+
     pub fn resume(&self, py: Python, runtime: &Runtime, value: Py<PyAny>, order: usize) {
         if self.aborted.load(atomic::Ordering::Acquire) {
             return;
         }
         if let Some(sentinel) = &self.sentinel {
             if let Some(composed_value) = sentinel.decrement(py, (order, value)) {
+                self.disarm_timer(runtime);
                 runtime.add_handle(self.to_handle(py, composed_value));
             }
             return;
@@ -786,6 +848,7 @@ impl PyAsyncGenSuspension {
             .compare_exchange(false, true, atomic::Ordering::Relaxed, atomic::Ordering::Relaxed)
             .is_ok()
         {
+            self.disarm_timer(runtime);
             runtime.add_handle(self.to_handle(py, value));
         }
     }
@@ -794,6 +857,7 @@ impl PyAsyncGenSuspension {
         // println!("AGENSUSP ERR {:?} {:?}", self.target, self.consumed);
         if let Some(sentinel) = &self.sentinel {
             if sentinel.consume() {
+                self.disarm_timer(runtime);
                 runtime.add_handle(self.to_throw_handle(py, value));
             }
             return;
@@ -803,6 +867,7 @@ impl PyAsyncGenSuspension {
             .compare_exchange(false, true, atomic::Ordering::Relaxed, atomic::Ordering::Relaxed)
             .is_ok()
         {
+            self.disarm_timer(runtime);
             runtime.add_handle(self.to_throw_handle(py, value));
         }
     }
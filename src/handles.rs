@@ -4,11 +4,10 @@ use std::sync::Arc;
 use crate::{
     events::{PyGenSuspension, PyGenSuspensionData, SuspensionTarget, Waiter},
     runtime::Runtime,
-    work::WorkerState,
 };
 
 pub trait Handle {
-    fn run(self: Box<Self>, py: Python, runtime: &Py<Runtime>, state: &mut WorkerState);
+    fn run(self: Box<Self>, py: Python, runtime: &Py<Runtime>);
 }
 
 pub(crate) type BoxedHandle = Box<dyn Handle + Send>;
@@ -92,7 +91,7 @@ impl PyGenHandle {
 }
 
 impl Handle for PyGenHandle {
-    fn run(self: Box<Self>, py: Python, runtime: &Py<Runtime>, _state: &mut WorkerState) {
+    fn run(self: Box<Self>, py: Python, runtime: &Py<Runtime>) {
         self.call(py, runtime);
     }
 }
@@ -183,7 +182,7 @@ impl PyGenCtxHandle {
 }
 
 impl Handle for PyGenCtxHandle {
-    fn run(self: Box<Self>, py: Python, runtime: &Py<Runtime>, _state: &mut WorkerState) {
+    fn run(self: Box<Self>, py: Python, runtime: &Py<Runtime>) {
         self.call(py, runtime);
     }
 }
@@ -252,7 +251,7 @@ impl PyAsyncGenHandle {
 }
 
 impl Handle for PyAsyncGenHandle {
-    fn run(self: Box<Self>, py: Python, runtime: &Py<Runtime>, _state: &mut WorkerState) {
+    fn run(self: Box<Self>, py: Python, runtime: &Py<Runtime>) {
         self.call(py, runtime);
     }
 }
@@ -327,7 +326,7 @@ impl PyAsyncGenCtxHandle {
 }
 
 impl Handle for PyAsyncGenCtxHandle {
-    fn run(self: Box<Self>, py: Python, runtime: &Py<Runtime>, _state: &mut WorkerState) {
+    fn run(self: Box<Self>, py: Python, runtime: &Py<Runtime>) {
         self.call(py, runtime);
     }
 }
@@ -339,7 +338,7 @@ pub(crate) struct PyGenThrower {
 }
 
 impl Handle for PyGenThrower {
-    fn run(self: Box<Self>, py: Python, runtime: &Py<Runtime>, _state: &mut WorkerState) {
+    fn run(self: Box<Self>, py: Python, runtime: &Py<Runtime>) {
         let throw_method = pyo3::intern!(py, "throw");
 
         unsafe {
@@ -408,7 +407,7 @@ pub(crate) struct PyGenCtxThrower {
 }
 
 impl Handle for PyGenCtxThrower {
-    fn run(self: Box<Self>, py: Python, runtime: &Py<Runtime>, _state: &mut WorkerState) {
+    fn run(self: Box<Self>, py: Python, runtime: &Py<Runtime>) {
         let throw_method = pyo3::intern!(py, "throw");
         let ctx = self.ctx.as_ptr();
 
@@ -486,7 +485,7 @@ pub(crate) struct PyAsyncGenThrower {
 }
 
 impl Handle for PyAsyncGenThrower {
-    fn run(self: Box<Self>, py: Python, _runtime: &Py<Runtime>, _state: &mut WorkerState) {
+    fn run(self: Box<Self>, py: Python, _runtime: &Py<Runtime>) {
         let throw_method = pyo3::intern!(py, "throw");
 
         unsafe {
@@ -510,7 +509,7 @@ pub(crate) struct PyAsyncGenCtxThrower {
 }
 
 impl Handle for PyAsyncGenCtxThrower {
-    fn run(self: Box<Self>, py: Python, _runtime: &Py<Runtime>, _state: &mut WorkerState) {
+    fn run(self: Box<Self>, py: Python, _runtime: &Py<Runtime>) {
         let throw_method = pyo3::intern!(py, "throw");
         let ctx = self.ctx.as_ptr();
 
@@ -0,0 +1,108 @@
+use std::sync::{Arc, Mutex, atomic};
+
+use mio::{Events, Poll, Registry, Token, Waker};
+use pyo3::prelude::*;
+
+use super::{TOKEN_WAKER, schedule::ScheduledIO};
+use crate::runtime::Runtime;
+
+//: a dedicated I/O driver, owning a `mio::Poll` on its own thread.
+//  Registrations are sharded across drivers by the worker registering them,
+//  so readiness dispatch doesn't bottleneck on the runtime main thread.
+pub(crate) struct IODriver {
+    pub registry: Registry,
+    waker: Waker,
+    stopping: atomic::AtomicBool,
+    pending_release: Mutex<Vec<Arc<ScheduledIO>>>,
+    needs_release: atomic::AtomicBool,
+}
+
+impl IODriver {
+    pub fn new() -> std::io::Result<(Self, Poll)> {
+        let poll = Poll::new()?;
+        let waker = Waker::new(poll.registry(), Token(TOKEN_WAKER))?;
+        let registry = poll.registry().try_clone()?;
+        let driver = Self {
+            registry,
+            waker,
+            stopping: atomic::AtomicBool::new(false),
+            pending_release: Mutex::new(Vec::new()),
+            needs_release: atomic::AtomicBool::new(false),
+        };
+        Ok((driver, poll))
+    }
+
+    //: park a deregistered entry until the driver is done with its current poll batch
+    pub fn release(&self, io: Arc<ScheduledIO>) {
+        self.pending_release.lock().unwrap().push(io);
+        self.needs_release.store(true, atomic::Ordering::Release);
+    }
+
+    //: must be called only once the driver thread exited
+    pub fn clear(&self) {
+        self.needs_release.store(false, atomic::Ordering::Release);
+        self.pending_release.lock().unwrap().clear();
+    }
+
+    pub fn stop(&self) {
+        self.stopping.store(true, atomic::Ordering::Release);
+        _ = self.waker.wake();
+    }
+}
+
+//: pick the driver for a new registration: the one paired with the current worker if any,
+//  so that sockets accepted by a worker are polled by its own driver.
+#[inline(always)]
+pub(crate) fn driver_for(fd: i32, drivers: usize) -> usize {
+    let idx = crate::work::LOCAL_WORKER_IDX.with(std::cell::Cell::get);
+    if idx != usize::MAX {
+        return idx % drivers;
+    }
+    fd.unsigned_abs() as usize % drivers
+}
+
+pub(crate) fn driver_loop(
+    runtime: Py<Runtime>,
+    drivers: Arc<Vec<IODriver>>,
+    idx: usize,
+    cpu: Option<usize>,
+    mut poll: Poll,
+) {
+    if let Some(cpu) = cpu {
+        _ = crate::affinity::pin_current(&[cpu]);
+    }
+    let mut events = Events::with_capacity(1024);
+
+    Python::attach(|py| {
+        let rself = runtime.get();
+        let driver = &drivers[idx];
+
+        loop {
+            //: release deregistered entries
+            //  NOTE: same as the main poll loop, this runs strictly between poll batches
+            //        of the driver owning the registrations
+            if driver.needs_release.swap(false, atomic::Ordering::Acquire) {
+                driver.pending_release.lock().unwrap().clear();
+            }
+            if driver.stopping.load(atomic::Ordering::Acquire) {
+                break;
+            }
+
+            if let Err(err) = py.detach(|| poll.poll(&mut events, None)) {
+                if err.kind() == std::io::ErrorKind::Interrupted {
+                    continue;
+                }
+                break;
+            }
+
+            for event in &events {
+                match event.token().0 {
+                    TOKEN_WAKER => {}
+                    token => rself.io_dispatch(token, event),
+                }
+            }
+        }
+
+        drop(runtime);
+    });
+}
@@ -1,3 +1,4 @@
+pub(crate) mod driver;
 mod py;
 pub(crate) mod schedule;
 pub(crate) mod source;
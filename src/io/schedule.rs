@@ -1,8 +1,12 @@
-use std::sync::{Mutex, atomic};
+use std::{
+    cell::Cell,
+    sync::{Mutex, atomic},
+};
 
 use pyo3::prelude::*;
 
 use crate::events::{Event, Waiter};
+use crate::work::{LOCAL_WORKER_IDX, coop_consume};
 
 //: readiness word layout: | tick: 8 bits | shutdown: 1 bit | readiness: 5 bits |
 const READABLE: usize = 0b00_0001;
@@ -40,16 +44,21 @@ pub(crate) struct ScheduledIO {
     tick_r: atomic::AtomicU8,
     tick_w: atomic::AtomicU8,
     waiters: Mutex<Waiters>,
+    owner: atomic::AtomicUsize,
+    //: index of the I/O driver polling the fd, `usize::MAX` for the runtime main thread
+    pub(crate) driver: usize,
 }
 
 impl ScheduledIO {
-    pub(crate) fn new(fd: i32) -> Self {
+    pub(crate) fn new(fd: i32, driver: usize) -> Self {
         Self {
             fd,
             readiness: atomic::AtomicUsize::new(0),
             tick_r: atomic::AtomicU8::new(0),
             tick_w: atomic::AtomicU8::new(0),
             waiters: Mutex::new(Waiters::default()),
+            owner: atomic::AtomicUsize::new(usize::MAX),
+            driver,
         }
     }
 
@@ -58,10 +67,25 @@ impl ScheduledIO {
         tick_of(self.readiness.load(atomic::Ordering::Acquire))
     }
 
+    //: track the worker polling the resource, so wakeups can be routed back to it
+    #[inline(always)]
+    fn track_owner(&self) {
+        let idx = LOCAL_WORKER_IDX.with(Cell::get);
+        if idx != usize::MAX && self.owner.load(atomic::Ordering::Relaxed) != idx {
+            self.owner.store(idx, atomic::Ordering::Relaxed);
+        }
+    }
+
     #[inline]
     fn arm(&self, py: Python, mask: usize) -> PyResult<Option<Py<Event>>> {
+        self.track_owner();
         if self.readiness.load(atomic::Ordering::Acquire) & (mask | SHUTDOWN) != 0 {
-            return Ok(None);
+            if coop_consume() {
+                return Ok(None);
+            }
+            //: out of budget: hand out an already set event, so the caller suspends
+            //  and re-arms once rescheduled
+            return Ok(Some(Py::new(py, Event::ready())?));
         }
         let event = Py::new(py, Event::new())?;
         {
@@ -112,6 +136,16 @@ impl ScheduledIO {
     }
 
     // runtime API
+    #[inline(always)]
+    pub(crate) fn is_shutdown(&self) -> bool {
+        self.readiness.load(atomic::Ordering::Acquire) & SHUTDOWN != 0
+    }
+
+    #[inline(always)]
+    pub(crate) fn owner(&self) -> usize {
+        self.owner.load(atomic::Ordering::Relaxed)
+    }
+
     //: must be called before `wake` for the `arm` re-check to be sound
     pub(crate) fn set_readiness(&self, ready: usize) {
         _ = self
@@ -9,6 +9,7 @@ static GLOBAL: mimalloc::MiMalloc = mimalloc::MiMalloc;
 use pyo3::prelude::*;
 use std::sync::OnceLock;
 
+mod affinity;
 mod blocking;
 mod errors;
 mod events;
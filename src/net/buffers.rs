@@ -0,0 +1,168 @@
+use std::{
+    cell::Cell,
+    os::raw::c_int,
+    sync::{Arc, Mutex, atomic},
+};
+
+use crossbeam_utils::CachePadded;
+use pyo3::{
+    exceptions::{PyBufferError, PyValueError},
+    ffi,
+    prelude::*,
+};
+
+use crate::work::LOCAL_WORKER_IDX;
+
+//: fixed-size slabs free lists, sharded by worker
+pub(crate) struct Slabs {
+    shards: Box<[CachePadded<Mutex<Vec<Box<[u8]>>>>]>,
+    size: usize,
+    max_free: usize,
+}
+
+impl Slabs {
+    fn new(shards: usize, size: usize, max_free: usize) -> Self {
+        let shards = (0..shards.max(1))
+            .map(|_| CachePadded::new(Mutex::new(Vec::new())))
+            .collect();
+        Self { shards, size, max_free }
+    }
+
+    #[inline(always)]
+    fn local_shard(&self) -> &Mutex<Vec<Box<[u8]>>> {
+        let idx = LOCAL_WORKER_IDX.with(Cell::get);
+        &self.shards[if idx < self.shards.len() { idx } else { 0 }]
+    }
+
+    //: pop a slab from the local free list, allocating a new one when empty
+    pub fn take(&self) -> Box<[u8]> {
+        if let Some(slab) = self.local_shard().lock().unwrap().pop() {
+            return slab;
+        }
+        vec![0; self.size].into_boxed_slice()
+    }
+
+    //: push back a slab to the local free list, dropping it when the list is full
+    pub fn give(&self, slab: Box<[u8]>) {
+        let mut free = self.local_shard().lock().unwrap();
+        if free.len() < self.max_free {
+            free.push(slab);
+        }
+    }
+}
+
+//: a pool of fixed-size read buffers, lent as `BufferLease` objects.
+//  Free slabs are kept in per-worker lists, so that steady-state receives don't allocate.
+#[pyclass(frozen, module = "tonio._tonio")]
+pub(crate) struct BufferPool {
+    pub slabs: Arc<Slabs>,
+}
+
+impl BufferPool {
+    pub fn lease(&self, slab: Box<[u8]>, len: usize) -> BufferLease {
+        BufferLease {
+            slabs: self.slabs.clone(),
+            slab: Mutex::new(Some(slab)),
+            len: len.into(),
+            exports: 0.into(),
+        }
+    }
+}
+
+#[pymethods]
+impl BufferPool {
+    #[new]
+    #[pyo3(signature = (slab_size=65536, max_free=256))]
+    fn new(py: Python, slab_size: usize, max_free: usize) -> PyResult<Self> {
+        if slab_size == 0 {
+            return Err(PyValueError::new_err("slab_size must be positive"));
+        }
+        let shards = crate::get_runtime(py).map_or(1, |runtime| runtime.get().workers());
+        Ok(Self {
+            slabs: Arc::new(Slabs::new(shards, slab_size, max_free)),
+        })
+    }
+
+    #[getter(slab_size)]
+    fn get_slab_size(&self) -> usize {
+        self.slabs.size
+    }
+
+    fn acquire(&self) -> BufferLease {
+        self.lease(self.slabs.take(), self.slabs.size)
+    }
+}
+
+//: a slab lent by a `BufferPool`, exposing its first `len` bytes through the buffer protocol.
+//  NOTE: slabs get back to the pool on `release`, or when the lease gets dropped.
+#[pyclass(frozen, module = "tonio._tonio")]
+pub(crate) struct BufferLease {
+    slabs: Arc<Slabs>,
+    slab: Mutex<Option<Box<[u8]>>>,
+    len: atomic::AtomicUsize,
+    exports: atomic::AtomicUsize,
+}
+
+#[pymethods]
+impl BufferLease {
+    unsafe fn __getbuffer__(slf: Bound<'_, Self>, view: *mut ffi::Py_buffer, flags: c_int) -> PyResult<()> {
+        let rself = slf.get();
+        let mut slab = rself.slab.lock().unwrap();
+        let Some(buf) = slab.as_mut() else {
+            return Err(PyBufferError::new_err("buffer lease already released"));
+        };
+        #[allow(clippy::cast_possible_wrap)]
+        let len = rself.len.load(atomic::Ordering::Acquire) as isize;
+        if unsafe { ffi::PyBuffer_FillInfo(view, slf.as_ptr(), buf.as_mut_ptr().cast(), len, 0, flags) } < 0 {
+            return Err(PyErr::fetch(slf.py()));
+        }
+        rself.exports.fetch_add(1, atomic::Ordering::Release);
+        Ok(())
+    }
+
+    unsafe fn __releasebuffer__(&self, _view: *mut ffi::Py_buffer) {
+        self.exports.fetch_sub(1, atomic::Ordering::Release);
+    }
+
+    fn __len__(&self) -> usize {
+        self.len.load(atomic::Ordering::Acquire)
+    }
+
+    //: shrink the exposed size, eg: after filling the slab from Python code.
+    //  NOTE: already exported buffers keep their size.
+    fn truncate(&self, nbytes: usize) -> PyResult<()> {
+        let slab = self.slab.lock().unwrap();
+        if slab.is_none() {
+            return Err(PyBufferError::new_err("buffer lease already released"));
+        }
+        self.len.fetch_min(nbytes, atomic::Ordering::Release);
+        Ok(())
+    }
+
+    fn release(&self) -> PyResult<()> {
+        let mut slab = self.slab.lock().unwrap();
+        if self.exports.load(atomic::Ordering::Acquire) > 0 {
+            return Err(PyBufferError::new_err("cannot release a lease with exported buffers"));
+        }
+        if let Some(buf) = slab.take() {
+            self.slabs.give(buf);
+        }
+        Ok(())
+    }
+
+    fn __enter__(slf: Py<Self>) -> Py<Self> {
+        slf
+    }
+
+    fn __exit__(&self, _exc_type: Bound<PyAny>, _exc_value: Bound<PyAny>, _exc_tb: Bound<PyAny>) -> PyResult<()> {
+        self.release()
+    }
+}
+
+impl Drop for BufferLease {
+    fn drop(&mut self) {
+        if let Some(buf) = self.slab.get_mut().unwrap().take() {
+            self.slabs.give(buf);
+        }
+    }
+}
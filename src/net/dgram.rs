@@ -0,0 +1,174 @@
+use std::net::{IpAddr, SocketAddr, SocketAddrV4, SocketAddrV6};
+
+use pyo3::{exceptions::PyValueError, prelude::*, types::PyTuple};
+use socket2::{SockAddr, SockAddrStorage};
+
+//: maximum number of datagrams per batch syscall
+pub(crate) const MMSG_MAX: usize = 64;
+
+//: a datagram to send: payload and optional destination
+pub(crate) struct OutMsg {
+    pub buf: *const u8,
+    pub len: usize,
+    pub addr: Option<SockAddr>,
+}
+
+//: Python representation of an IP socket address, matching the stdlib one
+pub(crate) fn sockaddr_into_py(py: Python, addr: &SockAddr) -> PyResult<Py<PyAny>> {
+    Ok(match addr.as_socket() {
+        Some(SocketAddr::V4(addr)) => (addr.ip().to_string(), addr.port())
+            .into_pyobject(py)?
+            .into_any()
+            .unbind(),
+        Some(SocketAddr::V6(addr)) => (addr.ip().to_string(), addr.port(), addr.flowinfo(), addr.scope_id())
+            .into_pyobject(py)?
+            .into_any()
+            .unbind(),
+        None => py.None(),
+    })
+}
+
+//: parse a numeric `(host, port[, flowinfo, scope_id])` address.
+//  NOTE: names are not resolved here, this runs on the hot path.
+pub(crate) fn sockaddr_from_py(addr: &Bound<PyAny>) -> PyResult<SockAddr> {
+    let addr = addr.cast::<PyTuple>()?;
+    let host: String = addr.get_item(0)?.extract()?;
+    let port: u16 = addr.get_item(1)?.extract()?;
+    let ip: IpAddr = host
+        .parse()
+        .map_err(|_| PyValueError::new_err(format!("invalid numeric address: {host}")))?;
+    Ok(match ip {
+        IpAddr::V4(ip) => SocketAddrV4::new(ip, port).into(),
+        IpAddr::V6(ip) => {
+            let flowinfo: u32 = match addr.len() {
+                len if len > 2 => addr.get_item(2)?.extract()?,
+                _ => 0,
+            };
+            let scope_id: u32 = match addr.len() {
+                len if len > 3 => addr.get_item(3)?.extract()?,
+                _ => 0,
+            };
+            SocketAddrV6::new(ip, port, flowinfo, scope_id).into()
+        }
+    })
+}
+
+//: receive up to `names.len()` datagrams, each into its own `slot` sized chunk of `buf`.
+//  Returns the number of datagrams received or -1 with `errno` set.
+#[cfg(any(target_os = "linux", target_os = "android"))]
+pub(crate) fn recv_batch(
+    fd: i32,
+    buf: *mut u8,
+    slot: usize,
+    names: &mut [SockAddrStorage],
+    lens: &mut [(usize, libc::socklen_t)],
+) -> isize {
+    let mut iovs: Vec<libc::iovec> = (0..names.len())
+        .map(|idx| libc::iovec {
+            iov_base: unsafe { buf.add(idx * slot) }.cast(),
+            iov_len: slot,
+        })
+        .collect();
+    let mut msgs: Vec<libc::mmsghdr> = names
+        .iter_mut()
+        .zip(iovs.iter_mut())
+        .map(|(name, iov)| {
+            let mut msg: libc::mmsghdr = unsafe { std::mem::zeroed() };
+            msg.msg_hdr.msg_namelen = name.size_of();
+            msg.msg_hdr.msg_name = (&raw mut *name).cast();
+            msg.msg_hdr.msg_iov = &raw mut *iov;
+            msg.msg_hdr.msg_iovlen = 1;
+            msg
+        })
+        .collect();
+
+    #[allow(clippy::cast_possible_truncation)]
+    let ret = unsafe { libc::recvmmsg(fd, msgs.as_mut_ptr(), msgs.len() as u32, 0, std::ptr::null_mut()) };
+    if ret < 0 {
+        return -1;
+    }
+    #[allow(clippy::cast_sign_loss)]
+    for (msg, len) in msgs.iter().zip(lens.iter_mut()).take(ret as usize) {
+        *len = (msg.msg_len as usize, msg.msg_hdr.msg_namelen);
+    }
+    ret as isize
+}
+
+//: `recvfrom` loop fallback, stopping at the first error
+#[cfg(not(any(target_os = "linux", target_os = "android")))]
+pub(crate) fn recv_batch(
+    fd: i32,
+    buf: *mut u8,
+    slot: usize,
+    names: &mut [SockAddrStorage],
+    lens: &mut [(usize, libc::socklen_t)],
+) -> isize {
+    let mut count = 0;
+    for (idx, (name, len)) in names.iter_mut().zip(lens.iter_mut()).enumerate() {
+        let mut namelen = name.size_of();
+        let ret = unsafe {
+            libc::recvfrom(
+                fd,
+                buf.add(idx * slot).cast(),
+                slot,
+                0,
+                (&raw mut *name).cast(),
+                &raw mut namelen,
+            )
+        };
+        if ret < 0 {
+            break;
+        }
+        *len = (ret.cast_unsigned(), namelen);
+        count += 1;
+    }
+    if count == 0 { -1 } else { count }
+}
+
+//: send the given datagrams, returning the number of datagrams sent or -1 with `errno` set
+#[cfg(any(target_os = "linux", target_os = "android"))]
+pub(crate) fn send_batch(fd: i32, out: &[OutMsg]) -> isize {
+    let mut iovs: Vec<libc::iovec> = out
+        .iter()
+        .map(|msg| libc::iovec {
+            iov_base: msg.buf.cast_mut().cast(),
+            iov_len: msg.len,
+        })
+        .collect();
+    let mut msgs: Vec<libc::mmsghdr> = out
+        .iter()
+        .zip(iovs.iter_mut())
+        .map(|(msg, iov)| {
+            let mut hdr: libc::mmsghdr = unsafe { std::mem::zeroed() };
+            if let Some(addr) = &msg.addr {
+                hdr.msg_hdr.msg_name = addr.as_ptr().cast_mut().cast();
+                hdr.msg_hdr.msg_namelen = addr.len();
+            }
+            hdr.msg_hdr.msg_iov = &raw mut *iov;
+            hdr.msg_hdr.msg_iovlen = 1;
+            hdr
+        })
+        .collect();
+
+    #[allow(clippy::cast_possible_truncation)]
+    let ret = unsafe { libc::sendmmsg(fd, msgs.as_mut_ptr(), msgs.len() as u32, 0) };
+    ret as isize
+}
+
+//: `sendto` loop fallback, stopping at the first error
+#[cfg(not(any(target_os = "linux", target_os = "android")))]
+pub(crate) fn send_batch(fd: i32, out: &[OutMsg]) -> isize {
+    let mut count = 0;
+    for msg in out {
+        let (name, namelen) = match &msg.addr {
+            Some(addr) => (addr.as_ptr().cast(), addr.len()),
+            None => (std::ptr::null(), 0),
+        };
+        let ret = unsafe { libc::sendto(fd, msg.buf.cast(), msg.len, 0, name, namelen) };
+        if ret < 0 {
+            break;
+        }
+        count += 1;
+    }
+    if count == 0 { -1 } else { count }
+}
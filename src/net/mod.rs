@@ -1,11 +1,22 @@
 use pyo3::prelude::*;
 
+mod buffers;
+mod dgram;
 mod socket;
 mod tls;
+#[cfg(feature = "rustls")]
+mod tls_rustls;
 
 pub(crate) fn init_pymodule(module: &Bound<PyModule>) -> PyResult<()> {
+    module.add_class::<buffers::BufferLease>()?;
+    module.add_class::<buffers::BufferPool>()?;
     module.add_class::<socket::Socket>()?;
     module.add_class::<tls::TLSStream>()?;
+    #[cfg(feature = "rustls")]
+    {
+        module.add_class::<tls_rustls::RustlsConfig>()?;
+        module.add_class::<tls_rustls::RustlsConnection>()?;
+    }
 
     Ok(())
 }
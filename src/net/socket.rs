@@ -1,18 +1,181 @@
 use std::sync::{Arc, atomic};
 
 use mio::Interest;
-use pyo3::prelude::*;
+use pyo3::{
+    buffer::PyBuffer,
+    exceptions::{PyTypeError, PyValueError},
+    prelude::*,
+    types::{PyBytes, PyList, PySequence},
+};
+use socket2::{SockAddr, SockAddrStorage};
 
-use crate::{events::Waiter, io::schedule::ScheduledIO};
+use super::buffers::BufferPool;
+use super::dgram::{MMSG_MAX, OutMsg, recv_batch, send_batch, sockaddr_from_py, sockaddr_into_py};
+use crate::{events::Waiter, io::schedule::ScheduledIO, work::with_read_buf};
+
+//: maximum number of buffers per gather write (`IOV_MAX` on both Linux and BSDs)
+const IOV_MAX: usize = 1024;
+
+//: outcome of a non-blocking syscall, with `EINTR` already retried
+pub(crate) enum IOResult<T> {
+    Ready(T),
+    Pending,
+}
+
+#[inline]
+pub(crate) fn syscall_result<T>(
+    io: &ScheduledIO,
+    mut f: impl FnMut() -> isize,
+    map: impl FnOnce(usize) -> T,
+) -> std::io::Result<IOResult<T>> {
+    //: the entry is shut down before the fd gets closed, so we never touch a recycled fd
+    if io.is_shutdown() {
+        return Err(std::io::Error::from_raw_os_error(libc::EBADF));
+    }
+    loop {
+        let ret = f();
+        if ret >= 0 {
+            return Ok(IOResult::Ready(map(ret.cast_unsigned())));
+        }
+        let err = std::io::Error::last_os_error();
+        match err.kind() {
+            std::io::ErrorKind::Interrupted => {}
+            std::io::ErrorKind::WouldBlock => return Ok(IOResult::Pending),
+            _ => return Err(err),
+        }
+    }
+}
+
+//: zero-copy file to socket transfer, returning the sent length or -1 with `errno` set
+#[cfg(any(target_os = "linux", target_os = "android"))]
+#[inline]
+fn sendfile(sock: i32, fd: i32, offset: u64, count: usize) -> isize {
+    #[allow(clippy::cast_possible_wrap)]
+    let mut off = offset as libc::off_t;
+    unsafe { libc::sendfile(sock, fd, &raw mut off, count) }
+}
+
+#[cfg(target_vendor = "apple")]
+#[inline]
+fn sendfile(sock: i32, fd: i32, offset: u64, count: usize) -> isize {
+    #[allow(clippy::cast_possible_wrap)]
+    let mut len = count as libc::off_t;
+    #[allow(clippy::cast_possible_wrap)]
+    let ret = unsafe { libc::sendfile(fd, sock, offset as libc::off_t, &raw mut len, std::ptr::null_mut(), 0) };
+    //: partial transfers fail with `EAGAIN` (or `EINTR`) but still report the sent length
+    if ret == 0 || len > 0 {
+        #[allow(clippy::cast_possible_truncation)]
+        return len as isize;
+    }
+    -1
+}
+
+//: accept a connection as a non-blocking, close-on-exec socket
+#[cfg(any(target_os = "linux", target_os = "android"))]
+#[inline]
+fn accept(fd: i32, addr: &mut SockAddrStorage, len: &mut libc::socklen_t) -> isize {
+    unsafe {
+        libc::accept4(
+            fd,
+            (&raw mut *addr).cast(),
+            len,
+            libc::SOCK_NONBLOCK | libc::SOCK_CLOEXEC,
+        ) as isize
+    }
+}
+
+#[cfg(not(any(target_os = "linux", target_os = "android")))]
+#[inline]
+fn accept(fd: i32, addr: &mut SockAddrStorage, len: &mut libc::socklen_t) -> isize {
+    let conn = unsafe { libc::accept(fd, (&raw mut *addr).cast(), len) };
+    if conn >= 0 {
+        unsafe {
+            libc::fcntl(conn, libc::F_SETFD, libc::FD_CLOEXEC);
+            libc::fcntl(conn, libc::F_SETFL, libc::fcntl(conn, libc::F_GETFL) | libc::O_NONBLOCK);
+        }
+    }
+    conn as isize
+}
+
+//: best-effort stream options, same as the ones set by `SocketStream`
+#[inline]
+fn set_stream_opts(fd: i32) {
+    let opts: &[(i32, i32)] = &[
+        (libc::TCP_NODELAY, 1),
+        #[cfg(any(target_os = "linux", target_os = "android"))]
+        (libc::TCP_NOTSENT_LOWAT, 16384),
+    ];
+    for &(opt, val) in opts {
+        #[allow(clippy::cast_possible_truncation)]
+        unsafe {
+            libc::setsockopt(
+                fd,
+                libc::IPPROTO_TCP,
+                opt,
+                (&raw const val).cast(),
+                std::mem::size_of::<i32>() as libc::socklen_t,
+            );
+        }
+    }
+}
+
+#[inline]
+pub(crate) fn writable_buffer(buffer: &Bound<PyAny>) -> PyResult<PyBuffer<u8>> {
+    let buf = PyBuffer::<u8>::get(buffer)?;
+    if buf.readonly() {
+        return Err(PyTypeError::new_err("buffer is read-only"));
+    }
+    if !buf.is_c_contiguous() {
+        return Err(PyTypeError::new_err("buffer is not contiguous"));
+    }
+    Ok(buf)
+}
+
+#[inline]
+pub(crate) fn readable_buffer(buffer: &Bound<PyAny>) -> PyResult<PyBuffer<u8>> {
+    let buf = PyBuffer::<u8>::get(buffer)?;
+    if !buf.is_c_contiguous() {
+        return Err(PyTypeError::new_err("buffer is not contiguous"));
+    }
+    Ok(buf)
+}
 
 #[pyclass(frozen, subclass, module = "tonio._tonio")]
 pub(crate) struct Socket {
-    io: Arc<ScheduledIO>,
+    pub(crate) io: Arc<ScheduledIO>,
     #[pyo3(get)]
     _sock: Py<PyAny>,
     _eof: atomic::AtomicBool,
 }
 
+impl Socket {
+    //: `recv` into a raw buffer, returning a waiter if the socket is not readable
+    #[inline]
+    fn recv_raw<T>(
+        &self,
+        py: Python,
+        buf: *mut u8,
+        len: usize,
+        flags: i32,
+        map: impl Fn(usize) -> T,
+    ) -> PyResult<Result<T, Py<Waiter>>> {
+        loop {
+            if let Some(waiter) = self.io.arm_r(py, None)? {
+                return Ok(Err(waiter));
+            }
+            let ret = syscall_result(
+                &self.io,
+                || unsafe { libc::recv(self.io.fd, buf.cast(), len, flags) },
+                &map,
+            )?;
+            match ret {
+                IOResult::Ready(val) => return Ok(Ok(val)),
+                IOResult::Pending => self.io.clear_r(),
+            }
+        }
+    }
+}
+
 #[pymethods]
 impl Socket {
     #[new]
@@ -64,4 +227,372 @@ impl Socket {
             runtime.get().io_deregister(&self.io);
         }
     }
+
+    //: receive through the worker read buffer, materializing `bytes` of the received size only.
+    //  Returns a `Waiter` to suspend on when the socket is not readable.
+    #[pyo3(signature = (bufsize, flags=0))]
+    fn _recv(&self, py: Python, bufsize: usize, flags: i32) -> PyResult<Py<PyAny>> {
+        let ret = with_read_buf(bufsize, |buf| {
+            let ptr = buf.as_mut_ptr();
+            self.recv_raw(py, ptr, buf.len(), flags, |len| {
+                PyBytes::new(py, unsafe { std::slice::from_raw_parts(ptr, len) })
+                    .into_any()
+                    .unbind()
+            })
+        })?;
+        Ok(match ret {
+            Ok(data) => data,
+            Err(waiter) => waiter.into_any(),
+        })
+    }
+
+    //: receive into a slab taken from `pool`, returning a `BufferLease` over the received data.
+    //  Returns a `Waiter` to suspend on when the socket is not readable, with the slab given back.
+    #[pyo3(signature = (pool, flags=0))]
+    fn _recv_pooled(&self, py: Python, pool: &Bound<BufferPool>, flags: i32) -> PyResult<Py<PyAny>> {
+        let pool = pool.get();
+        let mut slab = pool.slabs.take();
+        let ret = self.recv_raw(py, slab.as_mut_ptr(), slab.len(), flags, |len| len);
+        Ok(match ret {
+            Ok(Ok(len)) => Py::new(py, pool.lease(slab, len))?.into_any(),
+            Ok(Err(waiter)) => {
+                pool.slabs.give(slab);
+                waiter.into_any()
+            }
+            Err(err) => {
+                pool.slabs.give(slab);
+                return Err(err);
+            }
+        })
+    }
+
+    #[pyo3(signature = (buffer, nbytes=0, flags=0))]
+    fn _recv_into(&self, py: Python, buffer: &Bound<PyAny>, nbytes: usize, flags: i32) -> PyResult<Py<PyAny>> {
+        let buf = writable_buffer(buffer)?;
+        let len = match nbytes {
+            0 => buf.len_bytes(),
+            v if v > buf.len_bytes() => {
+                return Err(PyValueError::new_err("buffer too small for requested bytes"));
+            }
+            v => v,
+        };
+        let ret = self.recv_raw(py, buf.buf_ptr().cast(), len, flags, |len| len)?;
+        Ok(match ret {
+            Ok(len) => len.into_pyobject(py)?.into_any().unbind(),
+            Err(waiter) => waiter.into_any(),
+        })
+    }
+
+    //: send straight from the object buffer.
+    //  Returns a `Waiter` to suspend on when the socket is not writable.
+    #[pyo3(signature = (data, flags=0))]
+    fn _send(&self, py: Python, data: &Bound<PyAny>, flags: i32) -> PyResult<Py<PyAny>> {
+        let buf = readable_buffer(data)?;
+        let ptr = buf.buf_ptr().cast::<u8>().cast_const();
+        let len = buf.len_bytes();
+        loop {
+            let ret = syscall_result(
+                &self.io,
+                || unsafe { libc::send(self.io.fd, ptr.cast(), len, flags) },
+                |len| len,
+            )?;
+            match ret {
+                IOResult::Ready(len) => return Ok(len.into_pyobject(py)?.into_any().unbind()),
+                IOResult::Pending => self.io.clear_w(),
+            }
+            if let Some(waiter) = self.io.arm_w(py, None)? {
+                return Ok(waiter.into_any());
+            }
+        }
+    }
+
+    //: send up to `count` bytes of the file `fd` starting at `offset`, without copying them
+    //  through userspace. Returns a `Waiter` to suspend on when the socket is not writable.
+    #[cfg(any(target_os = "linux", target_os = "android", target_vendor = "apple"))]
+    fn _sendfile(&self, py: Python, fd: i32, offset: u64, count: usize) -> PyResult<Py<PyAny>> {
+        loop {
+            let ret = syscall_result(&self.io, || sendfile(self.io.fd, fd, offset, count), |len| len)?;
+            match ret {
+                IOResult::Ready(len) => return Ok(len.into_pyobject(py)?.into_any().unbind()),
+                IOResult::Pending => self.io.clear_w(),
+            }
+            if let Some(waiter) = self.io.arm_w(py, None)? {
+                return Ok(waiter.into_any());
+            }
+        }
+    }
+
+    #[cfg(not(any(target_os = "linux", target_os = "android", target_vendor = "apple")))]
+    fn _sendfile(&self, _fd: i32, _offset: u64, _count: usize) -> PyResult<Py<PyAny>> {
+        Err(std::io::Error::from(std::io::ErrorKind::Unsupported).into())
+    }
+
+    //: accept up to `max_n` pending connections with a single native pass, wrapping each of them
+    //  in a `cls` instance (and so registering it with the runtime). With `stream_opts`, the options
+    //  otherwise set by `SocketStream` are applied on accept. Returns a list of `(socket, address)`
+    //  tuples, or a `Waiter` to suspend on when no connection is pending.
+    #[pyo3(signature = (cls, max_n, stream_opts=false))]
+    fn _accept_many(&self, py: Python, cls: &Bound<PyAny>, max_n: usize, stream_opts: bool) -> PyResult<Py<PyAny>> {
+        let conns = loop {
+            if let Some(waiter) = self.io.arm_r(py, None)? {
+                return Ok(waiter.into_any());
+            }
+            let mut conns = Vec::new();
+            let mut err = None;
+            while conns.len() < max_n.max(1) {
+                let mut addr = SockAddrStorage::zeroed();
+                let mut len = addr.size_of();
+                match syscall_result(&self.io, || accept(self.io.fd, &mut addr, &mut len), |fd| fd) {
+                    Ok(IOResult::Ready(fd)) => {
+                        #[allow(clippy::cast_possible_truncation, clippy::cast_possible_wrap)]
+                        let fd = fd as i32;
+                        conns.push((fd, unsafe { SockAddr::new(addr, len) }));
+                    }
+                    Ok(IOResult::Pending) => {
+                        self.io.clear_r();
+                        break;
+                    }
+                    Err(exc) => {
+                        err = Some(exc);
+                        break;
+                    }
+                }
+            }
+            //: errors are reported only when nothing got accepted, otherwise they'll show up again
+            //  on the next call (or they were transient)
+            match (conns.is_empty(), err) {
+                (true, Some(exc)) => return Err(exc.into()),
+                (true, None) => {}
+                _ => break conns,
+            }
+        };
+
+        let sock = self._sock.bind(py);
+        let args = (
+            sock.getattr(pyo3::intern!(py, "family"))?,
+            sock.getattr(pyo3::intern!(py, "type"))?,
+            sock.getattr(pyo3::intern!(py, "proto"))?,
+        );
+        let sock_cls = py
+            .import(pyo3::intern!(py, "socket"))?
+            .getattr(pyo3::intern!(py, "socket"))?;
+        let mut ret = Vec::with_capacity(conns.len());
+        let mut conns = conns.into_iter();
+        while let Some((fd, addr)) = conns.next() {
+            if stream_opts {
+                set_stream_opts(fd);
+            }
+            //: once wrapped in a stdlib socket object, the fd is owned by it
+            let wrapped = match sock_cls.call1((&args.0, &args.1, &args.2, fd)) {
+                Ok(stdlib_sock) => cls.call1((stdlib_sock,)),
+                Err(exc) => {
+                    unsafe { libc::close(fd) };
+                    Err(exc)
+                }
+            };
+            match wrapped {
+                Ok(obj) => ret.push((obj, sockaddr_into_py(py, &addr)?)),
+                Err(exc) => {
+                    for (fd, _) in conns {
+                        unsafe { libc::close(fd) };
+                    }
+                    return Err(exc);
+                }
+            }
+        }
+        Ok(PyList::new(py, ret)?.into_any().unbind())
+    }
+
+    //: attach a classic BPF program to the `SO_REUSEPORT` group of the socket, steering new
+    //  connections to the member with index `cpu % group_size`, where `cpu` is the one
+    //  processing the incoming packet.
+    #[cfg(target_os = "linux")]
+    fn _attach_reuseport_cbpf(&self, group_size: u32) -> PyResult<()> {
+        #[allow(clippy::cast_possible_truncation)]
+        let mut code = [
+            //: A = current CPU
+            libc::sock_filter {
+                code: (libc::BPF_LD | libc::BPF_W | libc::BPF_ABS) as u16,
+                jt: 0,
+                jf: 0,
+                k: (libc::SKF_AD_OFF + libc::SKF_AD_CPU).cast_unsigned(),
+            },
+            //: A = A % group_size
+            libc::sock_filter {
+                code: (libc::BPF_ALU | libc::BPF_MOD | libc::BPF_K) as u16,
+                jt: 0,
+                jf: 0,
+                k: group_size,
+            },
+            //: return A
+            libc::sock_filter {
+                code: (libc::BPF_RET | libc::BPF_A) as u16,
+                jt: 0,
+                jf: 0,
+                k: 0,
+            },
+        ];
+        #[allow(clippy::cast_possible_truncation)]
+        let prog = libc::sock_fprog {
+            len: code.len() as u16,
+            filter: code.as_mut_ptr(),
+        };
+        #[allow(clippy::cast_possible_truncation)]
+        let ret = unsafe {
+            libc::setsockopt(
+                self.io.fd,
+                libc::SOL_SOCKET,
+                libc::SO_ATTACH_REUSEPORT_CBPF,
+                (&raw const prog).cast(),
+                std::mem::size_of::<libc::sock_fprog>() as libc::socklen_t,
+            )
+        };
+        if ret != 0 {
+            return Err(std::io::Error::last_os_error().into());
+        }
+        Ok(())
+    }
+
+    #[cfg(not(target_os = "linux"))]
+    fn _attach_reuseport_cbpf(&self, _group_size: u32) -> PyResult<()> {
+        Err(std::io::Error::from(std::io::ErrorKind::Unsupported).into())
+    }
+
+    //: receive a batch of up to `max_msgs` datagrams of up to `bufsize` bytes each with a single
+    //  syscall (`recvmmsg` on Linux), returning a list of `(data, address)` tuples.
+    //  Returns a `Waiter` to suspend on when the socket is not readable.
+    #[pyo3(signature = (max_msgs, bufsize))]
+    fn _recv_many(&self, py: Python, max_msgs: usize, bufsize: usize) -> PyResult<Py<PyAny>> {
+        if max_msgs == 0 || bufsize == 0 {
+            return Err(PyValueError::new_err("max_msgs and bufsize should be positive"));
+        }
+        //: a single call never takes more than `MMSG_MAX` messages, don't ask for a larger buffer
+        let ret = with_read_buf(
+            max_msgs.min(MMSG_MAX).saturating_mul(bufsize),
+            |buf| -> PyResult<Result<_, Py<Waiter>>> {
+                let slot = bufsize.min(buf.len());
+                let count = (buf.len() / slot).min(max_msgs).min(MMSG_MAX);
+                let ptr = buf.as_mut_ptr();
+                let mut names: Vec<SockAddrStorage> = (0..count).map(|_| SockAddrStorage::zeroed()).collect();
+                let mut lens = vec![(0, 0); count];
+                loop {
+                    if let Some(waiter) = self.io.arm_r(py, None)? {
+                        return Ok(Err(waiter));
+                    }
+                    let ret = syscall_result(
+                        &self.io,
+                        || recv_batch(self.io.fd, ptr, slot, &mut names, &mut lens),
+                        |count| count,
+                    )?;
+                    match ret {
+                        IOResult::Ready(count) => {
+                            let mut msgs = Vec::with_capacity(count);
+                            for (idx, (name, (len, namelen))) in names.into_iter().zip(lens).take(count).enumerate() {
+                                let data =
+                                    PyBytes::new(py, unsafe { std::slice::from_raw_parts(ptr.add(idx * slot), len) });
+                                let addr = sockaddr_into_py(py, &unsafe { SockAddr::new(name, namelen) })?;
+                                msgs.push((data, addr));
+                            }
+                            return Ok(Ok(PyList::new(py, msgs)?.into_any().unbind()));
+                        }
+                        IOResult::Pending => self.io.clear_r(),
+                    }
+                }
+            },
+        )?;
+        Ok(match ret {
+            Ok(msgs) => msgs,
+            Err(waiter) => waiter.into_any(),
+        })
+    }
+
+    //: send a batch of `(data, address)` datagrams, starting from the one at `offset`,
+    //  with a single syscall (`sendmmsg` on Linux). Addresses should be numeric, or `None`
+    //  on connected sockets. Returns the number of datagrams sent, or a `Waiter` to suspend on
+    //  when the socket is not writable.
+    #[pyo3(signature = (msgs, offset=0))]
+    fn _send_many(&self, py: Python, msgs: &Bound<PyAny>, offset: usize) -> PyResult<Py<PyAny>> {
+        let msgs = msgs.cast::<PySequence>()?;
+        let mut bufs = Vec::new();
+        let mut out = Vec::new();
+        //: only the window to send gets visited, so partial sends resume in constant time
+        for idx in offset..msgs.len()?.min(offset.saturating_add(MMSG_MAX)) {
+            let (data, addr): (Bound<PyAny>, Bound<PyAny>) = msgs.get_item(idx)?.extract()?;
+            let buf = readable_buffer(&data)?;
+            out.push(OutMsg {
+                buf: buf.buf_ptr().cast::<u8>().cast_const(),
+                len: buf.len_bytes(),
+                addr: if addr.is_none() {
+                    None
+                } else {
+                    Some(sockaddr_from_py(&addr)?)
+                },
+            });
+            bufs.push(buf);
+        }
+        if out.is_empty() {
+            return Ok(0.into_pyobject(py)?.into_any().unbind());
+        }
+
+        loop {
+            let ret = syscall_result(&self.io, || send_batch(self.io.fd, &out), |count| count)?;
+            match ret {
+                IOResult::Ready(count) => return Ok(count.into_pyobject(py)?.into_any().unbind()),
+                IOResult::Pending => self.io.clear_w(),
+            }
+            if let Some(waiter) = self.io.arm_w(py, None)? {
+                return Ok(waiter.into_any());
+            }
+        }
+    }
+
+    //: gather write of the given buffers with `writev`, starting from `offset` bytes into the buffer
+    //  at `index`, so that partially written sequences get resumed without slicing, copying,
+    //  or acquiring the buffers already sent.
+    //  Returns a `Waiter` to suspend on when the socket is not writable.
+    #[pyo3(signature = (buffers, index=0, offset=0))]
+    fn _sendv(&self, py: Python, buffers: &Bound<PyAny>, index: usize, offset: usize) -> PyResult<Py<PyAny>> {
+        let buffers = buffers.cast::<PySequence>()?;
+        let mut bufs = Vec::new();
+        let mut iovs: Vec<libc::iovec> = Vec::new();
+        let mut skip = offset;
+        for idx in index..buffers.len()? {
+            let buf = readable_buffer(&buffers.get_item(idx)?)?;
+            let len = buf.len_bytes();
+            if skip >= len {
+                skip -= len;
+                continue;
+            }
+            iovs.push(libc::iovec {
+                iov_base: unsafe { buf.buf_ptr().byte_add(skip) },
+                iov_len: len - skip,
+            });
+            bufs.push(buf);
+            skip = 0;
+            //: the remainder gets picked up by the next call
+            if iovs.len() == IOV_MAX {
+                break;
+            }
+        }
+        if iovs.is_empty() {
+            return Ok(0.into_pyobject(py)?.into_any().unbind());
+        }
+
+        #[allow(clippy::cast_possible_truncation, clippy::cast_possible_wrap)]
+        let iovcnt = iovs.len() as i32;
+        loop {
+            let ret = syscall_result(
+                &self.io,
+                || unsafe { libc::writev(self.io.fd, iovs.as_ptr(), iovcnt) },
+                |len| len,
+            )?;
+            match ret {
+                IOResult::Ready(len) => return Ok(len.into_pyobject(py)?.into_any().unbind()),
+                IOResult::Pending => self.io.clear_w(),
+            }
+            if let Some(waiter) = self.io.arm_w(py, None)? {
+                return Ok(waiter.into_any());
+            }
+        }
+    }
 }
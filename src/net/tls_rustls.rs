@@ -0,0 +1,366 @@
+use std::{
+    io::{self, Read, Write},
+    path::PathBuf,
+    sync::{Arc, Mutex},
+};
+
+use pyo3::{exceptions::PyValueError, prelude::*, types::PyBytes};
+use rustls::{
+    ClientConfig, ClientConnection, Connection, HandshakeKind, RootCertStore, ServerConfig, ServerConnection,
+    client::Resumption,
+    crypto::ring::{Ticketer, default_provider},
+    pki_types::{CertificateDer, PrivateKeyDer, ServerName, pem::PemObject},
+};
+
+use super::socket::{Socket, readable_buffer};
+use crate::{errors::ResourceBroken, events::Waiter, io::schedule::ScheduledIO, work::with_read_buf};
+
+#[inline]
+fn config_err(err: impl ToString) -> PyErr {
+    PyValueError::new_err(err.to_string())
+}
+
+//: `Read`/`Write` straight on the (non-blocking) socket fd
+struct SockIO<'a>(&'a ScheduledIO);
+
+impl SockIO<'_> {
+    #[inline]
+    fn check(&self) -> io::Result<()> {
+        //: the entry is shut down before the fd gets closed, so we never touch a recycled fd
+        if self.0.is_shutdown() {
+            return Err(io::Error::from_raw_os_error(libc::EBADF));
+        }
+        Ok(())
+    }
+}
+
+impl Read for SockIO<'_> {
+    fn read(&mut self, buf: &mut [u8]) -> io::Result<usize> {
+        self.check()?;
+        let ret = unsafe { libc::recv(self.0.fd, buf.as_mut_ptr().cast(), buf.len(), 0) };
+        if ret < 0 {
+            return Err(io::Error::last_os_error());
+        }
+        Ok(ret.cast_unsigned())
+    }
+}
+
+impl Write for SockIO<'_> {
+    fn write(&mut self, buf: &[u8]) -> io::Result<usize> {
+        self.check()?;
+        let ret = unsafe { libc::send(self.0.fd, buf.as_ptr().cast(), buf.len(), 0) };
+        if ret < 0 {
+            return Err(io::Error::last_os_error());
+        }
+        Ok(ret.cast_unsigned())
+    }
+
+    //: pending records get written with a single `writev`
+    //  NOTE: `IoSlice` is guaranteed to be ABI compatible with `iovec` on unix
+    fn write_vectored(&mut self, bufs: &[io::IoSlice<'_>]) -> io::Result<usize> {
+        self.check()?;
+        #[allow(clippy::cast_possible_truncation, clippy::cast_possible_wrap)]
+        let ret = unsafe { libc::writev(self.0.fd, bufs.as_ptr().cast(), bufs.len() as i32) };
+        if ret < 0 {
+            return Err(io::Error::last_os_error());
+        }
+        Ok(ret.cast_unsigned())
+    }
+
+    fn flush(&mut self) -> io::Result<()> {
+        Ok(())
+    }
+}
+
+enum Config {
+    Client(Arc<ClientConfig>),
+    Server(Arc<ServerConfig>),
+}
+
+//: rustls configuration, the native counterpart of `ssl.SSLContext`
+#[pyclass(frozen, module = "tonio._tonio")]
+pub(crate) struct RustlsConfig {
+    inner: Config,
+}
+
+#[pymethods]
+impl RustlsConfig {
+    //: same as `SSLContext.load_cert_chain`: the key is loaded from `certfile` when `keyfile` is missing.
+    //  With `session_tickets`, stateless tickets are issued with keys rotated every 6 hours,
+    //  while the previous key is still accepted for resumption.
+    #[staticmethod]
+    #[pyo3(signature = (certfile, keyfile=None, alpn_protocols=None, session_tickets=false))]
+    fn server(
+        certfile: PathBuf,
+        keyfile: Option<PathBuf>,
+        alpn_protocols: Option<Vec<String>>,
+        session_tickets: bool,
+    ) -> PyResult<Self> {
+        let certs: Vec<CertificateDer<'static>> = CertificateDer::pem_file_iter(&certfile)
+            .map_err(config_err)?
+            .collect::<Result<_, _>>()
+            .map_err(config_err)?;
+        let key = PrivateKeyDer::from_pem_file(keyfile.as_ref().unwrap_or(&certfile)).map_err(config_err)?;
+        let mut config = ServerConfig::builder_with_provider(Arc::new(default_provider()))
+            .with_safe_default_protocol_versions()
+            .map_err(config_err)?
+            .with_no_client_auth()
+            .with_single_cert(certs, key)
+            .map_err(config_err)?;
+        config.alpn_protocols = alpn_protocols
+            .unwrap_or_default()
+            .into_iter()
+            .map(String::into_bytes)
+            .collect();
+        if session_tickets {
+            config.ticketer = Ticketer::new().map_err(config_err)?;
+        }
+        Ok(Self {
+            inner: Config::Server(Arc::new(config)),
+        })
+    }
+
+    //: trusts the certificates in `cafile`, or the Mozilla root store when missing.
+    //  Sessions are cached per server name for resumption, up to `session_cache_size` entries.
+    #[staticmethod]
+    #[pyo3(signature = (cafile=None, alpn_protocols=None, session_cache_size=256))]
+    fn client(
+        cafile: Option<PathBuf>,
+        alpn_protocols: Option<Vec<String>>,
+        session_cache_size: usize,
+    ) -> PyResult<Self> {
+        let mut roots = RootCertStore::empty();
+        match cafile {
+            Some(cafile) => {
+                for cert in CertificateDer::pem_file_iter(&cafile).map_err(config_err)? {
+                    roots.add(cert.map_err(config_err)?).map_err(config_err)?;
+                }
+            }
+            None => roots.extend(webpki_roots::TLS_SERVER_ROOTS.iter().cloned()),
+        }
+        let mut config = ClientConfig::builder_with_provider(Arc::new(default_provider()))
+            .with_safe_default_protocol_versions()
+            .map_err(config_err)?
+            .with_root_certificates(roots)
+            .with_no_client_auth();
+        config.alpn_protocols = alpn_protocols
+            .unwrap_or_default()
+            .into_iter()
+            .map(String::into_bytes)
+            .collect();
+        config.resumption = match session_cache_size {
+            0 => Resumption::disabled(),
+            size => Resumption::in_memory_sessions(size),
+        };
+        Ok(Self {
+            inner: Config::Client(Arc::new(config)),
+        })
+    }
+
+    #[getter(server_side)]
+    fn get_server_side(&self) -> bool {
+        matches!(self.inner, Config::Server(_))
+    }
+}
+
+//: next step for a TLS operation which couldn't complete on the socket state
+enum Step<T> {
+    Done(T),
+    WantRead,
+    WantWrite,
+}
+
+//: a rustls connection driving its socket fd natively.
+//  Handshake, encryption and decryption happen without bouncing through Python:
+//  every method either completes, or returns a `Waiter` to suspend on before calling it again.
+//  NOTE: the connection lock is never held while creating Python objects.
+#[pyclass(frozen, module = "tonio._tonio")]
+pub(crate) struct RustlsConnection {
+    io: Arc<ScheduledIO>,
+    conn: Mutex<Connection>,
+}
+
+impl RustlsConnection {
+    //: write pending records until done or the socket is not writable anymore
+    fn write_pending(&self, conn: &mut Connection) -> io::Result<()> {
+        while conn.wants_write() {
+            match conn.write_tls(&mut SockIO(&self.io)) {
+                Ok(_) => {}
+                Err(err) if err.kind() == io::ErrorKind::Interrupted => {}
+                Err(err) if err.kind() == io::ErrorKind::WouldBlock => {
+                    self.io.clear_w();
+                    break;
+                }
+                Err(err) => return Err(err),
+            }
+        }
+        Ok(())
+    }
+
+    //: read and process new records, returning the number of bytes read (0 on EOF)
+    fn read_pending(&self, conn: &mut Connection) -> PyResult<Option<usize>> {
+        let read = loop {
+            match conn.read_tls(&mut SockIO(&self.io)) {
+                Ok(len) => break len,
+                Err(err) if err.kind() == io::ErrorKind::Interrupted => {}
+                Err(err) if err.kind() == io::ErrorKind::WouldBlock => {
+                    self.io.clear_r();
+                    return Ok(None);
+                }
+                Err(err) => return Err(err.into()),
+            }
+        };
+        if let Err(err) = conn.process_new_packets() {
+            //: best effort delivery of the alert to the peer
+            _ = self.write_pending(conn);
+            return Err(ResourceBroken::new_err(err.to_string()));
+        }
+        Ok(Some(read))
+    }
+
+    //: run `f` with the connection until it completes, suspending on the socket readiness it needs
+    fn drive<T>(
+        &self,
+        py: Python,
+        mut f: impl FnMut(&mut Connection) -> PyResult<Step<T>>,
+    ) -> PyResult<Result<T, Py<Waiter>>> {
+        loop {
+            let step = f(&mut self.conn.lock().unwrap())?;
+            let waiter = match step {
+                Step::Done(ret) => return Ok(Ok(ret)),
+                Step::WantRead => self.io.arm_r(py, None)?,
+                Step::WantWrite => self.io.arm_w(py, None)?,
+            };
+            if let Some(waiter) = waiter {
+                return Ok(Err(waiter));
+            }
+        }
+    }
+}
+
+#[pymethods]
+impl RustlsConnection {
+    #[new]
+    #[pyo3(signature = (config, socket, server_hostname=None))]
+    fn new(config: &Bound<RustlsConfig>, socket: &Bound<Socket>, server_hostname: Option<String>) -> PyResult<Self> {
+        let conn: Connection = match (&config.get().inner, server_hostname) {
+            (Config::Client(config), Some(name)) => {
+                let name = ServerName::try_from(name).map_err(config_err)?;
+                ClientConnection::new(config.clone(), name).map_err(config_err)?.into()
+            }
+            (Config::Client(_), None) => {
+                return Err(PyValueError::new_err(
+                    "server_hostname is required for client connections",
+                ));
+            }
+            (Config::Server(config), _) => ServerConnection::new(config.clone()).map_err(config_err)?.into(),
+        };
+        Ok(Self {
+            io: socket.get().io.clone(),
+            conn: Mutex::new(conn),
+        })
+    }
+
+    //: returns `None` once the handshake is complete
+    fn _handshake(&self, py: Python) -> PyResult<Option<Py<Waiter>>> {
+        let ret = self.drive(py, |conn| {
+            loop {
+                self.write_pending(conn)?;
+                if conn.wants_write() {
+                    return Ok(Step::WantWrite);
+                }
+                if !conn.is_handshaking() {
+                    return Ok(Step::Done(()));
+                }
+                match self.read_pending(conn)? {
+                    None => return Ok(Step::WantRead),
+                    Some(0) => return Err(ResourceBroken::new_err("connection closed during handshake")),
+                    Some(_) => {}
+                }
+            }
+        })?;
+        Ok(ret.err())
+    }
+
+    //: returns decrypted data up to `max_bytes`, or empty `bytes` on a clean close.
+    //  An unclean close raises `ResourceBroken`, unless `ragged_eof` is set.
+    #[pyo3(signature = (max_bytes, ragged_eof=false))]
+    fn _recv(&self, py: Python, max_bytes: usize, ragged_eof: bool) -> PyResult<Py<PyAny>> {
+        let ret = with_read_buf(max_bytes, |buf| {
+            let ret = self.drive(py, |conn| {
+                loop {
+                    match conn.reader().read(buf) {
+                        Ok(len) => return Ok(Step::Done(len)),
+                        Err(err) if err.kind() == io::ErrorKind::WouldBlock => {}
+                        Err(err) if err.kind() == io::ErrorKind::UnexpectedEof => {
+                            if ragged_eof {
+                                return Ok(Step::Done(0));
+                            }
+                            return Err(ResourceBroken::new_err(err.to_string()));
+                        }
+                        Err(err) => return Err(err.into()),
+                    }
+                    //: records produced while processing (eg: key updates) are sent opportunistically
+                    _ = self.write_pending(conn);
+                    if self.read_pending(conn)?.is_none() {
+                        return Ok(Step::WantRead);
+                    }
+                }
+            })?;
+            PyResult::Ok(ret.map(|len| PyBytes::new(py, &buf[..len]).into_any().unbind()))
+        })?;
+        Ok(match ret {
+            Ok(data) => data,
+            Err(waiter) => waiter.into_any(),
+        })
+    }
+
+    //: encrypts a chunk of `data`, returning the number of bytes consumed.
+    //  Records are written opportunistically: pending ones get flushed first on the next call,
+    //  so `_flush` should be called once all the data is consumed.
+    fn _send(&self, py: Python, data: &Bound<PyAny>) -> PyResult<Py<PyAny>> {
+        let buf = readable_buffer(data)?;
+        let data = unsafe { std::slice::from_raw_parts(buf.buf_ptr().cast::<u8>(), buf.len_bytes()) };
+        let ret = self.drive(py, |conn| {
+            self.write_pending(conn)?;
+            if conn.wants_write() {
+                return Ok(Step::WantWrite);
+            }
+            let len = conn.writer().write(data)?;
+            self.write_pending(conn)?;
+            Ok(Step::Done(len))
+        })?;
+        Ok(match ret {
+            Ok(len) => len.into_pyobject(py)?.into_any().unbind(),
+            Err(waiter) => waiter.into_any(),
+        })
+    }
+
+    //: returns `None` once all the pending records are written
+    fn _flush(&self, py: Python) -> PyResult<Option<Py<Waiter>>> {
+        let ret = self.drive(py, |conn| {
+            self.write_pending(conn)?;
+            if conn.wants_write() {
+                return Ok(Step::WantWrite);
+            }
+            Ok(Step::Done(()))
+        })?;
+        Ok(ret.err())
+    }
+
+    //: queues the `close_notify` alert, to be sent with `_flush`
+    fn _close_notify(&self) {
+        self.conn.lock().unwrap().send_close_notify();
+    }
+
+    fn selected_alpn_protocol(&self) -> Option<String> {
+        let conn = self.conn.lock().unwrap();
+        conn.alpn_protocol()
+            .map(|proto| String::from_utf8_lossy(proto).into_owned())
+    }
+
+    #[getter(session_reused)]
+    fn get_session_reused(&self) -> bool {
+        self.conn.lock().unwrap().handshake_kind() == Some(HandshakeKind::Resumed)
+    }
+}
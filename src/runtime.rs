@@ -1,6 +1,5 @@
 use std::{
     cell::Cell,
-    collections::BinaryHeap,
     io::Read,
     os::fd::FromRawFd,
     sync::{Arc, Condvar, Mutex, atomic},
@@ -15,37 +14,48 @@ use pyo3::prelude::*;
 
 use crate::{
     blocking::BlockingRunnerPool,
+    events::Suspension,
     handles::BoxedHandle,
     io::{
         TOKEN_SIGNALS, TOKEN_WAKER,
+        driver::{IODriver, driver_for, driver_loop},
         schedule::{ScheduledIO, readiness_from_event},
         source::Source,
     },
     // py::copy_context,
-    time::Timer,
-    work::{LOCAL_WORKER, WorkSchedule, work_loop},
+    time::{CoarseClock, Timer, TimerKey, TimerShards},
+    work::{LOCAL_WORKER, WorkSchedule, coop_exhausted, work_loop},
 };
 
 pub struct RuntimeState {
     buf: Box<[u8]>,
+    clock: u64,
     io: Poll,
+    io_drivers: Vec<thread::JoinHandle<()>>,
     sig_sock: (socket2::Socket, socket2::Socket),
+    runtime: Py<Runtime>,
+    threads_cvar: Arc<(Mutex<usize>, Condvar)>,
+    //: CPU set of the calling thread before pinning, restored on teardown
+    cpus_prev: Option<Vec<usize>>,
 }
 
 #[pyclass(frozen, subclass, module = "tonio._tonio")]
 pub struct Runtime {
     io_registrations: papaya::HashMap<usize, Arc<ScheduledIO>>,
     io_registry: arc_swap::ArcSwapOption<mio::Registry>,
+    io_drivers: arc_swap::ArcSwapOption<Vec<IODriver>>,
+    io_drivers_n: usize,
     io_pending_release: Mutex<Vec<Arc<ScheduledIO>>>,
     io_needs_release: atomic::AtomicBool,
     waker: arc_swap::ArcSwapOption<Waker>,
-    handles_sched: Mutex<BinaryHeap<Timer>>,
+    timers: TimerShards,
     blocking_pool: BlockingRunnerPool,
     //: `Injector` need to be Boxed as it exceeds the alignment CPython's object allocator gives a pyclass
     pub work_injector: Box<Injector<BoxedHandle>>,
     work_schedule: arc_swap::ArcSwapOption<WorkSchedule>,
     pub work_stopping: atomic::AtomicBool,
     epoch: Instant,
+    clock_coarse: Option<CoarseClock>,
     closed: atomic::AtomicBool,
     sig_set: std::collections::HashSet<u8>,
     sig_wfd: arc_swap::ArcSwap<Py<PyAny>>,
@@ -57,6 +67,14 @@ pub struct Runtime {
     ssock_r: arc_swap::ArcSwap<Py<PyAny>>,
     ssock_w: arc_swap::ArcSwap<Py<PyAny>>,
     threads_cb: usize,
+    threads_cb_min: usize,
+    threads_cb_timeout: u64,
+    work_grow: atomic::AtomicBool,
+    worker_cpus: Vec<usize>,
+    poll_cpus: Vec<usize>,
+    steal_batch: usize,
+    coop_budget: usize,
+    spin: usize,
     use_pyctx: bool,
 }
 
@@ -78,18 +96,8 @@ impl Runtime {
         }
 
         //: get proper poll timeout
-        let mut sched_time: Option<u64> = None;
-        {
-            let guard_sched = self.handles_sched.lock().unwrap();
-            if let Some(timer) = guard_sched.peek() {
-                let tick = Instant::now().duration_since(self.epoch).as_micros();
-                sched_time = Some(if timer.when > tick {
-                    (timer.when - tick) as u64
-                } else {
-                    0
-                });
-            }
-        }
+        //  NOTE: we use the clock cached at the end of the previous cycle
+        let sched_time = self.timers.next_deadline().map(|when| when.saturating_sub(state.clock));
 
         let poll_result = {
             py.detach(|| {
@@ -109,52 +117,64 @@ impl Runtime {
             match event.token().0 {
                 TOKEN_WAKER => {}
                 TOKEN_SIGNALS => self.handle_io_signals(py, state),
-                token => {
-                    //: get the handler from the token and compute our readiness word from the event
-                    //  NOTE: the token is the exposed address of the Arc, kept alive at least until the release point
-                    //        at the top of the loop cycle. Only the poll cycle can free deregistrations,
-                    //        thus safety is guaranteed here.
-                    let io = unsafe { &*std::ptr::with_exposed_provenance::<ScheduledIO>(token) };
-                    let ready = readiness_from_event(event);
-                    io.set_readiness(ready);
-                    //: wake and schedule work
-                    let (reader, writer) = io.wake(ready);
-                    if let Some(ev) = reader {
-                        self.add_io_handle(Box::new(ev));
-                    }
-                    if let Some(ev) = writer {
-                        self.add_io_handle(Box::new(ev));
-                    }
-                }
+                token => self.io_dispatch(token, event),
             }
         }
 
         //: handle timers
+        state.clock = self.clock();
+        self.timers
+            .poll(state.clock, |target| self.defer_handle(Box::new(Timer { target })));
+
+        //: grow the worker pool if workers asked for it, or if the work we just scheduled piles up
+        if self.work_grow.swap(false, atomic::Ordering::AcqRel)
+            || self
+                .work_schedule
+                .load()
+                .as_ref()
+                .is_some_and(|sched| sched.should_grow(&self.work_injector))
         {
-            let mut guard_sched = self.handles_sched.lock().unwrap();
-            if let Some(timer) = guard_sched.peek() {
-                let tick = Instant::now().duration_since(self.epoch).as_micros();
-                if timer.when <= tick {
-                    while let Some(timer) = guard_sched.peek() {
-                        if timer.when > tick {
-                            break;
-                        }
-                        self.defer_handle(Box::new(guard_sched.pop().unwrap()));
-                    }
-                }
-            }
+            self.grow_workers(py, state);
         }
 
         poll_result
     }
 
+    //: apply readiness from a poll event and schedule the woken work
+    #[inline(always)]
+    pub(crate) fn io_dispatch(&self, token: usize, event: &event::Event) {
+        //: get the handler from the token and compute our readiness word from the event
+        //  NOTE: the token is the exposed address of the Arc, kept alive at least until the release point
+        //        at the top of the cycle of the poller owning the registration.
+        //        Only that poller can free its deregistrations, thus safety is guaranteed here.
+        let io = unsafe { &*std::ptr::with_exposed_provenance::<ScheduledIO>(token) };
+        let ready = readiness_from_event(event);
+        io.set_readiness(ready);
+        //: wake and schedule work
+        let (reader, writer) = io.wake(ready);
+        if let Some(ev) = reader {
+            self.add_io_handle_to(Box::new(ev), io.owner());
+        }
+        if let Some(ev) = writer {
+            self.add_io_handle_to(Box::new(ev), io.owner());
+        }
+    }
+
     pub(crate) fn io_register(&self, fd: i32, interest: Interest) -> anyhow::Result<Arc<ScheduledIO>> {
         let registry = self.io_registry.load_full().expect("runtime is not running");
-        let io = Arc::new(ScheduledIO::new(fd));
+        let drivers = self.io_drivers.load();
+        let driver = drivers
+            .as_ref()
+            .map_or(usize::MAX, |drivers| driver_for(fd, drivers.len()));
+        let io = Arc::new(ScheduledIO::new(fd, driver));
         let token = Arc::as_ptr(&io).expose_provenance();
         self.io_registrations.pin().insert(token, io.clone());
         let mut source = Source::FD(fd);
-        if let Err(err) = registry.register(&mut source, Token(token), interest) {
+        let res = match drivers.as_ref() {
+            Some(drivers) => drivers[driver].registry.register(&mut source, Token(token), interest),
+            None => registry.register(&mut source, Token(token), interest),
+        };
+        if let Err(err) = res {
             self.io_registrations.pin().remove(&token);
             return Err(err.into());
         }
@@ -165,9 +185,16 @@ impl Runtime {
         let token = Arc::as_ptr(io).expose_provenance();
         let regs = self.io_registrations.pin();
         if let Some(io) = regs.remove(&token) {
-            if let Some(registry) = self.io_registry.load().as_ref() {
-                let mut source = Source::FD(io.fd);
-                _ = registry.deregister(&mut source);
+            let drivers = self.io_drivers.load();
+            let driver = drivers.as_ref().and_then(|drivers| drivers.get(io.driver));
+            let mut source = Source::FD(io.fd);
+            match driver {
+                Some(driver) => _ = driver.registry.deregister(&mut source),
+                None => {
+                    if let Some(registry) = self.io_registry.load().as_ref() {
+                        _ = registry.deregister(&mut source);
+                    }
+                }
             }
             //: shutdown any leftofer work
             let (reader, writer) = io.shutdown();
@@ -177,12 +204,33 @@ impl Runtime {
             if let Some(ev) = writer {
                 self.add_io_handle(Box::new(ev));
             }
-            //: add to the release queue
+            //: add to the release queue of the poller owning the registration
+            if let Some(driver) = driver {
+                driver.release(io.clone());
+                return;
+            }
             self.io_pending_release.lock().unwrap().push(io.clone());
             self.io_needs_release.store(true, atomic::Ordering::Release);
         }
     }
 
+    //: spawn a thread for one of the spare worker slots
+    fn grow_workers(&self, py: Python, state: &RuntimeState) {
+        if self.work_stopping.load(atomic::Ordering::Acquire) {
+            return;
+        }
+        let Some(schedule) = self.work_schedule.load_full() else {
+            return;
+        };
+        let Some((idx, worker, parker)) = schedule.take_spare() else {
+            return;
+        };
+        *state.threads_cvar.0.lock().unwrap() += 1;
+        let runtime = state.runtime.clone_ref(py);
+        let cvar = state.threads_cvar.clone();
+        thread::spawn(move || work_loop(schedule, runtime, idx, worker, parker, cvar));
+    }
+
     fn stop_threads(&self, py: Python, cond: Arc<(Mutex<usize>, Condvar)>) {
         self.work_stopping.store(true, atomic::Ordering::Release);
         if let Some(sched) = self.work_schedule.load_full() {
@@ -267,25 +315,54 @@ impl Runtime {
         Ok(())
     }
 
+    fn stop_io_drivers(&self, py: Python, state: &mut RuntimeState) {
+        if let Some(drivers) = self.io_drivers.load().as_ref() {
+            for driver in drivers.iter() {
+                driver.stop();
+            }
+        }
+        let threads = std::mem::take(&mut state.io_drivers);
+        py.detach(|| {
+            for thread in threads {
+                _ = thread.join();
+            }
+        });
+    }
+
     fn cleanup_io(&self, state: &mut RuntimeState) {
+        let drivers = self.io_drivers.load();
         let regs = self.io_registrations.pin();
         for (_, io) in &regs {
             let mut source = Source::FD(io.fd);
-            _ = state.io.registry().deregister(&mut source);
+            _ = match drivers.as_ref().and_then(|drivers| drivers.get(io.driver)) {
+                Some(driver) => driver.registry.deregister(&mut source),
+                None => state.io.registry().deregister(&mut source),
+            };
             _ = io.shutdown();
         }
         regs.clear();
         self.io_needs_release.store(false, atomic::Ordering::Release);
         self.io_pending_release.lock().unwrap().clear();
+        if let Some(drivers) = drivers.as_ref() {
+            for driver in drivers.iter() {
+                driver.clear();
+            }
+        }
     }
 
-    fn teardown(&self, py: Python, state: &mut RuntimeState, threads_cvar: Arc<(Mutex<usize>, Condvar)>) {
+    fn teardown(&self, py: Python, state: &mut RuntimeState) {
         _ = self.drop_sig_socket(py, state);
+        //: drivers need to stop before cleanup, as they might hold tokens of in-flight events
+        self.stop_io_drivers(py, state);
         self.cleanup_io(state);
-        self.stop_threads(py, threads_cvar);
+        self.stop_threads(py, state.threads_cvar.clone());
         self.work_schedule.swap(None);
         self.waker.swap(None);
+        self.io_drivers.swap(None);
         self.io_registry.swap(None);
+        if let Some(cpus) = state.cpus_prev.take() {
+            _ = crate::affinity::pin_current(&cpus);
+        }
     }
 
     #[inline(always)]
@@ -295,10 +372,12 @@ impl Runtime {
 
     pub fn add_handle(&self, handle: BoxedHandle) {
         let local = LOCAL_WORKER.with(Cell::get);
-        if local.is_null() {
+        //: off-worker, or over the cooperative budget: queue behind other pending work
+        if local.is_null() || coop_exhausted() {
             self.work_injector.push(handle);
-        } else {
-            unsafe { (*local).push(handle) };
+        } else if !unsafe { (*local).push(handle) } {
+            //: the handle landed in the LIFO slot, no need to involve other workers
+            return;
         }
         self.maybe_unpark_workers();
     }
@@ -311,6 +390,18 @@ impl Runtime {
         }
     }
 
+    //: route I/O wakeups to the worker which last polled the resource, to preserve locality
+    #[inline]
+    fn add_io_handle_to(&self, handle: BoxedHandle, owner: usize) {
+        if let Some(sched) = self.work_schedule.load().as_ref()
+            && owner < sched.size()
+        {
+            sched.push_to(owner, handle);
+            return;
+        }
+        self.add_io_handle(handle);
+    }
+
     pub fn defer_handle(&self, handle: BoxedHandle) {
         self.work_injector.push(handle);
         self.maybe_unpark_workers();
@@ -323,12 +414,45 @@ impl Runtime {
         }
     }
 
-    pub fn add_timer(&self, timer: Timer) {
-        {
-            let mut guard = self.handles_sched.lock().unwrap();
-            guard.push(timer);
+    //: threads are spawned by the poll loop, as it holds the state we need
+    #[inline(always)]
+    pub(crate) fn maybe_grow_workers(&self, sched: &WorkSchedule) {
+        if sched.should_grow(&self.work_injector) && !self.work_grow.swap(true, atomic::Ordering::AcqRel) {
+            self.wake();
         }
-        self.wake();
+    }
+
+    #[inline(always)]
+    #[allow(clippy::cast_possible_truncation)]
+    pub(crate) fn clock(&self) -> u64 {
+        self.epoch.elapsed().as_micros() as u64
+    }
+
+    #[inline(always)]
+    pub(crate) fn workers(&self) -> usize {
+        self.threads_cb
+    }
+
+    pub(crate) fn add_timer(&self, timeout: u64, target: Suspension) -> TimerKey {
+        let (now, when) = match &self.clock_coarse {
+            Some(clock) => {
+                let now = clock.now();
+                (now, now.saturating_add(clock.slack).saturating_add(timeout))
+            }
+            None => {
+                let now = self.clock();
+                (now, now.saturating_add(timeout))
+            }
+        };
+        let (key, wake) = self.timers.insert(now, when, target);
+        if wake {
+            self.wake();
+        }
+        key
+    }
+
+    pub(crate) fn cancel_timer(&self, key: TimerKey) {
+        self.timers.cancel(key);
     }
 }
 
@@ -338,10 +462,19 @@ impl Runtime {
     pub(crate) fn new(
         py: Python,
         threads: usize,
+        threads_min: usize,
+        threads_timeout: u64,
         threads_blocking: usize,
         threads_blocking_timeout: u64,
         context: bool,
         signals: Vec<u8>,
+        timer_resolution: u64,
+        steal_batch: usize,
+        coop_budget: usize,
+        io_drivers: usize,
+        worker_spin: usize,
+        worker_cpus: Vec<usize>,
+        poll_cpus: Vec<usize>,
     ) -> Self {
         let mut sig_set = std::collections::HashSet::with_capacity(signals.len());
         for sig in signals {
@@ -351,15 +484,18 @@ impl Runtime {
         Self {
             io_registrations: papaya::HashMap::with_capacity(128),
             io_registry: None.into(),
+            io_drivers: None.into(),
+            io_drivers_n: io_drivers,
             io_pending_release: Mutex::new(Vec::new()),
             io_needs_release: atomic::AtomicBool::new(false),
             waker: None.into(),
-            handles_sched: Mutex::new(BinaryHeap::with_capacity(32)),
+            timers: TimerShards::new(threads, timer_resolution),
             blocking_pool: BlockingRunnerPool::new(threads_blocking, threads_blocking_timeout),
             work_injector: Box::new(Injector::new()),
             work_schedule: None.into(),
             work_stopping: atomic::AtomicBool::new(false),
             epoch: Instant::now(),
+            clock_coarse: if timer_resolution > 1 { CoarseClock::new() } else { None },
             // ssock: RwLock::new(None),
             closed: atomic::AtomicBool::new(false),
             sig_set,
@@ -372,6 +508,14 @@ impl Runtime {
             ssock_r: arc_swap::ArcSwap::new(py.None().into()),
             ssock_w: arc_swap::ArcSwap::new(py.None().into()),
             threads_cb: threads,
+            threads_cb_min: threads_min.clamp(1, threads),
+            threads_cb_timeout: threads_timeout,
+            work_grow: atomic::AtomicBool::new(false),
+            worker_cpus,
+            poll_cpus,
+            steal_batch,
+            coop_budget,
+            spin: worker_spin,
             use_pyctx: context,
         }
     }
@@ -381,6 +525,11 @@ impl Runtime {
         Instant::now().duration_since(self.epoch).as_micros()
     }
 
+    #[getter(_timers_pending)]
+    fn _get_timers_pending(&self) -> usize {
+        self.timers.active()
+    }
+
     #[getter(_closed)]
     fn _get_closed(&self) -> bool {
         self.closed.load(atomic::Ordering::Acquire)
@@ -513,19 +662,65 @@ impl Runtime {
         let rself = pyself.get();
         let poll = Poll::new()?;
         let waker = Waker::new(poll.registry(), Token(TOKEN_WAKER))?;
-        let sig_sock = rself.init_sig_socket(py, poll.registry())?;
         let registry = poll.registry().try_clone()?;
+        //: fallible setup goes before any side effect, so that early returns don't skip the teardown
+        let mut drivers = Vec::with_capacity(rself.io_drivers_n);
+        let mut drivers_poll = Vec::with_capacity(rself.io_drivers_n);
+        for _ in 0..rself.io_drivers_n {
+            let (driver, poll) = IODriver::new()?;
+            drivers.push(driver);
+            drivers_poll.push(poll);
+        }
+        //: the previous CPU set is restored on teardown, or right away if the remaining setup fails
+        let mut cpus_prev = None;
+        if !rself.poll_cpus.is_empty() {
+            cpus_prev = crate::affinity::current_cpus();
+            crate::affinity::pin_current(&rself.poll_cpus)?;
+        }
+        let sig_sock = match rself.init_sig_socket(py, poll.registry()) {
+            Ok(socks) => socks,
+            Err(err) => {
+                if let Some(cpus) = cpus_prev {
+                    _ = crate::affinity::pin_current(&cpus);
+                }
+                return Err(err.into());
+            }
+        };
         let mut events = event::Events::with_capacity(128);
+        let n = rself.threads_cb;
+        let n_min = rself.threads_cb_min;
         let mut state = RuntimeState {
             buf: vec![0; 4096].into_boxed_slice(),
+            clock: rself.clock(),
             io: poll,
+            io_drivers: Vec::with_capacity(rself.io_drivers_n),
             sig_sock,
+            runtime: pyself.clone_ref(py),
+            threads_cvar: Arc::new((Mutex::new(n_min), Condvar::new())),
+            cpus_prev,
         };
 
+        //: worker slots are pinned round-robin over the given CPUs, I/O drivers follow their paired worker
+        let cpus: Vec<Option<usize>> = (0..n)
+            .map(|idx| (!rself.worker_cpus.is_empty()).then(|| rself.worker_cpus[idx % rself.worker_cpus.len()]))
+            .collect();
+
+        if !drivers.is_empty() {
+            let drivers = Arc::new(drivers);
+            for (idx, poll) in drivers_poll.into_iter().enumerate() {
+                let runtime = pyself.clone_ref(py);
+                let drivers = drivers.clone();
+                let cpu = cpus[idx % n];
+                state
+                    .io_drivers
+                    .push(thread::spawn(move || driver_loop(runtime, drivers, idx, cpu, poll)));
+            }
+            rself.io_drivers.swap(Some(drivers));
+        }
+
         rself.io_registry.swap(Some(Arc::new(registry)));
         rself.waker.swap(Some(Arc::new(waker)));
 
-        let n = rself.threads_cb;
         let mut workers = Vec::with_capacity(n);
         let mut parkers = Vec::with_capacity(n);
         let mut stealers = Vec::with_capacity(n);
@@ -540,15 +735,31 @@ impl Runtime {
             parkers.push(parker);
             idle_flags.push(atomic::AtomicBool::new(false));
         }
-        let schedule = Arc::new(WorkSchedule::new(stealers, unparkers, idle_flags));
+        //: slots over the minimum pool size start with no thread attached
+        let spares: Vec<_> = workers
+            .drain(n_min..)
+            .zip(parkers.drain(n_min..))
+            .enumerate()
+            .map(|(idx, (worker, parker))| (n_min + idx, worker, parker))
+            .collect();
+        let schedule = Arc::new(WorkSchedule::new(
+            stealers,
+            unparkers,
+            idle_flags,
+            rself.steal_batch,
+            rself.coop_budget,
+            rself.spin,
+            spares,
+            Duration::from_secs(rself.threads_cb_timeout),
+            cpus,
+        ));
         rself.work_stopping.store(false, atomic::Ordering::Release);
         rself.work_schedule.swap(Some(schedule.clone()));
 
-        let threads_cb_cvar = Arc::new((Mutex::new(n), Condvar::new()));
         for (idx, (worker, parker)) in workers.into_iter().zip(parkers).enumerate() {
             let runtime = pyself.clone_ref(py);
             let schedule = schedule.clone();
-            let cvar = threads_cb_cvar.clone();
+            let cvar = state.threads_cvar.clone();
             thread::spawn(move || work_loop(schedule, runtime, idx, worker, parker, cvar));
         }
 
@@ -563,12 +774,12 @@ impl Runtime {
                     }
                     break;
                 }
-                rself.teardown(py, &mut state, threads_cb_cvar);
+                rself.teardown(py, &mut state);
                 return Err(err.into());
             }
         }
 
-        rself.teardown(py, &mut state, threads_cb_cvar);
+        rself.teardown(py, &mut state);
         // rself.stopping.store(false, atomic::Ordering::Release);
         Ok(())
     }
@@ -1,52 +1,475 @@
+use crossbeam_utils::CachePadded;
 use pyo3::prelude::*;
-use std::cmp::Ordering;
+use std::{
+    cell::Cell,
+    sync::{Mutex, atomic},
+    time::Duration,
+};
 
 use crate::events::Suspension;
 use crate::handles::Handle;
+use crate::work::LOCAL_WORKER_IDX;
+
+//: hierarchical timing wheel
+//  `LEVELS` levels of `SLOTS` slots each: slots at level `n` span `SLOTS^n` ticks, so the wheel
+//  covers `SLOTS^LEVELS` ticks (~19 hours with µs ticks). Timers further in the future are
+//  parked in the top level slots and cascaded again when their slot gets processed.
+const LEVELS: usize = 6;
+const LEVEL_BITS: u32 = 6;
+const SLOTS: usize = 1 << LEVEL_BITS;
+const MAX_TICKS: u64 = (1 << (LEVEL_BITS * LEVELS as u32)) - 1;
+//: list index for entries already expired at insertion/cascade time
+const PENDING: usize = LEVELS;
+const NIL: u32 = u32::MAX;
+
+//: opaque timer reference, packing the entry index, the shard index and the entry generation.
+//  `0` is never a valid key, so it can be used as a "no timer" marker.
+pub(crate) type TimerKey = u64;
+
+const KEY_SHARD_SHIFT: u32 = 32;
+const KEY_GEN_SHIFT: u32 = 40;
+const KEY_GEN_MASK: u32 = (1 << (64 - KEY_GEN_SHIFT)) - 1;
+const MAX_SHARDS: usize = 1 << (KEY_GEN_SHIFT - KEY_SHARD_SHIFT);
+
+#[inline(always)]
+fn key_pack(idx: u32, generation: u32) -> TimerKey {
+    (u64::from(generation) << KEY_GEN_SHIFT) | u64::from(idx)
+}
+
+#[inline(always)]
+#[allow(clippy::cast_possible_truncation)]
+fn key_unpack(key: TimerKey) -> (u32, u32) {
+    (key as u32, (key >> KEY_GEN_SHIFT) as u32)
+}
+
+#[inline(always)]
+#[allow(clippy::cast_possible_truncation)]
+fn key_shard(key: TimerKey) -> usize {
+    (key >> KEY_SHARD_SHIFT) as usize & (MAX_SHARDS - 1)
+}
 
 pub struct Timer {
-    pub(crate) when: u128,
     pub(crate) target: Suspension,
 }
 
-// impl Timer {
-//     fn new(target: SuspensionData, when: u128) -> Self {
-//         Self {
-//             when,
-//             target,
-//             cancelled: Arc::new(false.into()),
-//         }
-//     }
-// }
+impl Handle for Timer {
+    fn run(self: Box<Self>, py: Python, runtime: &Py<crate::runtime::Runtime>) {
+        //: the entry is already gone from the wheel, no need to cancel it on resume
+        self.target.clear_timer();
+        self.target.resume(py, runtime.get(), py.None(), 0);
+    }
+}
+
+struct TimerEntry {
+    when: u64,
+    generation: u32,
+    list: u8,
+    slot: u8,
+    prev: u32,
+    next: u32,
+    target: Option<Suspension>,
+}
+
+struct Expiration {
+    level: usize,
+    slot: usize,
+    deadline: u64,
+}
+
+//: entries are stored in a slab and linked in intrusive doubly-linked lists per slot,
+//  so both insertion and cancellation are O(1).
+pub(crate) struct TimerWheel {
+    elapsed: u64,
+    occupied: [u64; LEVELS],
+    slots: [[u32; SLOTS]; LEVELS],
+    pending: u32,
+    entries: Vec<TimerEntry>,
+    free: Vec<u32>,
+}
+
+impl TimerWheel {
+    pub fn new() -> Self {
+        Self {
+            elapsed: 0,
+            occupied: [0; LEVELS],
+            slots: [[NIL; SLOTS]; LEVELS],
+            pending: NIL,
+            entries: Vec::with_capacity(32),
+            free: Vec::with_capacity(32),
+        }
+    }
+
+    #[inline(always)]
+    fn level_for(elapsed: u64, when: u64) -> usize {
+        let masked = ((elapsed ^ when) | (SLOTS as u64 - 1)).min(MAX_TICKS);
+        let significant = 63 - masked.leading_zeros();
+        (significant / LEVEL_BITS) as usize
+    }
+
+    #[inline(always)]
+    #[allow(clippy::cast_possible_truncation)]
+    fn slot_for(when: u64, level: usize) -> usize {
+        (when >> (level as u32 * LEVEL_BITS)) as usize & (SLOTS - 1)
+    }
+
+    #[inline(always)]
+    fn head_mut(&mut self, list: usize, slot: usize) -> &mut u32 {
+        if list == PENDING {
+            &mut self.pending
+        } else {
+            &mut self.slots[list][slot]
+        }
+    }
+
+    fn link(&mut self, idx: u32) {
+        let when = self.entries[idx as usize].when;
+        let (list, slot) = if when <= self.elapsed {
+            (PENDING, 0)
+        } else {
+            let level = Self::level_for(self.elapsed, when);
+            (level, Self::slot_for(when, level))
+        };
+        let head = self.head_mut(list, slot);
+        let next = std::mem::replace(head, idx);
+        if list != PENDING {
+            self.occupied[list] |= 1u64 << slot;
+        }
+        if next != NIL {
+            self.entries[next as usize].prev = idx;
+        }
+        let entry = &mut self.entries[idx as usize];
+        #[allow(clippy::cast_possible_truncation)]
+        {
+            entry.list = list as u8;
+            entry.slot = slot as u8;
+        }
+        entry.prev = NIL;
+        entry.next = next;
+    }
+
+    fn unlink(&mut self, idx: u32) {
+        let entry = &self.entries[idx as usize];
+        let (list, slot, prev, next) = (entry.list as usize, entry.slot as usize, entry.prev, entry.next);
+        if prev == NIL {
+            *self.head_mut(list, slot) = next;
+            if next == NIL && list != PENDING {
+                self.occupied[list] &= !(1u64 << slot);
+            }
+        } else {
+            self.entries[prev as usize].next = next;
+        }
+        if next != NIL {
+            self.entries[next as usize].prev = prev;
+        }
+    }
+
+    fn release(&mut self, idx: u32) -> Option<Suspension> {
+        let entry = &mut self.entries[idx as usize];
+        //: bump generation so stale keys can't match the entry once reused
+        entry.generation = (entry.generation.wrapping_add(1) & KEY_GEN_MASK).max(1);
+        self.free.push(idx);
+        entry.target.take()
+    }
+
+    pub fn insert(&mut self, when: u64, target: Suspension) -> TimerKey {
+        let idx = if let Some(idx) = self.free.pop() {
+            let entry = &mut self.entries[idx as usize];
+            entry.when = when;
+            entry.target = Some(target);
+            idx
+        } else {
+            #[allow(clippy::cast_possible_truncation)]
+            let idx = self.entries.len() as u32;
+            self.entries.push(TimerEntry {
+                when,
+                generation: 1,
+                list: 0,
+                slot: 0,
+                prev: NIL,
+                next: NIL,
+                target: Some(target),
+            });
+            idx
+        };
+        self.link(idx);
+        key_pack(idx, self.entries[idx as usize].generation)
+    }
+
+    pub fn cancel(&mut self, key: TimerKey) -> bool {
+        let (idx, generation) = key_unpack(key);
+        match self.entries.get(idx as usize) {
+            Some(entry) if entry.generation == generation && entry.target.is_some() => {}
+            _ => return false,
+        }
+        self.unlink(idx);
+        self.release(idx);
+        true
+    }
+
+    //: number of registered timers, not yet fired nor cancelled
+    #[inline(always)]
+    pub fn active(&self) -> usize {
+        self.entries.len() - self.free.len()
+    }
+
+    fn level_expiration(&self, level: usize) -> Option<Expiration> {
+        let occupied = self.occupied[level];
+        if occupied == 0 {
+            return None;
+        }
+        let slot_range = 1u64 << (level as u32 * LEVEL_BITS);
+        let level_range = slot_range << LEVEL_BITS;
+        #[allow(clippy::cast_possible_truncation)]
+        let now_slot = (self.elapsed / slot_range) as usize % SLOTS;
+        #[allow(clippy::cast_possible_truncation)]
+        let slot = (occupied.rotate_right(now_slot as u32).trailing_zeros() as usize + now_slot) % SLOTS;
+        let mut deadline = (self.elapsed & !(level_range - 1)) + slot as u64 * slot_range;
+        if deadline <= self.elapsed {
+            //: only happens in the top level, which acts as a ring buffer for distant timers
+            deadline += level_range;
+        }
+        Some(Expiration { level, slot, deadline })
+    }
+
+    #[inline]
+    fn first_expiration(&self) -> Option<Expiration> {
+        (0..LEVELS).find_map(|level| self.level_expiration(level))
+    }
 
-impl PartialEq for Timer {
-    fn eq(&self, _other: &Self) -> bool {
-        false
+    //: move the wheel forward when it's empty, so new entries don't need to cascade
+    //  from a stale position
+    #[inline]
+    fn advance_idle(&mut self, now: u64) {
+        if self.pending == NIL && self.occupied.iter().all(|level| *level == 0) {
+            self.elapsed = self.elapsed.max(now);
+        }
+    }
+
+    //: the tick at which the wheel needs to be polled again.
+    //  NOTE: for higher levels this is the start of the slot, which might precede the actual
+    //        timer deadline: polling there just cascades the entries down the wheel.
+    pub fn next_expiration(&self) -> Option<u64> {
+        if self.pending != NIL {
+            return Some(self.elapsed);
+        }
+        self.first_expiration().map(|exp| exp.deadline)
+    }
+
+    fn process_expiration(&mut self, exp: &Expiration) {
+        self.elapsed = self.elapsed.max(exp.deadline);
+        let mut idx = std::mem::replace(&mut self.slots[exp.level][exp.slot], NIL);
+        self.occupied[exp.level] &= !(1u64 << exp.slot);
+        while idx != NIL {
+            let next = self.entries[idx as usize].next;
+            self.link(idx);
+            idx = next;
+        }
+    }
+
+    //: advance the wheel up to `now`, calling `f` for every expired timer
+    pub fn poll<F: FnMut(Suspension)>(&mut self, now: u64, mut f: F) {
+        loop {
+            while self.pending != NIL {
+                let idx = self.pending;
+                self.unlink(idx);
+                if let Some(target) = self.release(idx) {
+                    f(target);
+                }
+            }
+            match self.first_expiration() {
+                Some(exp) if exp.deadline <= now => self.process_expiration(&exp),
+                _ => break,
+            }
+        }
+        self.elapsed = self.elapsed.max(now);
     }
 }
 
-impl Eq for Timer {}
+struct TimerShard {
+    wheel: Mutex<TimerWheel>,
+    deadline: atomic::AtomicU64,
+}
 
-impl PartialOrd for Timer {
-    fn partial_cmp(&self, other: &Self) -> Option<Ordering> {
-        Some(self.cmp(other))
+impl TimerShard {
+    #[inline(always)]
+    fn sync_deadline(&self, wheel: &TimerWheel) -> u64 {
+        let deadline = wheel.next_expiration().unwrap_or(u64::MAX);
+        self.deadline.store(deadline, atomic::Ordering::SeqCst);
+        deadline
     }
 }
 
-impl Ord for Timer {
-    fn cmp(&self, other: &Self) -> Ordering {
-        if self.when < other.when {
-            return Ordering::Greater;
+//: timers are sharded per worker thread, so registrations from different workers never contend
+//  on the same lock. Every shard publishes its next deadline into an atomic, and the poll thread
+//  publishes the deadline it's going to sleep until: registering threads compare against it
+//  to decide whether the poll thread needs to be woken up.
+//  Deadlines are expressed in ticks of `resolution` µs: timers sharing a tick land in the same
+//  level-0 slot and fire together as a batch.
+pub(crate) struct TimerShards {
+    shards: Box<[CachePadded<TimerShard>]>,
+    poll_deadline: CachePadded<atomic::AtomicU64>,
+    resolution: u64,
+}
+
+impl TimerShards {
+    pub fn new(size: usize, resolution: u64) -> Self {
+        let shards = (0..size.clamp(1, MAX_SHARDS))
+            .map(|_| {
+                CachePadded::new(TimerShard {
+                    wheel: Mutex::new(TimerWheel::new()),
+                    deadline: atomic::AtomicU64::new(u64::MAX),
+                })
+            })
+            .collect();
+        Self {
+            shards,
+            poll_deadline: CachePadded::new(atomic::AtomicU64::new(u64::MAX)),
+            resolution: resolution.max(1),
         }
-        if self.when > other.when {
-            return Ordering::Less;
+    }
+
+    #[inline(always)]
+    pub fn is_coarse(&self) -> bool {
+        self.resolution > 1
+    }
+
+    #[inline(always)]
+    fn local_shard(&self) -> usize {
+        let idx = LOCAL_WORKER_IDX.with(Cell::get);
+        if idx < self.shards.len() { idx } else { 0 }
+    }
+
+    //: returns the timer key, and whether the poll thread should be woken up
+    //  NOTE: deadlines are rounded up to the next tick, so timers never fire early.
+    pub fn insert(&self, now: u64, when: u64, target: Suspension) -> (TimerKey, bool) {
+        let idx = self.local_shard();
+        let shard = &self.shards[idx];
+        let (key, deadline) = {
+            let mut wheel = shard.wheel.lock().unwrap();
+            wheel.advance_idle(now / self.resolution);
+            let key = wheel.insert(when.div_ceil(self.resolution), target);
+            (key, shard.sync_deadline(&wheel))
+        };
+        //: only the registration lowering the published deadline needs to wake the poll thread
+        let wake = self.poll_deadline.fetch_min(deadline, atomic::Ordering::SeqCst) > deadline;
+        (key | ((idx as u64) << KEY_SHARD_SHIFT), wake)
+    }
+
+    pub fn cancel(&self, key: TimerKey) {
+        if let Some(shard) = self.shards.get(key_shard(key)) {
+            let mut wheel = shard.wheel.lock().unwrap();
+            if wheel.cancel(key) {
+                shard.sync_deadline(&wheel);
+            }
+        }
+    }
+
+    pub fn active(&self) -> usize {
+        self.shards
+            .iter()
+            .map(|shard| shard.wheel.lock().unwrap().active())
+            .sum()
+    }
+
+    #[inline(always)]
+    fn scan(&self) -> u64 {
+        self.shards
+            .iter()
+            .map(|shard| shard.deadline.load(atomic::Ordering::SeqCst))
+            .min()
+            .unwrap_or(u64::MAX)
+    }
+
+    //: compute and publish the next deadline (in µs) the poll thread should wake up at.
+    //  NOTE: a registration racing with the first scan either sees the published value and wakes us,
+    //        or gets observed by the second scan.
+    pub fn next_deadline(&self) -> Option<u64> {
+        let mut deadline = self.scan();
+        self.poll_deadline.store(deadline, atomic::Ordering::SeqCst);
+        let rescan = self.scan();
+        if rescan < deadline {
+            deadline = rescan;
+            self.poll_deadline.store(deadline, atomic::Ordering::SeqCst);
+        }
+        (deadline != u64::MAX).then(|| deadline.saturating_mul(self.resolution))
+    }
+
+    //: fire expired timers from all the shards due at `now`
+    pub fn poll<F: FnMut(Suspension)>(&self, now: u64, mut f: F) {
+        let now = now / self.resolution;
+        for shard in &self.shards {
+            if shard.deadline.load(atomic::Ordering::Acquire) > now {
+                continue;
+            }
+            let mut wheel = shard.wheel.lock().unwrap();
+            wheel.poll(now, &mut f);
+            shard.sync_deadline(&wheel);
         }
-        Ordering::Equal
     }
 }
 
-impl Handle for Timer {
-    fn run(self: Box<Self>, py: Python, runtime: &Py<crate::runtime::Runtime>, _state: &mut crate::work::WorkerState) {
-        self.target.resume(py, runtime.get(), py.None(), 0);
+#[cfg(target_os = "linux")]
+fn clock_read(clock: libc::clockid_t) -> Option<Duration> {
+    let mut ts = libc::timespec { tv_sec: 0, tv_nsec: 0 };
+    if unsafe { libc::clock_gettime(clock, &raw mut ts) } != 0 {
+        return None;
+    }
+    Some(Duration::new(
+        u64::try_from(ts.tv_sec).ok()?,
+        u32::try_from(ts.tv_nsec).ok()?,
+    ))
+}
+
+#[cfg(target_os = "linux")]
+fn coarse_clock_params() -> Option<(Duration, Duration)> {
+    let mut res = libc::timespec { tv_sec: 0, tv_nsec: 0 };
+    if unsafe { libc::clock_getres(libc::CLOCK_MONOTONIC_COARSE, &raw mut res) } != 0 {
+        return None;
+    }
+    let res = Duration::new(u64::try_from(res.tv_sec).ok()?, u32::try_from(res.tv_nsec).ok()?);
+    Some((clock_read(libc::CLOCK_MONOTONIC)?, res))
+}
+
+#[cfg(not(target_os = "linux"))]
+fn coarse_clock_params() -> Option<(Duration, Duration)> {
+    None
+}
+
+#[cfg(target_os = "linux")]
+#[inline(always)]
+fn coarse_clock_read() -> Duration {
+    clock_read(libc::CLOCK_MONOTONIC_COARSE).unwrap_or_default()
+}
+
+#[cfg(not(target_os = "linux"))]
+#[inline(always)]
+fn coarse_clock_read() -> Duration {
+    Duration::ZERO
+}
+
+//: a cheaper clock for timer registrations in coarse mode.
+//  It reads the kernel's per-tick cached monotonic time (`CLOCK_MONOTONIC_COARSE`), which shares
+//  its base with `Instant`, thus lagging behind the precise clock by at most its resolution.
+//  `slack` accounts for such lag, so deadlines computed over it never fire early.
+pub(crate) struct CoarseClock {
+    epoch: Duration,
+    pub slack: u64,
+}
+
+impl CoarseClock {
+    //: NOTE: should be called right after taking the runtime `Instant` epoch
+    pub fn new() -> Option<Self> {
+        let (epoch, res) = coarse_clock_params()?;
+        #[allow(clippy::cast_possible_truncation)]
+        Some(Self {
+            epoch,
+            slack: res.as_micros() as u64 + 1,
+        })
+    }
+
+    #[inline(always)]
+    #[allow(clippy::cast_possible_truncation)]
+    pub fn now(&self) -> u64 {
+        coarse_clock_read().saturating_sub(self.epoch).as_micros() as u64
     }
 }
@@ -1,6 +1,7 @@
 use std::{
     cell::Cell,
     sync::{Arc, Condvar, Mutex, atomic},
+    time::{Duration, Instant},
 };
 
 use crossbeam_deque::{Injector, Steal, Stealer, Worker};
@@ -10,16 +11,115 @@ use pyo3::{Py, Python};
 use crate::handles::BoxedHandle;
 use crate::runtime::Runtime;
 
+//: max number of consecutive runs from the LIFO slot, to avoid starving other work
+const MAX_LIFO_POLLS: usize = 3;
+//: busy-wait hints between scans while spinning for work
+const SPIN_HINTS: usize = 64;
+//: wakeups within this window from parking make idle workers spin again
+const SPIN_REWARM: Duration = Duration::from_micros(200);
+//: global backlog over which an elastic pool spawns a new worker, if none is idle
+const GROW_BACKLOG: usize = 64;
+const READ_BUF_SIZE: usize = 262_144;
+
 thread_local! {
-    pub(crate) static LOCAL_WORKER: Cell<*const Worker<BoxedHandle>> = const { Cell::new(std::ptr::null()) };
+    pub(crate) static LOCAL_WORKER: Cell<*const LocalQueue> = const { Cell::new(std::ptr::null()) };
+    pub(crate) static LOCAL_WORKER_IDX: Cell<usize> = const { Cell::new(usize::MAX) };
+    static COOP_BUDGET: Cell<usize> = const { Cell::new(usize::MAX) };
+    static READ_BUF: Cell<Option<Box<[u8]>>> = const { Cell::new(None) };
+}
+
+//: run `f` with (up to `size` bytes of) the worker read buffer.
+//  Off-worker, or on re-entrant calls, a temporary buffer gets allocated instead.
+pub(crate) fn with_read_buf<R>(size: usize, f: impl FnOnce(&mut [u8]) -> R) -> R {
+    match READ_BUF.with(Cell::take) {
+        Some(mut buf) => {
+            let len = size.min(buf.len());
+            let ret = f(&mut buf[..len]);
+            READ_BUF.with(|c| c.set(Some(buf)));
+            ret
+        }
+        None => f(&mut vec![0; size]),
+    }
+}
+
+//: cooperative scheduling budget.
+//  Every handle run on a worker gets `coop_budget` ready operations (I/O readiness found
+//  cached, waits on already set events); once exhausted, such operations force the coroutine
+//  to suspend, and wakeups bypass the worker-local queues, so that a coroutine which never
+//  hits a pending resource cannot starve the other work queued on the same worker.
+//  Outside workers the budget is unlimited.
+#[inline(always)]
+pub(crate) fn coop_consume() -> bool {
+    COOP_BUDGET.with(|c| {
+        let budget = c.get();
+        if budget == 0 {
+            return false;
+        }
+        c.set(budget - 1);
+        true
+    })
+}
+
+#[inline(always)]
+pub(crate) fn coop_exhausted() -> bool {
+    COOP_BUDGET.with(Cell::get) == 0
+}
+
+#[inline(always)]
+fn coop_reset(budget: usize) {
+    COOP_BUDGET.with(|c| c.set(budget));
+}
+
+//: worker-owned queues.
+//  The LIFO slot holds the most recently scheduled handle from the worker thread itself, so that
+//  a coroutine woken by the one that just ran gets picked up next on the same thread.
+//  Unlike the deque, the slot cannot be stolen by other workers.
+pub(crate) struct LocalQueue {
+    worker: Worker<BoxedHandle>,
+    lifo: Cell<Option<BoxedHandle>>,
+}
+
+impl LocalQueue {
+    fn new(worker: Worker<BoxedHandle>) -> Self {
+        Self {
+            worker,
+            lifo: Cell::new(None),
+        }
+    }
+
+    //: returns `true` if the push made work available to stealers
+    #[inline]
+    pub fn push(&self, handle: BoxedHandle) -> bool {
+        match self.lifo.replace(Some(handle)) {
+            Some(prev) => {
+                self.worker.push(prev);
+                true
+            }
+            None => false,
+        }
+    }
 }
 
 pub(crate) struct WorkSchedule {
     stealers: Vec<Stealer<BoxedHandle>>,
+    //: per-worker injectors, used to route I/O wakeups to the worker which last polled the resource
+    inboxes: Vec<Injector<BoxedHandle>>,
     pub unparkers: Vec<Unparker>,
     idle_flags: Vec<atomic::AtomicBool>,
     idle_count: atomic::AtomicUsize,
     speculation: atomic::AtomicUsize,
+    steal_batch: usize,
+    coop_budget: usize,
+    spin: usize,
+    //: elastic pool: slots over `threads_min` might have no thread attached,
+    //  their queues are parked here until a new thread is spawned for them
+    spares: Mutex<Vec<(usize, Worker<BoxedHandle>, Parker)>>,
+    active: atomic::AtomicUsize,
+    threads_min: usize,
+    idle_ttl: Option<Duration>,
+    //: per-worker CPU pinning and sibling visit order for stealing
+    cpus: Vec<Option<usize>>,
+    steal_order: Vec<Vec<usize>>,
 }
 
 impl WorkSchedule {
@@ -27,13 +127,30 @@ impl WorkSchedule {
         stealers: Vec<Stealer<BoxedHandle>>,
         unparkers: Vec<Unparker>,
         idle_flags: Vec<atomic::AtomicBool>,
+        steal_batch: usize,
+        coop_budget: usize,
+        spin: usize,
+        spares: Vec<(usize, Worker<BoxedHandle>, Parker)>,
+        idle_ttl: Duration,
+        cpus: Vec<Option<usize>>,
     ) -> Self {
+        let threads_min = stealers.len() - spares.len();
         Self {
+            steal_order: crate::affinity::steal_order(&cpus),
+            cpus,
+            inboxes: stealers.iter().map(|_| Injector::new()).collect(),
             stealers,
             unparkers,
             idle_flags,
             idle_count: atomic::AtomicUsize::new(0),
             speculation: atomic::AtomicUsize::new(0),
+            steal_batch: steal_batch.max(1),
+            coop_budget: if coop_budget == 0 { usize::MAX } else { coop_budget },
+            spin,
+            idle_ttl: if spares.is_empty() { None } else { Some(idle_ttl) },
+            spares: Mutex::new(spares),
+            active: atomic::AtomicUsize::new(threads_min),
+            threads_min,
         }
     }
 
@@ -81,6 +198,59 @@ impl WorkSchedule {
         self.wake_idle();
     }
 
+    //: push work to a specific worker, waking it if parked.
+    //  If the worker is busy, it will find the handle on its next scan, unless some other
+    //  idle worker steals it first.
+    pub fn push_to(&self, idx: usize, handle: BoxedHandle) {
+        self.inboxes[idx].push(handle);
+        self.speculation.fetch_add(1, atomic::Ordering::AcqRel);
+        if self.idle_flags[idx]
+            .compare_exchange(true, false, atomic::Ordering::AcqRel, atomic::Ordering::Relaxed)
+            .is_ok()
+        {
+            self.idle_count.fetch_sub(1, atomic::Ordering::AcqRel);
+            self.unparkers[idx].unpark();
+            return;
+        }
+        self.speculation.fetch_sub(1, atomic::Ordering::AcqRel);
+        self.unpark_one();
+    }
+
+    #[inline(always)]
+    pub fn size(&self) -> usize {
+        self.stealers.len()
+    }
+
+    //: whether the pool should grow: every running worker is busy and the backlog is piling up
+    #[inline(always)]
+    pub fn should_grow(&self, injector: &Injector<BoxedHandle>) -> bool {
+        self.idle_ttl.is_some()
+            && self.idle_count.load(atomic::Ordering::Acquire) == 0
+            && self.active.load(atomic::Ordering::Acquire) < self.stealers.len()
+            && injector.len() > GROW_BACKLOG
+    }
+
+    pub fn take_spare(&self) -> Option<(usize, Worker<BoxedHandle>, Parker)> {
+        let spare = self.spares.lock().unwrap().pop();
+        if spare.is_some() {
+            self.active.fetch_add(1, atomic::Ordering::AcqRel);
+        }
+        spare
+    }
+
+    //: reserve the retirement of a worker, keeping at least `threads_min` running
+    fn try_retire(&self) -> bool {
+        self.active
+            .fetch_update(atomic::Ordering::AcqRel, atomic::Ordering::Acquire, |active| {
+                (active > self.threads_min).then(|| active - 1)
+            })
+            .is_ok()
+    }
+
+    fn put_spare(&self, idx: usize, worker: Worker<BoxedHandle>, parker: Parker) {
+        self.spares.lock().unwrap().push((idx, worker, parker));
+    }
+
     #[inline(always)]
     fn wake_idle(&self) {
         for (i, flag) in self.idle_flags.iter().enumerate() {
@@ -97,39 +267,109 @@ impl WorkSchedule {
     }
 }
 
-pub struct WorkerState {
-    pub read_buf: Box<[u8]>,
+//: steal a batch of handles from the given injector into the local queue, returning one of them
+#[inline(always)]
+fn steal_from(injector: &Injector<BoxedHandle>, local: &LocalQueue, batch: usize) -> Option<BoxedHandle> {
+    loop {
+        match injector.steal_batch_with_limit_and_pop(&local.worker, batch) {
+            Steal::Success(handle) => return Some(handle),
+            Steal::Retry => {}
+            Steal::Empty => return None,
+        }
+    }
 }
 
 pub(crate) fn find_work(
-    worker: &Worker<BoxedHandle>,
-    injector: &Injector<BoxedHandle>,
-    stealers: &[Stealer<BoxedHandle>],
+    local: &LocalQueue,
+    runtime: &Runtime,
+    schedule: &WorkSchedule,
     idx: usize,
 ) -> Option<BoxedHandle> {
-    if let Some(handle) = worker.pop() {
+    if let Some(handle) = local.worker.pop() {
         return Some(handle);
     }
-
-    loop {
-        match injector.steal() {
-            Steal::Success(handle) => return Some(handle),
-            Steal::Retry => {}
-            Steal::Empty => break,
-        }
+    let batch = schedule.steal_batch;
+    if let Some(handle) = steal_from(&schedule.inboxes[idx], local, batch) {
+        return Some(handle);
     }
-    for (i, stealer) in stealers.iter().enumerate() {
-        if i == idx {
-            continue;
-        }
+    if let Some(handle) = steal_from(&runtime.work_injector, local, batch) {
+        //: we're draining the global backlog, check whether the pool should grow.
+        //  Producers don't, to keep the backlog length off the scheduling path.
+        runtime.maybe_grow_workers(schedule);
+        return Some(handle);
+    }
+    let siblings = &schedule.steal_order[idx];
+    for &sibling in siblings {
         loop {
-            match stealer.steal() {
+            match schedule.stealers[sibling].steal_batch_with_limit_and_pop(&local.worker, batch) {
                 Steal::Success(handle) => return Some(handle),
                 Steal::Retry => {}
                 Steal::Empty => break,
             }
         }
     }
+    //: last resort: I/O work routed to busy siblings
+    for &sibling in siblings {
+        if let Some(handle) = steal_from(&schedule.inboxes[sibling], local, batch) {
+            return Some(handle);
+        }
+    }
+    None
+}
+
+//: adaptive spin: reset to the maximum when spinning finds work, halved (down to none) when we end up
+//  parking, and doubled back on wakeups coming soon after parking, so that workers keep spinning only
+//  while wakeups are frequent
+struct SpinBudget {
+    max: usize,
+    rounds: usize,
+}
+
+impl SpinBudget {
+    fn new(max: usize) -> Self {
+        Self { max, rounds: max }
+    }
+
+    #[inline(always)]
+    fn found(&mut self) {
+        self.rounds = self.max;
+    }
+
+    #[inline(always)]
+    fn missed(&mut self) {
+        self.rounds /= 2;
+    }
+
+    #[inline(always)]
+    fn woken(&mut self, parked: Duration) {
+        if parked < SPIN_REWARM {
+            self.rounds = (self.rounds * 2).max(1).min(self.max);
+        }
+    }
+}
+
+//: spin, then yield, scanning for work up to `rounds` times
+#[inline]
+fn spin_for_work(
+    py: Python,
+    local: &LocalQueue,
+    runtime: &Runtime,
+    schedule: &WorkSchedule,
+    idx: usize,
+    rounds: usize,
+) -> Option<BoxedHandle> {
+    for round in 0..rounds {
+        if round < rounds / 2 {
+            for _ in 0..SPIN_HINTS {
+                std::hint::spin_loop();
+            }
+        } else {
+            py.detach(std::thread::yield_now);
+        }
+        if let Some(handle) = find_work(local, runtime, schedule, idx) {
+            return Some(handle);
+        }
+    }
     None
 }
 
@@ -142,24 +382,45 @@ pub(crate) fn work_loop(
     mut parker: Parker,
     cond: Arc<(Mutex<usize>, Condvar)>,
 ) {
-    LOCAL_WORKER.with(|c| c.set(&raw const worker));
-    let mut state = WorkerState {
-        read_buf: vec![0; 262_144].into_boxed_slice(),
-    };
+    if let Some(cpu) = scheduler.cpus[idx] {
+        _ = crate::affinity::pin_current(&[cpu]);
+    }
+    let local = LocalQueue::new(worker);
+    LOCAL_WORKER.with(|c| c.set(&raw const local));
+    LOCAL_WORKER_IDX.with(|c| c.set(idx));
+    READ_BUF.with(|c| c.set(Some(vec![0; READ_BUF_SIZE].into_boxed_slice())));
+
+    let mut retired = false;
 
     Python::attach(|py| {
         let rself = runtime.get();
         let mut is_speculating = false;
+        let mut lifo_polls = 0;
+        let budget = scheduler.coop_budget;
+        let mut spin = SpinBudget::new(scheduler.spin);
 
         loop {
-            if let Some(handle) = find_work(&worker, &rself.work_injector, &scheduler.stealers, idx) {
+            //: the LIFO slot gets priority, up to `MAX_LIFO_POLLS` in a row
+            if let Some(handle) = local.lifo.take() {
+                if lifo_polls < MAX_LIFO_POLLS {
+                    lifo_polls += 1;
+                    coop_reset(budget);
+                    handle.run(py, &runtime);
+                    continue;
+                }
+                rself.defer_handle(handle);
+            }
+            lifo_polls = 0;
+
+            if let Some(handle) = find_work(&local, rself, &scheduler, idx) {
                 if is_speculating {
                     is_speculating = false;
                     if scheduler.speculation.fetch_sub(1, atomic::Ordering::AcqRel) == 1 {
                         scheduler.unpark_one();
                     }
                 }
-                handle.run(py, &runtime, &mut state);
+                coop_reset(budget);
+                handle.run(py, &runtime);
                 continue;
             }
             if rself.work_stopping.load(atomic::Ordering::Acquire) {
@@ -169,9 +430,27 @@ pub(crate) fn work_loop(
                 break;
             }
 
+            //: before advertising as idle, spin for a while: park/unpark cycles cost syscalls,
+            //  which under request/response traffic might exceed the wait for the next handle
+            if spin.rounds > 0 {
+                if let Some(handle) = spin_for_work(py, &local, rself, &scheduler, idx, spin.rounds) {
+                    spin.found();
+                    if is_speculating {
+                        is_speculating = false;
+                        if scheduler.speculation.fetch_sub(1, atomic::Ordering::AcqRel) == 1 {
+                            scheduler.unpark_one();
+                        }
+                    }
+                    coop_reset(budget);
+                    handle.run(py, &runtime);
+                    continue;
+                }
+                spin.missed();
+            }
+
             //: nothing to run: advertise as idle and re-scan
             scheduler.set_idle(idx);
-            if let Some(handle) = find_work(&worker, &rself.work_injector, &scheduler.stealers, idx) {
+            if let Some(handle) = find_work(&local, rself, &scheduler, idx) {
                 if !scheduler.clear_idle(idx) {
                     //: a producer claimed our idle flag while we were scanning:
                     //  absorb the speculation token here
@@ -183,7 +462,8 @@ pub(crate) fn work_loop(
                         scheduler.unpark_one();
                     }
                 }
-                handle.run(py, &runtime, &mut state);
+                coop_reset(budget);
+                handle.run(py, &runtime);
                 continue;
             }
             if rself.work_stopping.load(atomic::Ordering::Acquire) {
@@ -213,12 +493,18 @@ pub(crate) fn work_loop(
                         //: as before, absorb the speculation token if the flag was claimed
                         scheduler.speculation.fetch_sub(1, atomic::Ordering::AcqRel);
                     }
-                    handle.run(py, &runtime, &mut state);
+                    coop_reset(budget);
+                    handle.run(py, &runtime);
                     continue;
                 }
             }
+            let idle_ttl = scheduler.idle_ttl;
+            let parked_at = Instant::now();
             parker = py.detach(move || {
-                parker.park();
+                match idle_ttl {
+                    Some(ttl) => parker.park_timeout(ttl),
+                    None => parker.park(),
+                }
                 parker
             });
 
@@ -230,15 +516,86 @@ pub(crate) fn work_loop(
             if rself.work_stopping.load(atomic::Ordering::Acquire) {
                 break;
             }
+            //: idle for the whole TTL: retire, unless we're needed to keep the pool at its minimum size
+            let parked = parked_at.elapsed();
+            if !claimed && idle_ttl.is_some_and(|ttl| parked >= ttl) && scheduler.try_retire() {
+                if let Some(handle) = local.lifo.take() {
+                    rself.defer_handle(handle);
+                }
+                while let Some(handle) = local.worker.pop() {
+                    rself.defer_handle(handle);
+                }
+                //: I/O wakeups routed to us before retiring; later ones get stolen by siblings
+                loop {
+                    match scheduler.inboxes[idx].steal() {
+                        Steal::Success(handle) => rself.defer_handle(handle),
+                        Steal::Retry => {}
+                        Steal::Empty => break,
+                    }
+                }
+                retired = true;
+                break;
+            }
+            if claimed {
+                spin.woken(parked);
+            }
             is_speculating = claimed;
         }
 
         LOCAL_WORKER.with(|c| c.set(std::ptr::null()));
+        LOCAL_WORKER_IDX.with(|c| c.set(usize::MAX));
+        coop_reset(usize::MAX);
+        drop(READ_BUF.with(Cell::take));
+        drop(local.lifo.take());
         drop(runtime);
     });
 
+    //: hand the queues back to the pool, for the next thread spawned in this slot
+    if retired {
+        scheduler.put_spare(idx, local.worker, parker);
+    }
+
     let (lock, cvar) = &*cond;
     let mut pending = lock.lock().unwrap();
     *pending -= 1;
     cvar.notify_one();
 }
+
+#[cfg(test)]
+mod tests {
+    use std::time::Duration;
+
+    use super::{SPIN_REWARM, SpinBudget};
+
+    #[test]
+    fn spin_budget_decays_to_zero() {
+        let mut spin = SpinBudget::new(8);
+        for expected in [4, 2, 1, 0, 0] {
+            spin.missed();
+            assert_eq!(spin.rounds, expected);
+        }
+        spin.found();
+        assert_eq!(spin.rounds, 8);
+    }
+
+    #[test]
+    fn spin_budget_regrows_on_quick_wakeups() {
+        let mut spin = SpinBudget::new(8);
+        for _ in 0..4 {
+            spin.missed();
+        }
+        spin.woken(SPIN_REWARM);
+        assert_eq!(spin.rounds, 0);
+        for expected in [1, 2, 4, 8, 8] {
+            spin.woken(Duration::ZERO);
+            assert_eq!(spin.rounds, expected);
+        }
+    }
+
+    #[test]
+    fn spin_budget_disabled() {
+        let mut spin = SpinBudget::new(0);
+        spin.woken(Duration::ZERO);
+        assert_eq!(spin.rounds, 0);
+    }
+}
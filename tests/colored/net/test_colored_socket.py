@@ -1,3 +1,5 @@
+import socket as stdlib_socket
+
 from tonio.colored import spawn
 from tonio.colored.net import socket
 
@@ -73,3 +75,157 @@ def test_socket_accept_send(run):
 
     run(server())
     assert state['data'] == b'a' * _SIZE
+
+
+def test_socket_recv_over_budget(run):
+    #: small reads on a socket with plenty of buffered data exceed the coop budget
+    size = 64 * 1024
+    state = {'data': b'', 'ticked': None}
+
+    async def ticker():
+        state['ticked'] = len(state['data'])
+
+    async def server():
+        sock = socket.socket()
+
+        with sock:
+            await sock.bind(('127.0.0.1', 0))
+            sock.listen()
+
+            task = spawn(client(sock.getsockname()))
+
+            client_sock, _ = await sock.accept()
+            with client_sock:
+                await task
+                #: spawned from this worker, the ticker lands in its LIFO slot, which can't be stolen:
+                #  it only runs before the reads complete if the budget makes the server yield the worker
+                spawn(ticker())
+                while len(state['data']) < size:
+                    state['data'] += await client_sock.recv(64)
+
+    async def client(addr):
+        sock = socket.socket()
+        with sock:
+            await sock.connect(addr)
+            await _send_all(sock, b'a' * size)
+
+    run(server())
+    assert state['data'] == b'a' * size
+    assert state['ticked'] is not None
+    assert state['ticked'] < size
+
+
+def test_socket_recv_into(run):
+    async def server():
+        sock = socket.socket()
+
+        with sock:
+            await sock.bind(('127.0.0.1', 0))
+            sock.listen()
+
+            task = spawn(client(sock.getsockname()))
+
+            client_sock, _ = await sock.accept()
+            with client_sock:
+                buf = bytearray(_SIZE)
+                view = memoryview(buf)
+                received = 0
+                while received < _SIZE:
+                    received += await client_sock.recv_into(view[received:])
+                await task
+
+        return buf
+
+    async def client(addr):
+        sock = socket.socket()
+        with sock:
+            await sock.connect(addr)
+            await _send_all(sock, b'a' * _SIZE)
+
+    data = run(server())
+    assert data == b'a' * _SIZE
+
+
+def test_socket_sendfile(run, tmp_path):
+    path = tmp_path / 'data'
+    path.write_bytes(b'a' * _SIZE + b'b' * _SIZE)
+
+    async def server():
+        sock = socket.socket()
+
+        with sock:
+            await sock.bind(('127.0.0.1', 0))
+            sock.listen()
+
+            task = spawn(client(sock.getsockname()))
+
+            client_sock, _ = await sock.accept()
+            with client_sock:
+                data = await _recv_all(client_sock, _SIZE)
+                await task
+
+        return data
+
+    async def client(addr):
+        sock = socket.socket()
+        with sock, open(path, 'rb') as f:
+            await sock.connect(addr)
+            sent = await sock.sendfile(f, _SIZE // 2, _SIZE)
+            assert sent == _SIZE
+            assert f.tell() == _SIZE // 2 + _SIZE
+
+    data = run(server())
+    assert data == b'a' * (_SIZE // 2) + b'b' * (_SIZE // 2)
+
+
+def test_socket_udp_many(run):
+    msgs = [b'a' * 16, b'b' * 512, b'c']
+
+    async def main():
+        rsock = socket.socket(type=stdlib_socket.SOCK_DGRAM)
+        ssock = socket.socket(type=stdlib_socket.SOCK_DGRAM)
+        with rsock, ssock:
+            await rsock.bind(('127.0.0.1', 0))
+            await ssock.bind(('127.0.0.1', 0))
+            addr = rsock.getsockname()
+
+            sent = await ssock.send_many([(msg, addr) for msg in msgs])
+            assert sent == len(msgs)
+
+            received = []
+            while len(received) < len(msgs):
+                received.extend(await rsock.recv_many(8, 1024))
+
+        return received, ssock.getsockname()
+
+    received, addr = run(main())
+    assert [data for data, _ in received] == msgs
+    assert all(src == addr for _, src in received)
+
+
+def test_socket_accept_many(run):
+    async def main():
+        sock = socket.socket()
+        clients = [socket.socket() for _ in range(3)]
+
+        with sock:
+            await sock.bind(('127.0.0.1', 0))
+            sock.listen()
+            for client in clients:
+                await client.connect(sock.getsockname())
+
+            accepted = []
+            while len(accepted) < len(clients):
+                accepted.extend(await sock.accept_many())
+
+        addrs = [client.getsockname() for client in clients]
+        for client in clients:
+            client.close()
+        for conn, _ in accepted:
+            conn.close()
+
+        return accepted, addrs
+
+    accepted, addrs = run(main())
+    assert all(isinstance(conn, socket.SocketType) for conn, _ in accepted)
+    assert sorted(addr for _, addr in accepted) == sorted(addrs)
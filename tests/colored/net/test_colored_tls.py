@@ -4,8 +4,17 @@ import pytest
 import trustme
 
 import tonio.colored as tonio
-from tonio.colored.net import socket
-from tonio.colored.net.tls import TLSStream, open_tls_over_tcp_stream, serve_tls_over_tcp
+from tonio._colored._net import _tls
+from tonio.colored.net import open_tcp_stream, serve_listeners, socket
+from tonio.colored.net.tls import (
+    RustlsConfig,
+    TLSHandshakePool,
+    TLSSessionCache,
+    TLSStream,
+    open_tls_over_tcp_listeners,
+    open_tls_over_tcp_stream,
+    serve_tls_over_tcp,
+)
 
 
 _SIZE = 1024 * 1024
@@ -35,6 +44,20 @@ def ssl_ctx_client(tls_ca):
     return ctx
 
 
+@pytest.fixture(scope='session')
+def rustls_cfg_server(tls_cert, tmp_path_factory):
+    path = tmp_path_factory.mktemp('rustls') / 'server.pem'
+    tls_cert.private_key_and_cert_chain_pem.write_to_path(str(path))
+    return RustlsConfig.server(path)
+
+
+@pytest.fixture(scope='session')
+def rustls_cfg_client(tls_ca, tmp_path_factory):
+    path = tmp_path_factory.mktemp('rustls') / 'ca.pem'
+    tls_ca.cert_pem.write_to_path(str(path))
+    return RustlsConfig.client(path)
+
+
 async def _get_port():
     sock = socket.socket()
 
@@ -99,3 +122,221 @@ def test_tls_tcp_send(run, ssl_ctx_server, ssl_ctx_client):
 
     run(server())
     assert state['data'] == b'a' * _SIZE
+
+
+@pytest.mark.skipif(RustlsConfig is None, reason='built without rustls support')
+@pytest.mark.parametrize('server_rustls,client_rustls', [(True, True), (True, False), (False, True)])
+def test_tls_tcp_rustls(run, request, server_rustls, client_rustls):
+    server_ctx = request.getfixturevalue('rustls_cfg_server' if server_rustls else 'ssl_ctx_server')
+    client_ctx = request.getfixturevalue('rustls_cfg_client' if client_rustls else 'ssl_ctx_client')
+    done = tonio.Event()
+    state = {'data': b''}
+
+    async def server():
+        port = await _get_port()
+
+        async def _server_handler(stream):
+            buf = b''
+            while len(buf) < _SIZE:
+                buf += await stream.receive_some()
+            await stream.send_all(buf)
+
+        async with tonio.scope() as scope:
+            scope.spawn(serve_tls_over_tcp(_server_handler, host='127.0.0.1', port=port, ssl_context=server_ctx))
+            scope.spawn(client(port))
+            await done.wait()
+            scope.cancel()
+
+    async def client(port):
+        await tonio.sleep(0.5)
+        stream = await open_tls_over_tcp_stream('127.0.0.1', port=port, ssl_context=client_ctx)
+        await stream.send_all(b'a' * _SIZE)
+        while len(state['data']) < _SIZE:
+            state['data'] += await stream.receive_some()
+        done.set()
+
+    run(server())
+    assert state['data'] == b'a' * _SIZE
+
+
+def test_tls_tcp_session_resumption(run, ssl_ctx_server, ssl_ctx_client):
+    done = tonio.Event()
+    cache = TLSSessionCache()
+    reused = []
+
+    async def server():
+        port = await _get_port()
+
+        async def _server_handler(stream: TLSStream):
+            data = await stream.receive_some()
+            await stream.send_all(data)
+            await stream.close()
+
+        async with tonio.scope() as scope:
+            scope.spawn(serve_tls_over_tcp(_server_handler, host='127.0.0.1', port=port, ssl_context=ssl_ctx_server))
+            scope.spawn(client(port))
+            await done.wait()
+            scope.cancel()
+
+    async def client(port):
+        await tonio.sleep(0.5)
+        for _ in range(2):
+            stream: TLSStream = await open_tls_over_tcp_stream(
+                '127.0.0.1', port=port, ssl_context=ssl_ctx_client, session_cache=cache
+            )
+            await stream.send_all(b'ping')
+            assert (await stream.receive_some()) == b'ping'
+            reused.append(stream.session_reused)
+            await stream.close()
+        done.set()
+
+    run(server())
+    assert reused == [False, True]
+    assert len(cache) == 1
+
+
+def test_tls_tcp_session_resumption_context_swap(run, tls_cert, ssl_ctx_server, ssl_ctx_client):
+    done = tonio.Event()
+    cache = TLSSessionCache()
+    reused = []
+    ssl_ctx_swapped = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    tls_cert.configure_cert(ssl_ctx_swapped)
+
+    async def server():
+        port = await _get_port()
+        listeners = await open_tls_over_tcp_listeners(port, ssl_ctx_server, host='127.0.0.1')
+
+        async def _server_handler(stream: TLSStream):
+            data = await stream.receive_some()
+            await stream.send_all(data)
+            await stream.close()
+
+        async with tonio.scope() as scope:
+            scope.spawn(serve_listeners(_server_handler, listeners))
+            scope.spawn(client(port, listeners))
+            await done.wait()
+            scope.cancel()
+
+    async def client(port, listeners):
+        for idx in range(4):
+            if idx == 2:
+                for listener in listeners:
+                    listener.set_ssl_context(ssl_ctx_swapped)
+            stream: TLSStream = await open_tls_over_tcp_stream(
+                '127.0.0.1', port=port, ssl_context=ssl_ctx_client, session_cache=cache
+            )
+            await stream.send_all(b'ping')
+            assert (await stream.receive_some()) == b'ping'
+            reused.append(stream.session_reused)
+            await stream.close()
+        done.set()
+
+    run(server())
+    #: tickets issued with the previous context can't be decrypted by the new one: the first connection
+    #  after the swap falls back to a full handshake, then sessions resume with the new context
+    assert reused == [False, True, False, True]
+
+
+@pytest.mark.parametrize('threads', [0, 2])
+def test_tls_tcp_handshake_pool(run, ssl_ctx_server, ssl_ctx_client, threads):
+    done = tonio.Event()
+    pool = TLSHandshakePool(max_concurrency=2, threads=threads)
+    #: the SNI callback runs when the server processes a ClientHello, so it tracks handshakes started
+    hellos = []
+    ssl_ctx_server.sni_callback = lambda *args: hellos.append(None)
+    res = []
+
+    async def server():
+        port = await _get_port()
+
+        async def _server_handler(stream: TLSStream):
+            data = await stream.receive_some()
+            await stream.send_all(data)
+
+        async with tonio.scope() as scope:
+            scope.spawn(
+                serve_tls_over_tcp(
+                    _server_handler, host='127.0.0.1', port=port, ssl_context=ssl_ctx_server, handshake_pool=pool
+                )
+            )
+            scope.spawn(client(port))
+            await done.wait()
+            scope.cancel()
+
+    async def stalled_client(port):
+        #: sends the ClientHello, and never completes the handshake
+        stream = await open_tcp_stream('127.0.0.1', port)
+        outgoing = ssl.MemoryBIO()
+        sslobj = ssl_ctx_client.wrap_bio(ssl.MemoryBIO(), outgoing, server_hostname='127.0.0.1')
+        with pytest.raises(ssl.SSLWantReadError):
+            sslobj.do_handshake()
+        await stream.send_all(outgoing.read())
+        return stream
+
+    async def client(port):
+        await tonio.sleep(0.5)
+        stalled = [await stalled_client(port) for _ in range(3)]
+        await tonio.sleep(0.5)
+        #: two handshakes overlap, the third connection waits for a slot
+        res.append(len(hellos))
+        for stream in stalled:
+            stream.close()
+        await tonio.sleep(0.5)
+        res.append(len(hellos))
+        stream: TLSStream = await open_tls_over_tcp_stream('127.0.0.1', port=port, ssl_context=ssl_ctx_client)
+        await stream.send_all(b'ping')
+        res.append(await stream.receive_some())
+        done.set()
+
+    run(server())
+    assert res == [2, 3, b'ping']
+
+
+def test_tls_tcp_recv_estimate(run, monkeypatch, ssl_ctx_server, ssl_ctx_client):
+    done = tonio.Event()
+    res = []
+    sizes = []
+    recv_size = _tls._recv_size
+
+    def _recv_size(est_size):
+        sizes.append(recv_size(est_size))
+        return sizes[-1]
+
+    monkeypatch.setattr(_tls, '_recv_size', _recv_size)
+
+    async def server():
+        port = await _get_port()
+
+        async def _server_handler(stream: TLSStream):
+            buf = b''
+            while len(buf) < _SIZE:
+                buf += await stream.receive_some()
+            res.append(stream._recv_est_size)
+            await stream.send_all(b'ok')
+            #: small reads after the burst make the estimate decay back to a single record
+            for _ in range(64):
+                data = await stream.receive_some()
+                await stream.send_all(data)
+            res.append(stream._recv_est_size)
+            done.set()
+
+        async with tonio.scope() as scope:
+            scope.spawn(serve_tls_over_tcp(_server_handler, host='127.0.0.1', port=port, ssl_context=ssl_ctx_server))
+            scope.spawn(client(port))
+            await done.wait()
+            scope.cancel()
+
+    async def client(port):
+        await tonio.sleep(0.5)
+        stream: TLSStream = await open_tls_over_tcp_stream('127.0.0.1', port=port, ssl_context=ssl_ctx_client)
+        await stream.send_all(b'a' * _SIZE)
+        await stream.receive_some()
+        for _ in range(64):
+            await stream.send_all(b'ping')
+            await stream.receive_some()
+
+    run(server())
+    assert res[0] > _tls._RECORD_SIZE
+    assert res[1] == _tls._RECORD_SIZE
+    assert all(size % _tls._RECORD_SIZE == 0 for size in sizes)
+    assert sizes[-1] == _tls._RECORD_SIZE
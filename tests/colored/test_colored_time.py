@@ -3,6 +3,7 @@ import time
 import pytest
 
 import tonio.colored as tonio
+from tonio._tonio import get_runtime
 
 
 def test_time(run):
@@ -48,6 +49,37 @@ def test_timeout(run):
     assert len(stack) == 1
 
 
+def test_timeout_cancelled_on_wake(run):
+    events = [tonio.Event() for _ in range(64)]
+    pending = []
+
+    async def _waiter(event):
+        await event.wait(5)
+
+    async def _setter():
+        await tonio.time.sleep(0.01)
+        pending.append(get_runtime()._timers_pending)
+        for event in events:
+            event.set()
+
+    async def _run():
+        #: let timers left over by other tests fire first
+        for _ in range(40):
+            if not get_runtime()._timers_pending:
+                break
+            await tonio.time.sleep(0.05)
+        start = time.monotonic()
+        tonio.spawn(_setter())
+        await tonio.spawn(*[_waiter(event) for event in events])
+        elapsed = time.monotonic() - start
+        pending.append(get_runtime()._timers_pending)
+        return elapsed
+
+    assert run(_run()) < 1
+    assert pending[0] >= len(events)
+    assert pending[1] == 0
+
+
 def test_timeout_err_transparent(run):
     async def _err():
         await tonio.yield_now()
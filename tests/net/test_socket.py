@@ -1,3 +1,5 @@
+import socket as stdlib_socket
+
 import tonio
 from tonio.net import socket
 
@@ -73,3 +75,158 @@ def test_socket_accept_send(run):
 
     run(server())
     assert state['data'] == b'a' * _SIZE
+
+
+def test_socket_recv_over_budget(run):
+    #: small reads on a socket with plenty of buffered data exceed the coop budget
+    size = 64 * 1024
+    state = {'data': b'', 'ticked': None}
+
+    def ticker():
+        state['ticked'] = len(state['data'])
+        yield tonio.sleep(0)
+
+    def server():
+        sock = socket.socket()
+
+        with sock:
+            yield sock.bind(('127.0.0.1', 0))
+            sock.listen()
+
+            task = tonio.spawn(client(sock.getsockname()))
+
+            client_sock, _ = yield sock.accept()
+            with client_sock:
+                yield task
+                #: spawned from this worker, the ticker lands in its LIFO slot, which can't be stolen:
+                #  it only runs before the reads complete if the budget makes the server yield the worker
+                tonio.spawn(ticker())
+                while len(state['data']) < size:
+                    state['data'] += yield client_sock.recv(64)
+
+    def client(addr):
+        sock = socket.socket()
+        with sock:
+            yield sock.connect(addr)
+            yield _send_all(sock, b'a' * size)
+
+    run(server())
+    assert state['data'] == b'a' * size
+    assert state['ticked'] is not None
+    assert state['ticked'] < size
+
+
+def test_socket_recv_into(run):
+    def server():
+        sock = socket.socket()
+
+        with sock:
+            yield sock.bind(('127.0.0.1', 0))
+            sock.listen()
+
+            task = tonio.spawn(client(sock.getsockname()))
+
+            client_sock, _ = yield sock.accept()
+            with client_sock:
+                buf = bytearray(_SIZE)
+                view = memoryview(buf)
+                received = 0
+                while received < _SIZE:
+                    received += yield client_sock.recv_into(view[received:])
+                yield task
+
+        return buf
+
+    def client(addr):
+        sock = socket.socket()
+        with sock:
+            yield sock.connect(addr)
+            yield _send_all(sock, b'a' * _SIZE)
+
+    data = run(server())
+    assert data == b'a' * _SIZE
+
+
+def test_socket_sendfile(run, tmp_path):
+    path = tmp_path / 'data'
+    path.write_bytes(b'a' * _SIZE + b'b' * _SIZE)
+
+    def server():
+        sock = socket.socket()
+
+        with sock:
+            yield sock.bind(('127.0.0.1', 0))
+            sock.listen()
+
+            task = tonio.spawn(client(sock.getsockname()))
+
+            client_sock, _ = yield sock.accept()
+            with client_sock:
+                data = yield _recv_all(client_sock, _SIZE)
+                yield task
+
+        return data
+
+    def client(addr):
+        sock = socket.socket()
+        with sock, open(path, 'rb') as f:
+            yield sock.connect(addr)
+            sent = yield sock.sendfile(f, _SIZE // 2, _SIZE)
+            assert sent == _SIZE
+            assert f.tell() == _SIZE // 2 + _SIZE
+
+    data = run(server())
+    assert data == b'a' * (_SIZE // 2) + b'b' * (_SIZE // 2)
+
+
+def test_socket_udp_many(run):
+    msgs = [b'a' * 16, b'b' * 512, b'c']
+
+    def main():
+        rsock = socket.socket(type=stdlib_socket.SOCK_DGRAM)
+        ssock = socket.socket(type=stdlib_socket.SOCK_DGRAM)
+        with rsock, ssock:
+            yield rsock.bind(('127.0.0.1', 0))
+            yield ssock.bind(('127.0.0.1', 0))
+            addr = rsock.getsockname()
+
+            sent = yield ssock.send_many([(msg, addr) for msg in msgs])
+            assert sent == len(msgs)
+
+            received = []
+            while len(received) < len(msgs):
+                received.extend((yield rsock.recv_many(8, 1024)))
+
+        return received, ssock.getsockname()
+
+    received, addr = run(main())
+    assert [data for data, _ in received] == msgs
+    assert all(src == addr for _, src in received)
+
+
+def test_socket_accept_many(run):
+    def main():
+        sock = socket.socket()
+        clients = [socket.socket() for _ in range(3)]
+
+        with sock:
+            yield sock.bind(('127.0.0.1', 0))
+            sock.listen()
+            for client in clients:
+                yield client.connect(sock.getsockname())
+
+            accepted = []
+            while len(accepted) < len(clients):
+                accepted.extend((yield sock.accept_many()))
+
+        addrs = [client.getsockname() for client in clients]
+        for client in clients:
+            client.close()
+        for conn, _ in accepted:
+            conn.close()
+
+        return accepted, addrs
+
+    accepted, addrs = run(main())
+    assert all(isinstance(conn, socket.SocketType) for conn, _ in accepted)
+    assert sorted(addr for _, addr in accepted) == sorted(addrs)
@@ -1,5 +1,6 @@
 import errno
 import os
+import socket as stdlib_socket
 import stat
 import sys
 import tempfile
@@ -7,12 +8,17 @@ import tempfile
 import pytest
 
 import tonio
+from tonio.io import BufferedReceiveStream, BufferedSendStream, BufferPool
 from tonio.net import (
+    DatagramEndpoint,
     SocketStream,
+    open_tcp_listeners,
     open_tcp_stream,
+    open_udp_endpoint,
     open_unix_listener,
     open_unix_socket,
     serve_tcp,
+    serve_udp,
     serve_unix,
     socket,
 )
@@ -27,6 +33,13 @@ def _sock_path(name='s'):
     return os.path.join(tempfile.mkdtemp(), name)
 
 
+def _stream_pair():
+    return tuple(
+        SocketStream(socket.socket(sock.family, sock.type, sock.proto, sock.detach()))
+        for sock in stdlib_socket.socketpair()
+    )
+
+
 def _get_port():
     sock = socket.socket()
 
@@ -96,6 +109,156 @@ def test_streams_tcp_send(run):
     assert state['data'] == b'a' * _SIZE
 
 
+def test_streams_tcp_send_all_many(run):
+    done = tonio.Event()
+    state = {'data': b''}
+    #: more buffers than a single `writev` takes, with partial writes landing mid-buffer
+    chunks = [b'head', b'a' * _SIZE, bytearray(b'b' * 1024), b'', memoryview(b'tail')] + [b'c' * 512] * 4096
+
+    def server():
+        port = yield _get_port()
+
+        def _server_handler(stream: SocketStream):
+            yield stream.send_all_many(chunks)
+            stream.send_eof()
+
+        with tonio.scope() as scope:
+            scope.spawn(serve_tcp(_server_handler, host='127.0.0.1', port=port))
+            scope.spawn(client(port))
+            yield done.wait()
+            scope.cancel()
+        yield scope()
+
+    def client(port):
+        yield tonio.sleep(0.5)
+        stream: SocketStream = yield open_tcp_stream('127.0.0.1', port=port)
+        while data := (yield stream.receive_some()):
+            state['data'] += data
+        done.set()
+
+    run(server())
+    assert state['data'] == b''.join(chunks)
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='SO_REUSEPORT is not available on Windows')
+def test_streams_tcp_reuse_port(run):
+    def main():
+        listeners = yield open_tcp_listeners(0, host='127.0.0.1', reuse_port=2)
+        ports = {listener.socket.getsockname()[1] for listener in listeners}
+        for listener in listeners:
+            listener.close()
+        return len(listeners), len(ports)
+
+    assert run(main()) == (2, 1)
+
+
+def test_streams_udp_roundtrip(run):
+    def main():
+        port = yield _get_port()
+
+        def _server_handler(endpoint: DatagramEndpoint, data, address):
+            yield endpoint.send(data.upper(), address)
+
+        with tonio.scope() as scope:
+            scope.spawn(serve_udp(_server_handler, port, host='127.0.0.1', workers=2))
+            yield tonio.sleep(0.5)
+            with (yield open_udp_endpoint(remote=('127.0.0.1', port))) as endpoint:
+                yield endpoint.send(b'ping')
+                data, _ = yield endpoint.receive()
+            scope.cancel()
+        yield scope()
+
+        return data
+
+    assert run(main()) == b'PING'
+
+
+def test_streams_buffered_receive(run):
+    def main():
+        rsock, wsock = stdlib_socket.socketpair()
+        writer = SocketStream(socket.socket(wsock.family, wsock.type, wsock.proto, wsock.detach()))
+        reader = BufferedReceiveStream(
+            SocketStream(socket.socket(rsock.family, rsock.type, rsock.proto, rsock.detach())),
+            chunk_size=4,
+        )
+        with writer, reader:
+            yield writer.send_all(b'HEAD\r\nline1\nline2\n' + b'a' * 10 + b'tail')
+            writer.send_eof()
+            ret = [
+                (yield reader.receive_until(b'\r\n')),
+                (yield reader.readline()),
+                (yield reader.readline()),
+                (yield reader.receive_exactly(10)),
+                (yield reader.readline()),
+                (yield reader.readline()),
+            ]
+        return ret
+
+    assert run(main()) == [b'HEAD\r\n', b'line1\n', b'line2\n', b'a' * 10, b'tail', b'']
+
+
+def test_streams_buffered_send(run):
+    def main():
+        rstream, wstream = _stream_pair()
+        reader, writer = BufferedReceiveStream(rstream), BufferedSendStream(wstream)
+        with writer, reader:
+            for idx in range(100):
+                yield writer.send_all(b'%d\n' % idx)
+            yield writer.flush()
+            lines = []
+            for _ in range(100):
+                lines.append((yield reader.readline()))
+            #: no explicit flush: buffered data gets sent at the end of the tick
+            yield writer.send_all(bytearray(b'tail\n'))
+            lines.append((yield reader.readline()))
+        return lines
+
+    assert run(main()) == [b'%d\n' % idx for idx in range(100)] + [b'tail\n']
+
+
+def test_streams_buffered_send_close(run):
+    def main():
+        rstream, wstream = _stream_pair()
+        reader, writer = BufferedReceiveStream(rstream), BufferedSendStream(wstream, flush_on_tick=False)
+        with reader:
+            yield writer.send_all(b'data')
+            with pytest.raises(RuntimeError):
+                writer.__exit__(None, None, None)
+            #: buffered data gets sent before the transport is closed
+            yield writer.close()
+            return (yield reader.readline())
+
+    assert run(main()) == b'data'
+
+
+def test_streams_receive_into_pooled(run):
+    pool = BufferPool(slab_size=4096)
+
+    def sender(wstream):
+        with wstream:
+            yield wstream.send_all(b'a' * _SIZE)
+
+    def main():
+        rstream, wstream = _stream_pair()
+        with rstream:
+            #: the payload exceeds the socket buffers, so it needs to be sent while we read
+            task = tonio.spawn(sender(wstream))
+            data = bytearray()
+            while True:
+                with (yield rstream.receive_into_pooled(pool)) as lease:
+                    if not lease:
+                        break
+                    assert len(lease) <= pool.slab_size
+                    with memoryview(lease) as view:
+                        with pytest.raises(BufferError):
+                            lease.release()
+                        data += view
+            yield task
+        return data
+
+    assert run(main()) == b'a' * _SIZE
+
+
 def test_streams_unix_roundtrip(run):
     path = _sock_path()
 
@@ -0,0 +1,168 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+import tonio
+
+
+#: the global runtime can only be set once per process, so runtime options are tested in subprocesses
+def _run_script(script: str) -> str:
+    proc = subprocess.run(  # noqa: S603
+        [sys.executable, '-c', textwrap.dedent(script)], capture_output=True, text=True, timeout=30, check=False
+    )
+    assert proc.returncode == 0, proc.stderr
+    return proc.stdout.strip()
+
+
+def test_runtime_io_drivers():
+    out = _run_script(
+        """
+        import tonio
+        from tonio.net import socket
+
+        def main():
+            sock = socket.socket()
+            with sock:
+                yield sock.bind(('127.0.0.1', 0))
+                sock.listen()
+                task = tonio.spawn(client(sock.getsockname()))
+                conn, _ = yield sock.accept()
+                with conn:
+                    data = b''
+                    while len(data) < 4096:
+                        data += yield conn.recv(4096 - len(data))
+                    yield conn.send(data[:4])
+                return (yield task), len(data)
+
+        def client(addr):
+            sock = socket.socket()
+            with sock:
+                yield sock.connect(addr)
+                buf = b'a' * 4096
+                while buf:
+                    buf = buf[(yield sock.send(buf)):]
+                return (yield sock.recv(4))
+
+        print(tonio.run(main(), threads=2, io_drivers=2))
+        """
+    )
+    assert out == "(b'aaaa', 4096)"
+
+
+@pytest.mark.skipif(not hasattr(os, 'sched_getaffinity'), reason='CPU affinity not supported')
+def test_runtime_cpus():
+    out = _run_script(
+        """
+        import os
+        import tonio
+
+        def main():
+            yield tonio.sleep(0.01)
+            return os.sched_getaffinity(0)
+
+        cpus = os.sched_getaffinity(0)
+        cpu = min(cpus)
+        pinned = tonio.run(main(), threads=2, worker_cpus=[cpu], poll_cpus=[cpu])
+        print(pinned == {cpu}, os.sched_getaffinity(0) == cpus)
+        """
+    )
+    assert out == 'True True'
+
+
+@pytest.mark.parametrize('cpus', [[-1], [1 << 20], ['0']])
+@pytest.mark.parametrize('option', ['worker_cpus', 'poll_cpus'])
+def test_runtime_cpus_invalid(option, cpus):
+    #: validation happens before the runtime gets built, so this won't replace the global one
+    with pytest.raises(ValueError):
+        tonio.runtime(threads=1, **{option: cpus})
+
+
+_ELASTIC_BURST = """
+import os
+import socket as stdlib_socket
+import threading
+import time
+
+import tonio
+from tonio._net._socket import from_stdlib_socket
+
+def _threads():
+    return len(os.listdir('/proc/self/task'))
+
+def task(ids, sock):
+    yield tonio.sleep(0.05)
+    #: keep the worker busy, so that the backlog piles up
+    time.sleep(0.002)
+    ids.add(threading.get_native_id())
+    return (yield sock.recv(1))
+
+def main():
+    ids = set()
+    pairs = [stdlib_socket.socketpair() for _ in range(128)]
+    tasks = [tonio.spawn(task(ids, from_stdlib_socket(rsock))) for rsock, _ in pairs]
+    while len(ids) < len(tasks):
+        yield tonio.sleep(0.01)
+    grown = _threads()
+    #: readers are parked on I/O owned by workers which are about to retire
+    yield tonio.sleep(2)
+    retired = _threads()
+    for _, wsock in pairs:
+        wsock.send(b'x')
+    data, success = yield tonio.time.timeout(_gather(tasks), 5)
+    return len(ids), grown > retired, success and data == [b'x'] * len(tasks)
+
+def _gather(tasks):
+    res = []
+    for task in tasks:
+        res.append((yield task))
+    return res
+
+print(*tonio.run(main(), threads=4, min_threads=1, threads_idle_ttl=1))
+"""
+
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason='thread count requires procfs')
+def test_runtime_elastic_pool():
+    workers, retired, rehomed = _run_script(_ELASTIC_BURST).split()
+    #: the burst grows the pool over its minimum size
+    assert int(workers) > 1
+    #: idle workers retire after `threads_idle_ttl`
+    assert retired == 'True'
+    #: wakeups routed to retired workers still get scheduled
+    assert rehomed == 'True'
+
+
+def test_runtime_timer_resolution():
+    out = _run_script(
+        """
+        import time
+        import tonio
+
+        def main():
+            t0 = time.monotonic()
+            yield tonio.sleep(0.05)
+            slept = time.monotonic() - t0
+            t0 = time.monotonic()
+            _, in_time = yield tonio.time.timeout(tonio.sleep(1), 0.05)
+            timed_out = time.monotonic() - t0
+            _, completed = yield tonio.time.timeout(tonio.sleep(0.01), 1)
+            return slept, not in_time, timed_out, completed
+
+        print(*tonio.run(main(), threads=2, timer_resolution=0.02))
+        """
+    )
+    slept, expired, timed_out, completed = out.split()
+    #: deadlines never fire early, and are late by at most one tick (plus scheduling noise)
+    assert 0.05 <= float(slept) < 0.05 + 0.02 + 0.05
+    assert expired == 'True'
+    assert 0.05 <= float(timed_out) < 0.05 + 0.02 + 0.05
+    assert completed == 'True'
+
+
+@pytest.mark.parametrize('resolution', [0, -0.01, float('inf'), float('nan')])
+def test_runtime_timer_resolution_invalid(resolution):
+    with pytest.raises(ValueError):
+        tonio.runtime(threads=1, timer_resolution=resolution)
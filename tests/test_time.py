@@ -4,6 +4,7 @@ import pytest
 
 import tonio
 import tonio.time
+from tonio._tonio import get_runtime
 
 
 def test_time(run):
@@ -49,6 +50,37 @@ def test_timeout(run):
     assert len(stack) == 1
 
 
+def test_timeout_cancelled_on_wake(run):
+    events = [tonio.Event() for _ in range(64)]
+    pending = []
+
+    def _waiter(event):
+        yield event.wait(5)
+
+    def _setter():
+        yield tonio.time.sleep(0.01)
+        pending.append(get_runtime()._timers_pending)
+        for event in events:
+            event.set()
+
+    def _run():
+        #: let timers left over by other tests fire first
+        for _ in range(40):
+            if not get_runtime()._timers_pending:
+                break
+            yield tonio.time.sleep(0.05)
+        start = time.monotonic()
+        tonio.spawn(_setter())
+        yield tonio.spawn(*[_waiter(event) for event in events])
+        elapsed = time.monotonic() - start
+        pending.append(get_runtime()._timers_pending)
+        return elapsed
+
+    assert run(_run()) < 1
+    assert pending[0] >= len(events)
+    assert pending[1] == 0
+
+
 def test_timeout_err_transparent(run):
     def _err():
         yield
@@ -124,7 +124,10 @@ async def select(*coros) -> Any:
 
 
 async def spawn_blocking(fn: Callable[_Params, _Return], /, *args: _Params.args, **kwargs: _Params.kwargs) -> _Return:
-    ctl, event, res = get_runtime()._spawn_blocking(fn, *args, **kwargs)
+    return await _wait_blocking(*get_runtime()._spawn_blocking(fn, *args, **kwargs))
+
+
+async def _wait_blocking(ctl: Any, event: Any, res: Any) -> Any:
     with contextlib.suppress(CancelledError):
         await event.waiter(None)
     err, val = res.fetch()
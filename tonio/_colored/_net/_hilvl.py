@@ -17,16 +17,21 @@ from ..._net._hilvl import (
     _accept_retry_errnos,
     _close_all_sockets,
     _close_on_error,
+    _default_client_context,
+    _is_rustls_config,
+    _set_reuse_port,
     _unix_bind,
     _unix_check_path,
 )
+from ..._tonio import ResourceBroken
 from .._ctl import spawn, spawn_blocking
 from .._events import Event
 from .._scope import scope
 from .._time import sleep
+from ._rustls import RustlsConfig, RustlsListener, RustlsStream
 from ._socket import _Socket, getaddrinfo, socket
-from ._streams import SocketListener, SocketStream
-from ._tls import TLSListener, TLSStream
+from ._streams import DatagramEndpoint, SocketListener, SocketStream
+from ._tls import TLSHandshakePool, TLSListener, TLSSessionCache, TLSStream
 
 
 async def open_tcp_stream(
@@ -117,6 +122,8 @@ async def open_tcp_listeners(
     *,
     host: str | bytes | None = None,
     backlog: int | None = None,
+    reuse_port: int = 0,
+    cpu_steering: bool = False,
 ) -> list[SocketListener]:
     if not isinstance(port, int):
         raise TypeError(f'port must be an int not {port!r}')
@@ -133,28 +140,39 @@ async def open_tcp_listeners(
     unsupported_address_families = []
     try:
         for family, type_, proto, _, sockaddr in addresses:
-            try:
-                sock = socket(family, type_, proto)
-            except OSError as ex:
-                if ex.errno == errno.EAFNOSUPPORT:
-                    unsupported_address_families.append(ex)
-                    continue
-                else:
-                    raise
-            try:
-                if sys.platform != 'win32':
-                    sock.setsockopt(_stdlib_socket.SOL_SOCKET, _stdlib_socket.SO_REUSEADDR, 1)
+            #: with `reuse_port`, a group of sockets sharing the address, each with its own accept queue
+            group_start = len(listeners)
+            for _ in range(max(1, reuse_port)):
+                try:
+                    sock = socket(family, type_, proto)
+                except OSError as ex:
+                    if ex.errno == errno.EAFNOSUPPORT:
+                        unsupported_address_families.append(ex)
+                        break
+                    else:
+                        raise
+                try:
+                    if sys.platform != 'win32':
+                        sock.setsockopt(_stdlib_socket.SOL_SOCKET, _stdlib_socket.SO_REUSEADDR, 1)
+
+                    if reuse_port:
+                        _set_reuse_port(sock)
 
-                if family == _stdlib_socket.AF_INET6:
-                    sock.setsockopt(_stdlib_socket.IPPROTO_IPV6, _stdlib_socket.IPV6_V6ONLY, 1)
+                    if family == _stdlib_socket.AF_INET6:
+                        sock.setsockopt(_stdlib_socket.IPPROTO_IPV6, _stdlib_socket.IPV6_V6ONLY, 1)
 
-                await sock.bind(sockaddr)
-                sock.listen(backlog)
+                    await sock.bind(sockaddr)
+                    sock.listen(backlog)
+                    # NOTE: when an ephemeral port is requested, the rest of the group should bind the same one
+                    sockaddr = sock.getsockname()
 
-                listeners.append(SocketListener(sock))
-            except:
-                sock.close()
-                raise
+                    listeners.append(SocketListener(sock))
+                except:
+                    sock.close()
+                    raise
+
+            if cpu_steering and reuse_port and len(listeners) > group_start:
+                listeners[group_start].socket._attach_reuseport_cbpf(len(listeners) - group_start)
     except:
         for listener in listeners:
             listener.close()
@@ -190,18 +208,36 @@ def serve_listeners(
     handler: Any,
     listeners: list[SocketListener],
 ) -> Awaitable[None]:
+    async def _handshake_and_handle(listener: Any, stream: Any):
+        try:
+            await listener._handshake_pending(stream)
+        except OSError, ResourceBroken:
+            stream.transport.close()
+            return
+        await handler(stream)
+
     async def _listener_handler(listener: SocketListener):
+        #: plain socket listeners drain their backlog in batches
+        batched = isinstance(listener, SocketListener)
+        #: with a handshake pool, TLS handshakes run within the connection tasks
+        deferred = getattr(listener, '_handshake_pool', None) is not None
         with listener:
             while True:
                 try:
-                    stream = await listener.accept()
+                    if batched:
+                        streams = await listener.accept_many()
+                    elif deferred:
+                        streams = [await listener._accept_pending()]
+                    else:
+                        streams = [await listener.accept()]
                 except OSError as exc:
                     if exc.errno in _accept_retry_errnos:
                         await sleep(0.1)
                     else:
                         raise
                 else:
-                    spawn.without_tracking(handler(stream))
+                    for stream in streams:
+                        spawn.without_tracking(_handshake_and_handle(listener, stream) if deferred else handler(stream))
 
     tasks = []
     for listener in listeners:
@@ -216,8 +252,16 @@ async def serve_tcp(
     *,
     host: str | bytes | None = None,
     backlog: int | None = None,
+    reuse_port: int = 0,
+    cpu_steering: bool = False,
 ) -> None:
-    listeners = await open_tcp_listeners(port, host=host, backlog=backlog)
+    listeners = await open_tcp_listeners(
+        port,
+        host=host,
+        backlog=backlog,
+        reuse_port=reuse_port,
+        cpu_steering=cpu_steering,
+    )
     await serve_listeners(handler, listeners)
 
 
@@ -232,46 +276,144 @@ async def serve_unix(
     await serve_listeners(handler, [listener])
 
 
+async def open_udp_endpoint(
+    local: tuple[str | bytes | None, int] | None = None,
+    remote: tuple[str | bytes, int] | None = None,
+    *,
+    reuse_port: bool = False,
+) -> DatagramEndpoint:
+    if local is None and remote is None:
+        raise ValueError('at least one of local and remote addresses is required')
+
+    if remote is not None:
+        targets = await getaddrinfo(*remote, type=_stdlib_socket.SOCK_DGRAM)
+    else:
+        targets = await getaddrinfo(*local, type=_stdlib_socket.SOCK_DGRAM, flags=_stdlib_socket.AI_PASSIVE)
+    family, type_, proto, _, sockaddr = targets[0]
+
+    sock = socket(family, type_, proto)
+    with _close_on_error(sock):
+        if reuse_port:
+            _set_reuse_port(sock)
+        if remote is None:
+            await sock.bind(sockaddr)
+        else:
+            if local is not None:
+                await sock.bind(local)
+            await sock.connect(sockaddr)
+    return DatagramEndpoint(sock)
+
+
+async def serve_udp(
+    handler: Any,
+    port: int,
+    *,
+    host: str | bytes | None = None,
+    workers: int = 1,
+    max_msgs: int = 64,
+    max_bytes: int = 4096,
+) -> None:
+    if not isinstance(port, int):
+        raise TypeError(f'port must be an int not {port!r}')
+
+    addresses = await getaddrinfo(
+        host,
+        port,
+        type=_stdlib_socket.SOCK_DGRAM,
+        flags=_stdlib_socket.AI_PASSIVE,
+    )
+    family, type_, proto, _, sockaddr = addresses[0]
+
+    #: one socket per worker, the kernel distributes datagrams among them
+    endpoints = []
+    try:
+        for _ in range(max(1, workers)):
+            sock = socket(family, type_, proto)
+            endpoints.append(DatagramEndpoint(sock))
+            if workers > 1:
+                _set_reuse_port(sock)
+            await sock.bind(sockaddr)
+            # NOTE: when an ephemeral port is requested, the following sockets should bind the same one
+            sockaddr = sock.getsockname()
+    except:
+        for endpoint in endpoints:
+            endpoint.close()
+        raise
+
+    async def _endpoint_handler(endpoint: DatagramEndpoint):
+        with endpoint:
+            while True:
+                msgs = await endpoint.receive_many(max_msgs, max_bytes)
+                for data, address in msgs:
+                    spawn.without_tracking(handler(endpoint, data, address))
+
+    tasks = []
+    for endpoint in endpoints:
+        tasks.append(_endpoint_handler(endpoint))
+
+    await spawn.without_results(*tasks)
+
+
 async def open_tls_over_tcp_stream(
     host: str | bytes,
     port: int,
     *,
     https_compatible: bool = False,
-    ssl_context: _stdlib_ssl.SSLContext | None = None,
+    ssl_context: _stdlib_ssl.SSLContext | RustlsConfig | None = None,
     happy_eyeballs_delay: float | None = None,
-) -> TLSStream:
+    session_cache: TLSSessionCache | None = None,
+) -> TLSStream | RustlsStream:
     tcp_stream = await open_tcp_stream(
         host,
         port,
         happy_eyeballs_delay=happy_eyeballs_delay,
     )
     if ssl_context is None:
-        ssl_context = _stdlib_ssl.create_default_context()
-
-        if hasattr(_stdlib_ssl, 'OP_IGNORE_UNEXPECTED_EOF'):
-            ssl_context.options &= ~_stdlib_ssl.OP_IGNORE_UNEXPECTED_EOF
-
-    ret = TLSStream(
-        tcp_stream,
-        ssl_context,
-        server_hostname=host,
-        https_compatible=https_compatible,
-    )
+        ssl_context = _default_client_context()
+
+    if _is_rustls_config(ssl_context):
+        #: rustls configs keep their own sessions cache
+        ret = RustlsStream(
+            tcp_stream,
+            ssl_context,
+            server_hostname=host,
+            https_compatible=https_compatible,
+        )
+    else:
+        ret = TLSStream(
+            tcp_stream,
+            ssl_context,
+            server_hostname=host,
+            https_compatible=https_compatible,
+            session_cache=TLSSessionCache.for_context(ssl_context) if session_cache is None else session_cache,
+            session_key=(host, port),
+        )
     await ret.handshake()
     return ret
 
 
 async def open_tls_over_tcp_listeners(
     port: int,
-    ssl_context: _stdlib_ssl.SSLContext | None = None,
+    ssl_context: _stdlib_ssl.SSLContext | RustlsConfig | None = None,
     *,
     host: str | bytes | None = None,
     https_compatible: bool = False,
     backlog: int | None = None,
-) -> list[TLSListener]:
-    tcp_listeners = await open_tcp_listeners(port, host=host, backlog=backlog)
+    reuse_port: int = 0,
+    cpu_steering: bool = False,
+    handshake_pool: TLSHandshakePool | None = None,
+) -> list[TLSListener | RustlsListener]:
+    tcp_listeners = await open_tcp_listeners(
+        port,
+        host=host,
+        backlog=backlog,
+        reuse_port=reuse_port,
+        cpu_steering=cpu_steering,
+    )
+    listener_cls = RustlsListener if _is_rustls_config(ssl_context) else TLSListener
     tls_listeners = [
-        TLSListener(tcp_listener, ssl_context, https_compatible=https_compatible) for tcp_listener in tcp_listeners
+        listener_cls(tcp_listener, ssl_context, https_compatible=https_compatible, handshake_pool=handshake_pool)
+        for tcp_listener in tcp_listeners
     ]
     return tls_listeners
 
@@ -279,11 +421,14 @@ async def open_tls_over_tcp_listeners(
 async def serve_tls_over_tcp(
     handler: Any,
     port: int,
-    ssl_context: _stdlib_ssl.SSLContext,
+    ssl_context: _stdlib_ssl.SSLContext | RustlsConfig,
     *,
     host: str | bytes | None = None,
     https_compatible: bool = False,
     backlog: int | None = None,
+    reuse_port: int = 0,
+    cpu_steering: bool = False,
+    handshake_pool: TLSHandshakePool | None = None,
 ) -> None:
     listeners = await open_tls_over_tcp_listeners(
         port,
@@ -291,5 +436,8 @@ async def serve_tls_over_tcp(
         host=host,
         https_compatible=https_compatible,
         backlog=backlog,
+        reuse_port=reuse_port,
+        cpu_steering=cpu_steering,
+        handshake_pool=handshake_pool,
     )
     await serve_listeners(handler, listeners)
@@ -3,9 +3,10 @@ from __future__ import annotations
 import os
 import socket as _stdlib_socket
 import sys
-from typing import Any, Awaitable
+from typing import Any, Awaitable, Sequence
 
 from ..._net import _socket
+from ..._tonio import BufferLease, BufferPool, Waiter as _Waiter
 from .._ctl import spawn_blocking
 
 
@@ -64,6 +65,11 @@ class _Socket(_socket._Socket):
 
         return from_stdlib_socket(conn), address
 
+    async def accept_many(self, max_n: int = 128) -> list[tuple[_Socket, Any]]:
+        while (ret := self._accept_many(_Socket, max_n)).__class__ is _Waiter:
+            await ret
+        return ret
+
     async def connect(self, address: Any) -> None:
         address = await self._resolve_address(address, local=False)
 
@@ -96,41 +102,18 @@ class _Socket(_socket._Socket):
                 break
 
     async def recv(self, bufsize: int, flags: int = 0, /) -> bytes:
-        while True:
-            if (waiter := self._io_arm_r()) is not None:
-                await waiter
-                continue
-
-            try:
-                ret = self._sock.recv(bufsize, flags)
-            except InterruptedError:
-                pass
-            except BlockingIOError:
-                self._io_clear_r()
-            except BaseException as exc:
-                raise exc
-            else:
-                break
+        while (ret := self._recv(bufsize, flags)).__class__ is _Waiter:
+            await ret
+        return ret
 
+    async def recv_pooled(self, pool: BufferPool, flags: int = 0, /) -> BufferLease:
+        while (ret := self._recv_pooled(pool, flags)).__class__ is _Waiter:
+            await ret
         return ret
 
     async def recv_into(self, /, buffer, nbytes: int = 0, flags: int = 0) -> int:
-        while True:
-            if (waiter := self._io_arm_r()) is not None:
-                await waiter
-                continue
-
-            try:
-                ret = self._sock.recv_into(buffer, nbytes, flags)
-            except InterruptedError:
-                pass
-            except BlockingIOError:
-                self._io_clear_r()
-            except BaseException as exc:
-                raise exc
-            else:
-                break
-
+        while (ret := self._recv_into(buffer, nbytes, flags)).__class__ is _Waiter:
+            await ret
         return ret
 
     async def recvfrom(self, bufsize: int, flags: int = 0, /) -> tuple[bytes, Any]:
@@ -171,6 +154,12 @@ class _Socket(_socket._Socket):
 
         return ret
 
+    async def recv_many(self, max_msgs: int = 64, bufsize: int = 4096, /) -> list[tuple[bytes, Any]]:
+        # NOTE: all the datagrams available up to `max_msgs` get received with a single syscall
+        while (ret := self._recv_many(max_msgs, bufsize)).__class__ is _Waiter:
+            await ret
+        return ret
+
     if sys.platform != 'win32':
 
         async def recvmsg(
@@ -226,27 +215,32 @@ class _Socket(_socket._Socket):
         if not data:
             return 0
 
-        try:
-            return self._sock.send(data, flags)
-        except BlockingIOError, InterruptedError:
-            pass
-
-        while True:
-            if (waiter := self._io_arm_w()) is not None:
-                await waiter
-                continue
-
-            try:
-                ret = self._sock.send(data, flags)
-            except InterruptedError:
-                pass
-            except BlockingIOError:
-                self._io_clear_w()
-            except BaseException as exc:
-                raise exc
-            else:
-                break
+        while (ret := self._send(data, flags)).__class__ is _Waiter:
+            await ret
+        return ret
 
+    async def sendfile(self, file: Any, offset: int = 0, count: int | None = None) -> int:
+        # NOTE: like the stdlib counterpart, `file` should be a regular file opened in binary mode,
+        #       and its position is moved past the sent data on return
+        fileno = file.fileno()
+        if count is None:
+            count = os.fstat(fileno).st_size - offset
+        total_sent = 0
+        try:
+            while total_sent < count:
+                while (ret := self._sendfile(fileno, offset + total_sent, count - total_sent)).__class__ is _Waiter:
+                    await ret
+                if not ret:
+                    break
+                total_sent += ret
+        finally:
+            if total_sent > 0 and hasattr(file, 'seek'):
+                file.seek(offset + total_sent)
+        return total_sent
+
+    async def sendv(self, buffers: Sequence[Any], index: int = 0, offset: int = 0, /) -> int:
+        while (ret := self._sendv(buffers, index, offset)).__class__ is _Waiter:
+            await ret
         return ret
 
     async def sendto(self, data, address) -> int:
@@ -277,6 +271,16 @@ class _Socket(_socket._Socket):
 
         return ret
 
+    async def send_many(self, msgs: Sequence[tuple[Any, Any]], /) -> int:
+        # NOTE: addresses should be numeric (or `None` on connected sockets), as they're not resolved
+        msgs = list(msgs)
+        total_sent = 0
+        while total_sent < len(msgs):
+            while (ret := self._send_many(msgs, total_sent)).__class__ is _Waiter:
+                await ret
+            total_sent += ret
+        return total_sent
+
     if sys.platform != 'win32':
 
         async def sendmsg(
@@ -3,9 +3,10 @@ from __future__ import annotations
 import socket as _stdlib_socket
 from contextlib import suppress
 from types import CoroutineType
-from typing import Any
+from typing import Any, Iterable, Sequence
 
 from ..._net._streams import _ignorable_accept_errnos, _Stream
+from ..._tonio import BufferLease, BufferPool, Waiter as _Waiter
 from ._socket import _Socket
 
 
@@ -27,6 +28,13 @@ class SocketStream(_Stream):
             with suppress(OSError):
                 self.socket.setsockopt(_stdlib_socket.IPPROTO_TCP, _stdlib_socket.TCP_NOTSENT_LOWAT, 2**14)
 
+    @classmethod
+    def _from_accepted(cls, socket: _Socket) -> SocketStream:
+        # NOTE: sockets from `accept_many` already have the stream options applied
+        stream = cls.__new__(cls)
+        stream.socket = socket
+        return stream
+
     async def send_all(self, data: bytes | bytearray | memoryview) -> None:
         if self.socket._eof_get():
             raise RuntimeError("can't send data after sending EOF")
@@ -39,6 +47,24 @@ class SocketStream(_Stream):
                     sent = await self.socket.send(remaining)
                 total_sent += sent
 
+    async def send_all_many(self, buffers: Iterable[bytes | bytearray | memoryview]) -> None:
+        if self.socket._eof_get():
+            raise RuntimeError("can't send data after sending EOF")
+        #: gather write, resuming from the first unsent buffer on partial writes
+        buffers = list(buffers)
+        sizes = [memoryview(buf).nbytes for buf in buffers]
+        index, offset = 0, 0
+        while index < len(buffers):
+            offset += await self.socket.sendv(buffers, index, offset)
+            while index < len(sizes) and offset >= sizes[index]:
+                offset -= sizes[index]
+                index += 1
+
+    async def send_file(self, file: Any, offset: int = 0, count: int | None = None) -> int:
+        if self.socket._eof_get():
+            raise RuntimeError("can't send data after sending EOF")
+        return await self.socket.sendfile(file, offset, count)
+
     def send_eof(self) -> None:
         if self.socket._eof_get():
             return
@@ -48,6 +74,10 @@ class SocketStream(_Stream):
         max_bytes = max_bytes or 65536
         return self.socket.recv(max_bytes)
 
+    def receive_into_pooled(self, pool: BufferPool) -> CoroutineType[Any, Any, BufferLease]:
+        #: an empty lease signals EOF
+        return self.socket.recv_pooled(pool)
+
     def close(self):
         self.socket.close()
 
@@ -71,5 +101,48 @@ class SocketListener(_Stream):
             else:
                 return SocketStream(sock)
 
+    async def accept_many(self, max_n: int = 128) -> list[SocketStream]:
+        while True:
+            try:
+                while (ret := self.socket._accept_many(_Socket, max_n, True)).__class__ is _Waiter:
+                    await ret
+            except OSError as exc:
+                if exc.errno not in _ignorable_accept_errnos:
+                    raise
+            else:
+                return [SocketStream._from_accepted(sock) for sock, _ in ret]
+
+    def close(self):
+        self.socket.close()
+
+
+class DatagramEndpoint(_Stream):
+    __slots__ = ['socket']
+
+    def __init__(self, socket: _Socket):
+        if not isinstance(socket, _Socket):
+            raise TypeError('DatagramEndpoint requires a TonIO socket object')
+        if socket.type != _stdlib_socket.SOCK_DGRAM:
+            raise ValueError('DatagramEndpoint requires a SOCK_DGRAM socket')
+
+        self.socket = socket
+
+    def receive(self, max_bytes: int | None = None) -> CoroutineType[Any, Any, tuple[bytes, Any]]:
+        max_bytes = max_bytes or 65536
+        return self.socket.recvfrom(max_bytes)
+
+    def receive_many(
+        self, max_msgs: int = 64, max_bytes: int = 4096
+    ) -> CoroutineType[Any, Any, list[tuple[bytes, Any]]]:
+        return self.socket.recv_many(max_msgs, max_bytes)
+
+    def send(self, data: bytes | bytearray | memoryview, address: Any = None) -> CoroutineType[Any, Any, int]:
+        if address is None:
+            return self.socket.send(data)
+        return self.socket.sendto(data, address)
+
+    def send_many(self, msgs: Sequence[tuple[Any, Any]]) -> CoroutineType[Any, Any, int]:
+        return self.socket.send_many(msgs)
+
     def close(self):
         self.socket.close()
@@ -8,14 +8,48 @@ Heavily inspired by `trio` code.
 
 import contextlib
 import ssl as _stdlib_ssl
-from typing import Any
+from typing import Any, Awaitable
 
-from ..._net._tls import _is_eof, _SSLProxy
-from ..._tonio import ResourceBroken, TLSStream as _TLSStream
-from .._sync import Lock
+from ..._net._tls import (
+    _RECORD_SIZE,
+    TLSSessionCache as TLSSessionCache,
+    _is_eof,
+    _recv_pool,
+    _recv_size,
+    _SSLProxy,
+)
+from ..._tonio import BlockingExecutor, BufferLease, BufferPool, ResourceBroken, TLSStream as _TLSStream
+from .._ctl import _wait_blocking
+from .._sync import Lock, Semaphore
 from ._streams import _Stream
 
 
+class TLSHandshakePool:
+    """Bounds the concurrent handshakes of TLS listeners sharing the pool.
+
+    Listeners take a slot before accepting a connection, and release it once
+    the handshake ends: when all the slots are taken, pending connections stay
+    in the kernel backlog. When `threads` is given, the CPU-heavy handshake
+    steps run on a dedicated executor with up to `threads` threads, instead of
+    the runtime workers.
+    """
+
+    __slots__ = ['_slots', '_executor']
+
+    def __init__(self, max_concurrency: int = 64, threads: int = 0):
+        self._slots = Semaphore(max_concurrency)
+        self._executor = BlockingExecutor(threads) if threads else None
+
+    async def _acquire(self) -> None:
+        await self._slots.__aenter__()
+
+    def _release(self) -> None:
+        self._slots.release()
+
+    def _run(self, fn, *args) -> Awaitable[Any]:
+        return _wait_blocking(*self._executor._spawn(fn, *args))
+
+
 class TLSStream(_Stream, _TLSStream):
     __slots__ = [
         'transport',
@@ -26,6 +60,9 @@ class TLSStream(_Stream, _TLSStream):
         '_recv_count',
         '_recv_est_size',
         '_compat_https',
+        '_session_cache',
+        '_session_key',
+        '_session_pending',
     ]
 
     def __init__(
@@ -36,42 +73,70 @@ class TLSStream(_Stream, _TLSStream):
         server_hostname: str | bytes | None = None,
         server_side: bool = False,
         https_compatible: bool = False,
+        session_cache: TLSSessionCache | None = None,
+        session_key: Any = None,
     ):
         self.transport = transport
         self._compat_https = https_compatible
         self._lock_recv = Lock()
         self._lock_send = Lock()
-        self._egress_stack = bytearray()
+        self._egress_stack = []
         self._recv_count = 0
-        self._recv_est_size = 16384
+        self._recv_est_size = _RECORD_SIZE
+        self._session_cache = None if server_side else session_cache
+        self._session_key = server_hostname if session_key is None else session_key
+        self._session_pending = False
         self._ssl = _SSLProxy(
             ssl_context,
             server_side=server_side,
             server_hostname=server_hostname,
+            session=self._session_cache.get(self._session_key) if self._session_cache is not None else None,
         )
 
+    @property
+    def session_reused(self) -> bool:
+        return self._ssl.session_reused
+
+    def _session_store(self) -> None:
+        self._session_pending = False
+        if (session := self._ssl.session()) is not None:
+            self._session_cache.put(self._session_key, session)
+
     async def _recv(self) -> None:
         recv_count = self._recv_count
         async with self._lock_recv:
             if recv_count == self._recv_count:
-                data = await self.transport.receive_some()
-                if not data:
-                    self._ssl._ingress_write_eof()
+                if hasattr(self.transport, 'receive_into_pooled'):
+                    with await self.transport.receive_into_pooled(_recv_pool()) as data:
+                        self._ingest(data)
                 else:
-                    self._recv_est_size = max(
-                        self._recv_est_size,
-                        len(data),
-                    )
-                    self._ssl._ingress_write(data)
+                    self._ingest(await self.transport.receive_some())
                 self._recv_count += 1
 
+    def _ingest(self, data) -> None:
+        if not data:
+            self._ssl._ingress_write_eof()
+            return
+        #: the estimate follows bursts straight away, while decaying slowly on smaller reads,
+        #  down to a single record (the integer decay alone would stall a few bytes above the reads)
+        nbytes, est = len(data), self._recv_est_size
+        self._recv_est_size = nbytes if nbytes > est else max(_RECORD_SIZE, est - ((est - nbytes) >> 3))
+        self._ssl._ingress_write(data)
+
     async def _send(self, data) -> None:
         async with self._lock_send:
             try:
-                self._egress_stack.extend(data)
-                data = bytes(self._egress_stack)
-                self._egress_stack.clear()
-                await self.transport.send_all(data)
+                #: ciphertext chunks are sent as produced by the egress BIO, without concatenating them:
+                #  pending ones (deferred TLSv1.3 tickets) go along `data` with a single gather write
+                if not self._egress_stack:
+                    await self.transport.send_all(data)
+                    return
+                self._egress_stack.append(data)
+                chunks, self._egress_stack = self._egress_stack, []
+                if hasattr(self.transport, 'send_all_many'):
+                    await self.transport.send_all_many(chunks)
+                else:
+                    await self.transport.send_all(b''.join(chunks))
             except:
                 self._set_broken()
                 raise
@@ -93,19 +158,26 @@ class TLSStream(_Stream, _TLSStream):
                 return ret
 
     async def handshake(self) -> None:
+        await self._handshake(None)
+
+    async def _handshake(self, pool: TLSHandshakePool | None) -> None:
         self._handshake_pre()
 
+        offload = pool is not None and pool._executor is not None
         done = False
         while not done:
             try:
-                _, want_read, to_send = self._ssl._do_handshake()
+                if offload:
+                    _, want_read, to_send = await pool._run(self._ssl._do_handshake)
+                else:
+                    _, want_read, to_send = self._ssl._do_handshake()
             except (_stdlib_ssl.SSLError, _stdlib_ssl.CertificateError) as exc:
                 self._set_broken()
                 raise ResourceBroken from exc
             done = not want_read
 
-            if not want_read and self._ssl.server_side and self._ssl.version() == 'TLSv1.3':
-                self._egress_stack.extend(to_send)
+            if to_send and not want_read and self._ssl.server_side and self._ssl.version() == 'TLSv1.3':
+                self._egress_stack.append(to_send)
                 to_send = b''
 
             if to_send:
@@ -114,6 +186,12 @@ class TLSStream(_Stream, _TLSStream):
                 await self._recv()
 
         self._handshake_post()
+        if self._session_cache is not None:
+            #: TLSv1.3 tickets are sent after the handshake, so they land along the first records read
+            if self._ssl.version() == 'TLSv1.3':
+                self._session_pending = True
+            else:
+                self._session_store()
 
     async def send_all(self, data: bytes | bytearray | memoryview) -> None:
         self._check_ready()
@@ -124,15 +202,36 @@ class TLSStream(_Stream, _TLSStream):
     async def receive_some(self, max_bytes: int | None = None) -> bytes | bytearray:
         self._check_ready()
         if max_bytes is None:
-            max_bytes = max(self._recv_est_size, self._ssl._ingress_pending)
+            max_bytes = max(_recv_size(self._recv_est_size), self._ssl._ingress_pending)
         try:
             ret = await self._ssl_dance(self._ssl._read, max_bytes)
+            if self._session_pending:
+                self._session_store()
             return ret
         except ResourceBroken as exc:
             if self._compat_https and _is_eof(exc.__cause__):
                 return b''
             raise
 
+    async def receive_into_pooled(self, pool: BufferPool) -> BufferLease:
+        self._check_ready()
+        lease = pool.acquire()
+        try:
+            with memoryview(lease) as buf:
+                nbytes = await self._ssl_dance(self._ssl._read, len(buf), buf)
+        except ResourceBroken as exc:
+            if not (self._compat_https and _is_eof(exc.__cause__)):
+                lease.release()
+                raise
+            nbytes = 0
+        except BaseException:
+            lease.release()
+            raise
+        if self._session_pending:
+            self._session_store()
+        lease.truncate(nbytes)
+        return lease
+
     async def close(self) -> None:
         if self._state == 4:
             return
@@ -172,6 +271,7 @@ class TLSListener(_Stream):
         'transport',
         '_ssl',
         '_compat_https',
+        '_handshake_pool',
     ]
 
     def __init__(
@@ -180,20 +280,45 @@ class TLSListener(_Stream):
         ssl_context: _stdlib_ssl.SSLContext,
         *,
         https_compatible: bool = False,
+        handshake_pool: TLSHandshakePool | None = None,
     ) -> None:
         self.transport = transport
         self._ssl = ssl_context
         self._compat_https = https_compatible
+        self._handshake_pool = handshake_pool
+
+    def set_ssl_context(self, ssl_context: _stdlib_ssl.SSLContext) -> None:
+        #: used for the connections accepted from now on.
+        #  NOTE: OpenSSL keeps session ticket keys within the context, so this is a hard swap rather than
+        #        a rotation: there's no grace period, and tickets issued with the previous context can't be
+        #        resumed anymore, with clients falling back to a full handshake once.
+        self._ssl = ssl_context
+
+    async def _accept_pending(self) -> TLSStream:
+        #: takes a handshake slot and accepts a connection, the handshake is left to `_handshake_pending`
+        await self._handshake_pool._acquire()
+        try:
+            stream = await self.transport.accept()
+        except BaseException:
+            self._handshake_pool._release()
+            raise
+        return TLSStream(stream, self._ssl, server_side=True, https_compatible=self._compat_https)
+
+    async def _handshake_pending(self, stream: TLSStream) -> None:
+        try:
+            await stream._handshake(self._handshake_pool)
+        finally:
+            self._handshake_pool._release()
 
     async def accept(self) -> TLSStream:
-        stream = await self.transport.accept()
-        ret = TLSStream(
-            stream,
-            self._ssl,
-            server_side=True,
-            https_compatible=self._compat_https,
-        )
-        await ret.handshake()
+        if self._handshake_pool is None:
+            stream = await self.transport.accept()
+            ret = TLSStream(stream, self._ssl, server_side=True, https_compatible=self._compat_https)
+            await ret.handshake()
+            return ret
+
+        ret = await self._accept_pending()
+        await self._handshake_pending(ret)
         return ret
 
     def close(self) -> None:
@@ -0,0 +1,90 @@
+from .._streams import (
+    BufferedReceiveStream as _BufferedReceiveStream,
+    BufferedSendStream as _BufferedSendStream,
+)
+from ._ctl import spawn
+from ._sync import Lock
+
+
+class BufferedReceiveStream(_BufferedReceiveStream):
+    __slots__ = []
+
+    async def _fill(self) -> bool:
+        data = await self.transport.receive_some(self._chunk_size)
+        if not data:
+            return False
+        self._append(data)
+        return True
+
+    async def receive_some(self, max_bytes: int | None = None) -> bytes:
+        if not self.buffered:
+            return await self.transport.receive_some(max_bytes)
+        return self._consume(min(max_bytes or self.buffered, self.buffered))
+
+    async def receive_exactly(self, size: int) -> bytes:
+        while self.buffered < size:
+            if not await self._fill():
+                raise EOFError(f'stream ended after {self.buffered} of {size} bytes')
+        return self._consume(size)
+
+    async def _receive_until(self, delimiter: bytes, max_size: int, partial_on_eof: bool) -> bytes:
+        searched = 0
+        while (idx := self._buf.find(delimiter, self._pos + searched)) < 0:
+            if self.buffered >= max_size:
+                raise ValueError(f'delimiter not found within {max_size} bytes')
+            searched = max(0, self.buffered - len(delimiter) + 1)
+            if not await self._fill():
+                if partial_on_eof:
+                    return self._consume(self.buffered)
+                raise EOFError(f'stream ended before the delimiter, after {self.buffered} bytes')
+        size = idx + len(delimiter) - self._pos
+        if size > max_size:
+            raise ValueError(f'delimiter not found within {max_size} bytes')
+        return self._consume(size)
+
+
+class BufferedSendStream(_BufferedSendStream):
+    __slots__ = []
+
+    def __init__(self, transport, max_size: int = 65536, flush_on_tick: bool = True):
+        super().__init__(transport, max_size, flush_on_tick)
+        self._lock = Lock()
+
+    def _schedule_flush(self):
+        spawn.without_tracking(self._flush_deferred())
+
+    async def _send(self, chunks: list[bytes]) -> None:
+        if len(chunks) > 1 and hasattr(self.transport, 'send_all_many'):
+            await self.transport.send_all_many(chunks)
+        else:
+            await self.transport.send_all(b''.join(chunks))
+
+    async def send_all(self, data: bytes | bytearray | memoryview) -> None:
+        if self._buffer(data):
+            await self.flush()
+
+    async def flush(self) -> None:
+        async with self._lock:
+            if self._chunks:
+                self._sending = True
+                try:
+                    await self._send(self._take())
+                finally:
+                    self._sending = False
+
+    async def _flush_deferred(self) -> None:
+        self._flush_scheduled = False
+        try:
+            await self.flush()
+        except Exception as exc:
+            self._flush_exc = exc
+
+    async def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            await self.flush()
+            self._raise_flush_exc()
+        finally:
+            self.transport.close()
@@ -103,7 +103,10 @@ def select(*coros: Coro) -> Coro[Any]:
 
 
 def spawn_blocking(fn: Callable[_Params, _Return], /, *args: _Params.args, **kwargs: _Params.kwargs) -> Coro[_Return]:
-    ctl, event, res = get_runtime()._spawn_blocking(fn, *args, **kwargs)
+    return (yield _wait_blocking(*get_runtime()._spawn_blocking(fn, *args, **kwargs)))
+
+
+def _wait_blocking(ctl: Any, event: Any, res: Any) -> Coro[Any]:
     with contextlib.suppress(CancelledError):
         yield event.waiter(None)
     err, val = res.fetch()
@@ -10,6 +10,15 @@ def main(
     threads: int | None = None,
     blocking_threadpool_size: int = 128,
     blocking_threadpool_idle_ttl: int = 30,
+    timer_resolution: float | None = None,
+    steal_batch: int = 32,
+    coop_budget: int = 128,
+    io_drivers: int = 0,
+    worker_spin: int = 0,
+    min_threads: int | None = None,
+    threads_idle_ttl: int = 30,
+    worker_cpus: list[int] | None = None,
+    poll_cpus: list[int] | None = None,
 ):
     if not coros:
         #: opts
@@ -23,6 +32,15 @@ def main(
                     threads=threads,
                     blocking_threadpool_size=blocking_threadpool_size,
                     blocking_threadpool_idle_ttl=blocking_threadpool_idle_ttl,
+                    timer_resolution=timer_resolution,
+                    steal_batch=steal_batch,
+                    coop_budget=coop_budget,
+                    io_drivers=io_drivers,
+                    worker_spin=worker_spin,
+                    min_threads=min_threads,
+                    threads_idle_ttl=threads_idle_ttl,
+                    worker_cpus=worker_cpus,
+                    poll_cpus=poll_cpus,
                 )
 
             return wrapper
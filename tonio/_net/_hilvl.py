@@ -7,6 +7,7 @@ Heavily inspired by `trio` code.
 """
 
 import errno
+import functools
 import os
 import socket as _stdlib_socket
 import ssl as _stdlib_ssl
@@ -18,10 +19,12 @@ from .._ctl import spawn, spawn_blocking
 from .._events import Event
 from .._scope import scope
 from .._time import sleep
+from .._tonio import ResourceBroken
 from .._types import Coro
+from ._rustls import RustlsConfig, RustlsListener, RustlsStream
 from ._socket import _Socket, getaddrinfo, socket
-from ._streams import SocketListener, SocketStream
-from ._tls import TLSListener, TLSStream
+from ._streams import DatagramEndpoint, SocketListener, SocketStream
+from ._tls import TLSHandshakePool, TLSListener, TLSSessionCache, TLSStream
 
 
 _accept_retry_errnos = {
@@ -86,6 +89,12 @@ def _unix_bind(sock: _stdlib_socket.socket, path: str | bytes, mode: int | None)
             raise
 
 
+def _set_reuse_port(sock: _Socket) -> None:
+    if not hasattr(_stdlib_socket, 'SO_REUSEPORT'):
+        raise OSError(errno.ENOPROTOOPT, 'SO_REUSEPORT is not supported on this platform')
+    sock.setsockopt(_stdlib_socket.SOL_SOCKET, _stdlib_socket.SO_REUSEPORT, 1)
+
+
 def open_tcp_stream(
     host: str | bytes,
     port: int,
@@ -176,6 +185,8 @@ def open_tcp_listeners(
     *,
     host: str | bytes | None = None,
     backlog: int | None = None,
+    reuse_port: int = 0,
+    cpu_steering: bool = False,
 ) -> Coro[list[SocketListener]]:
     if not isinstance(port, int):
         raise TypeError(f'port must be an int not {port!r}')
@@ -192,28 +203,39 @@ def open_tcp_listeners(
     unsupported_address_families = []
     try:
         for family, type_, proto, _, sockaddr in addresses:
-            try:
-                sock = socket(family, type_, proto)
-            except OSError as ex:
-                if ex.errno == errno.EAFNOSUPPORT:
-                    unsupported_address_families.append(ex)
-                    continue
-                else:
-                    raise
-            try:
-                if sys.platform != 'win32':
-                    sock.setsockopt(_stdlib_socket.SOL_SOCKET, _stdlib_socket.SO_REUSEADDR, 1)
+            #: with `reuse_port`, a group of sockets sharing the address, each with its own accept queue
+            group_start = len(listeners)
+            for _ in range(max(1, reuse_port)):
+                try:
+                    sock = socket(family, type_, proto)
+                except OSError as ex:
+                    if ex.errno == errno.EAFNOSUPPORT:
+                        unsupported_address_families.append(ex)
+                        break
+                    else:
+                        raise
+                try:
+                    if sys.platform != 'win32':
+                        sock.setsockopt(_stdlib_socket.SOL_SOCKET, _stdlib_socket.SO_REUSEADDR, 1)
 
-                if family == _stdlib_socket.AF_INET6:
-                    sock.setsockopt(_stdlib_socket.IPPROTO_IPV6, _stdlib_socket.IPV6_V6ONLY, 1)
+                    if reuse_port:
+                        _set_reuse_port(sock)
 
-                yield sock.bind(sockaddr)
-                sock.listen(backlog)
+                    if family == _stdlib_socket.AF_INET6:
+                        sock.setsockopt(_stdlib_socket.IPPROTO_IPV6, _stdlib_socket.IPV6_V6ONLY, 1)
 
-                listeners.append(SocketListener(sock))
-            except:
-                sock.close()
-                raise
+                    yield sock.bind(sockaddr)
+                    sock.listen(backlog)
+                    # NOTE: when an ephemeral port is requested, the rest of the group should bind the same one
+                    sockaddr = sock.getsockname()
+
+                    listeners.append(SocketListener(sock))
+                except:
+                    sock.close()
+                    raise
+
+            if cpu_steering and reuse_port and len(listeners) > group_start:
+                listeners[group_start].socket._attach_reuseport_cbpf(len(listeners) - group_start)
     except:
         for listener in listeners:
             listener.close()
@@ -249,18 +271,36 @@ def serve_listeners(
     handler: Any,
     listeners: list[SocketListener],
 ) -> Coro[None]:
+    def _handshake_and_handle(listener: Any, stream: Any):
+        try:
+            yield listener._handshake_pending(stream)
+        except OSError, ResourceBroken:
+            stream.transport.close()
+            return
+        yield handler(stream)
+
     def _listener_handler(listener: SocketListener):
+        #: plain socket listeners drain their backlog in batches
+        batched = isinstance(listener, SocketListener)
+        #: with a handshake pool, TLS handshakes run within the connection tasks
+        deferred = getattr(listener, '_handshake_pool', None) is not None
         with listener:
             while True:
                 try:
-                    stream = yield listener.accept()
+                    if batched:
+                        streams = yield listener.accept_many()
+                    elif deferred:
+                        streams = [(yield listener._accept_pending())]
+                    else:
+                        streams = [(yield listener.accept())]
                 except OSError as exc:
                     if exc.errno in _accept_retry_errnos:
                         yield sleep(0.1)
                     else:
                         raise
                 else:
-                    spawn.without_tracking(handler(stream))
+                    for stream in streams:
+                        spawn.without_tracking(_handshake_and_handle(listener, stream) if deferred else handler(stream))
 
     tasks = []
     for listener in listeners:
@@ -275,8 +315,16 @@ def serve_tcp(
     *,
     host: str | bytes | None = None,
     backlog: int | None = None,
+    reuse_port: int = 0,
+    cpu_steering: bool = False,
 ) -> Coro[None]:
-    listeners = yield open_tcp_listeners(port, host=host, backlog=backlog)
+    listeners = yield open_tcp_listeners(
+        port,
+        host=host,
+        backlog=backlog,
+        reuse_port=reuse_port,
+        cpu_steering=cpu_steering,
+    )
     yield serve_listeners(handler, listeners)
 
 
@@ -291,46 +339,159 @@ def serve_unix(
     yield serve_listeners(handler, [listener])
 
 
+def open_udp_endpoint(
+    local: tuple[str | bytes | None, int] | None = None,
+    remote: tuple[str | bytes, int] | None = None,
+    *,
+    reuse_port: bool = False,
+) -> Coro[DatagramEndpoint]:
+    if local is None and remote is None:
+        raise ValueError('at least one of local and remote addresses is required')
+
+    if remote is not None:
+        targets = yield getaddrinfo(*remote, type=_stdlib_socket.SOCK_DGRAM)
+    else:
+        targets = yield getaddrinfo(*local, type=_stdlib_socket.SOCK_DGRAM, flags=_stdlib_socket.AI_PASSIVE)
+    family, type_, proto, _, sockaddr = targets[0]
+
+    sock = socket(family, type_, proto)
+    with _close_on_error(sock):
+        if reuse_port:
+            _set_reuse_port(sock)
+        if remote is None:
+            yield sock.bind(sockaddr)
+        else:
+            if local is not None:
+                yield sock.bind(local)
+            yield sock.connect(sockaddr)
+    return DatagramEndpoint(sock)
+
+
+def serve_udp(
+    handler: Any,
+    port: int,
+    *,
+    host: str | bytes | None = None,
+    workers: int = 1,
+    max_msgs: int = 64,
+    max_bytes: int = 4096,
+) -> Coro[None]:
+    if not isinstance(port, int):
+        raise TypeError(f'port must be an int not {port!r}')
+
+    addresses = yield getaddrinfo(
+        host,
+        port,
+        type=_stdlib_socket.SOCK_DGRAM,
+        flags=_stdlib_socket.AI_PASSIVE,
+    )
+    family, type_, proto, _, sockaddr = addresses[0]
+
+    #: one socket per worker, the kernel distributes datagrams among them
+    endpoints = []
+    try:
+        for _ in range(max(1, workers)):
+            sock = socket(family, type_, proto)
+            endpoints.append(DatagramEndpoint(sock))
+            if workers > 1:
+                _set_reuse_port(sock)
+            yield sock.bind(sockaddr)
+            # NOTE: when an ephemeral port is requested, the following sockets should bind the same one
+            sockaddr = sock.getsockname()
+    except:
+        for endpoint in endpoints:
+            endpoint.close()
+        raise
+
+    def _endpoint_handler(endpoint: DatagramEndpoint):
+        with endpoint:
+            while True:
+                msgs = yield endpoint.receive_many(max_msgs, max_bytes)
+                for data, address in msgs:
+                    spawn.without_tracking(handler(endpoint, data, address))
+
+    tasks = []
+    for endpoint in endpoints:
+        tasks.append(_endpoint_handler(endpoint))
+
+    yield spawn.without_results(*tasks)
+
+
+@functools.cache
+def _default_client_context() -> _stdlib_ssl.SSLContext:
+    #: shared among connections, so that sessions can be resumed
+    ssl_context = _stdlib_ssl.create_default_context()
+
+    if hasattr(_stdlib_ssl, 'OP_IGNORE_UNEXPECTED_EOF'):
+        ssl_context.options &= ~_stdlib_ssl.OP_IGNORE_UNEXPECTED_EOF
+
+    return ssl_context
+
+
+def _is_rustls_config(ssl_context: Any) -> bool:
+    return RustlsConfig is not None and isinstance(ssl_context, RustlsConfig)
+
+
 def open_tls_over_tcp_stream(
     host: str | bytes,
     port: int,
     *,
     https_compatible: bool = False,
-    ssl_context: _stdlib_ssl.SSLContext | None = None,
+    ssl_context: _stdlib_ssl.SSLContext | RustlsConfig | None = None,
     happy_eyeballs_delay: float | None = None,
-) -> Coro[TLSStream]:
+    session_cache: TLSSessionCache | None = None,
+) -> Coro[TLSStream | RustlsStream]:
     tcp_stream = yield open_tcp_stream(
         host,
         port,
         happy_eyeballs_delay=happy_eyeballs_delay,
     )
     if ssl_context is None:
-        ssl_context = _stdlib_ssl.create_default_context()
-
-        if hasattr(_stdlib_ssl, 'OP_IGNORE_UNEXPECTED_EOF'):
-            ssl_context.options &= ~_stdlib_ssl.OP_IGNORE_UNEXPECTED_EOF
-
-    ret = TLSStream(
-        tcp_stream,
-        ssl_context,
-        server_hostname=host,
-        https_compatible=https_compatible,
-    )
+        ssl_context = _default_client_context()
+
+    if _is_rustls_config(ssl_context):
+        #: rustls configs keep their own sessions cache
+        ret = RustlsStream(
+            tcp_stream,
+            ssl_context,
+            server_hostname=host,
+            https_compatible=https_compatible,
+        )
+    else:
+        ret = TLSStream(
+            tcp_stream,
+            ssl_context,
+            server_hostname=host,
+            https_compatible=https_compatible,
+            session_cache=TLSSessionCache.for_context(ssl_context) if session_cache is None else session_cache,
+            session_key=(host, port),
+        )
     yield ret.handshake()
     return ret
 
 
 def open_tls_over_tcp_listeners(
     port: int,
-    ssl_context: _stdlib_ssl.SSLContext | None = None,
+    ssl_context: _stdlib_ssl.SSLContext | RustlsConfig | None = None,
     *,
     host: str | bytes | None = None,
     https_compatible: bool = False,
     backlog: int | None = None,
-) -> Coro[list[TLSListener]]:
-    tcp_listeners = yield open_tcp_listeners(port, host=host, backlog=backlog)
+    reuse_port: int = 0,
+    cpu_steering: bool = False,
+    handshake_pool: TLSHandshakePool | None = None,
+) -> Coro[list[TLSListener | RustlsListener]]:
+    tcp_listeners = yield open_tcp_listeners(
+        port,
+        host=host,
+        backlog=backlog,
+        reuse_port=reuse_port,
+        cpu_steering=cpu_steering,
+    )
+    listener_cls = RustlsListener if _is_rustls_config(ssl_context) else TLSListener
     tls_listeners = [
-        TLSListener(tcp_listener, ssl_context, https_compatible=https_compatible) for tcp_listener in tcp_listeners
+        listener_cls(tcp_listener, ssl_context, https_compatible=https_compatible, handshake_pool=handshake_pool)
+        for tcp_listener in tcp_listeners
     ]
     return tls_listeners
 
@@ -338,11 +499,14 @@ def open_tls_over_tcp_listeners(
 def serve_tls_over_tcp(
     handler: Any,
     port: int,
-    ssl_context: _stdlib_ssl.SSLContext,
+    ssl_context: _stdlib_ssl.SSLContext | RustlsConfig,
     *,
     host: str | bytes | None = None,
     https_compatible: bool = False,
     backlog: int | None = None,
+    reuse_port: int = 0,
+    cpu_steering: bool = False,
+    handshake_pool: TLSHandshakePool | None = None,
 ) -> Coro[None]:
     listeners = yield open_tls_over_tcp_listeners(
         port,
@@ -350,5 +514,8 @@ def serve_tls_over_tcp(
         host=host,
         https_compatible=https_compatible,
         backlog=backlog,
+        reuse_port=reuse_port,
+        cpu_steering=cpu_steering,
+        handshake_pool=handshake_pool,
     )
     yield serve_listeners(handler, listeners)
@@ -0,0 +1,151 @@
+import contextlib
+from typing import Any
+
+from .._tonio import ResourceBroken, TLSStream as _TLSStream, Waiter as _Waiter
+from .._types import Coro
+from ._streams import SocketListener, SocketStream, _Stream
+from ._tls import TLSHandshakePool
+
+
+try:
+    from .._tonio import RustlsConfig, RustlsConnection as _RustlsConnection
+except ImportError:
+    #: built without the `rustls` feature
+    RustlsConfig = _RustlsConnection = None
+
+
+class RustlsStream(_Stream, _TLSStream):
+    __slots__ = ['transport', '_conn', '_compat_https']
+
+    def __init__(
+        self,
+        transport: SocketStream,
+        config: Any,
+        *,
+        server_hostname: str | bytes | None = None,
+        https_compatible: bool = False,
+    ):
+        if not isinstance(transport, SocketStream):
+            raise TypeError('RustlsStream requires a SocketStream transport')
+        if isinstance(server_hostname, bytes):
+            server_hostname = server_hostname.decode('ascii')
+        self.transport = transport
+        self._compat_https = https_compatible
+        # NOTE: the connection drives the transport socket on its own
+        self._conn = _RustlsConnection(config, transport.socket, server_hostname)
+
+    def selected_alpn_protocol(self) -> str | None:
+        return self._conn.selected_alpn_protocol()
+
+    @property
+    def session_reused(self) -> bool:
+        return self._conn.session_reused
+
+    def handshake(self) -> Coro[None]:
+        self._handshake_pre()
+        try:
+            while (ret := self._conn._handshake()) is not None:
+                yield ret
+        except:
+            self._set_broken()
+            raise
+        self._handshake_post()
+
+    def send_all(self, data: bytes | bytearray | memoryview) -> Coro[None]:
+        self._check_ready()
+        try:
+            with memoryview(data) as data:
+                total_sent = 0
+                while total_sent < len(data):
+                    with data[total_sent:] as remaining:
+                        while (ret := self._conn._send(remaining)).__class__ is _Waiter:
+                            yield ret
+                    total_sent += ret
+            while (ret := self._conn._flush()) is not None:
+                yield ret
+        except:
+            self._set_broken()
+            raise
+
+    def receive_some(self, max_bytes: int | None = None) -> Coro[bytes]:
+        self._check_ready()
+        try:
+            while (ret := self._conn._recv(max_bytes or 65536, self._compat_https)).__class__ is _Waiter:
+                yield ret
+        except OSError, ResourceBroken:
+            self._set_broken()
+            raise
+        return ret
+
+    def close(self) -> Coro[None]:
+        if self._state == 4:
+            return
+
+        skip_notify = self._state == 3 or self._compat_https
+        self._set_closed()
+        try:
+            if not skip_notify:
+                with contextlib.suppress(OSError, ResourceBroken):
+                    self._conn._close_notify()
+                    while (ret := self._conn._flush()) is not None:
+                        yield ret
+        finally:
+            self.transport.close()
+
+    def __exit__(self, *args, **kwargs) -> None:
+        if self._state == 4:
+            return
+
+        if self._state == 3 or self._compat_https:
+            self._set_closed()
+            self.transport.close()
+            return
+
+        raise RuntimeError('RustlsStream needs to be manually closed')
+
+
+class RustlsListener(_Stream):
+    __slots__ = ['transport', '_config', '_compat_https', '_handshake_pool']
+
+    def __init__(
+        self,
+        transport: SocketListener,
+        config: Any,
+        *,
+        https_compatible: bool = False,
+        handshake_pool: TLSHandshakePool | None = None,
+    ):
+        self.transport = transport
+        self._config = config
+        self._compat_https = https_compatible
+        self._handshake_pool = handshake_pool
+
+    def _accept_pending(self) -> Coro[RustlsStream]:
+        yield self._handshake_pool._acquire()
+        try:
+            stream = yield self.transport.accept()
+        except BaseException:
+            self._handshake_pool._release()
+            raise
+        return RustlsStream(stream, self._config, https_compatible=self._compat_https)
+
+    def _handshake_pending(self, stream: RustlsStream) -> Coro[None]:
+        #: native handshakes run on the worker, so pools only bound their concurrency
+        try:
+            yield stream.handshake()
+        finally:
+            self._handshake_pool._release()
+
+    def accept(self) -> Coro[RustlsStream]:
+        if self._handshake_pool is None:
+            stream = yield self.transport.accept()
+            ret = RustlsStream(stream, self._config, https_compatible=self._compat_https)
+            yield ret.handshake()
+            return ret
+
+        ret = yield self._accept_pending()
+        yield self._handshake_pending(ret)
+        return ret
+
+    def close(self) -> None:
+        self.transport.close()
@@ -4,10 +4,10 @@ import os
 import socket as _stdlib_socket
 import sys
 from types import TracebackType
-from typing import Any
+from typing import Any, Sequence
 
 from .._ctl import spawn_blocking
-from .._tonio import Socket as _SocketWrapper
+from .._tonio import BufferLease, BufferPool, Socket as _SocketWrapper, Waiter as _Waiter
 from .._types import Coro
 
 
@@ -159,6 +159,12 @@ class _Socket(_SocketWrapper):
 
         return from_stdlib_socket(conn), address
 
+    def accept_many(self, max_n: int = 128) -> Coro[list[tuple[_Socket, Any]]]:
+        # NOTE: drains up to `max_n` pending connections per readiness edge natively
+        while (ret := self._accept_many(_Socket, max_n)).__class__ is _Waiter:
+            yield ret
+        return ret
+
     def connect(self, address: Any) -> Coro[None]:
         address = yield self._resolve_address(address, local=False)
 
@@ -191,41 +197,20 @@ class _Socket(_SocketWrapper):
                 break
 
     def recv(self, bufsize: int, flags: int = 0, /) -> Coro[bytes]:
-        while True:
-            if (waiter := self._io_arm_r()) is not None:
-                yield waiter
-                continue
-
-            try:
-                ret = self._sock.recv(bufsize, flags)
-            except InterruptedError:
-                pass
-            except BlockingIOError:
-                self._io_clear_r()
-            except BaseException as exc:
-                raise exc
-            else:
-                break
+        # NOTE: `_recv` performs the syscall natively, returning a waiter while not readable
+        while (ret := self._recv(bufsize, flags)).__class__ is _Waiter:
+            yield ret
+        return ret
 
+    def recv_pooled(self, pool: BufferPool, flags: int = 0, /) -> Coro[BufferLease]:
+        # NOTE: the returned lease holds a slab of `pool` until released
+        while (ret := self._recv_pooled(pool, flags)).__class__ is _Waiter:
+            yield ret
         return ret
 
     def recv_into(self, /, buffer, nbytes: int = 0, flags: int = 0) -> Coro[int]:
-        while True:
-            if (waiter := self._io_arm_r()) is not None:
-                yield waiter
-                continue
-
-            try:
-                ret = self._sock.recv_into(buffer, nbytes, flags)
-            except InterruptedError:
-                pass
-            except BlockingIOError:
-                self._io_clear_r()
-            except BaseException as exc:
-                raise exc
-            else:
-                break
-
+        while (ret := self._recv_into(buffer, nbytes, flags)).__class__ is _Waiter:
+            yield ret
         return ret
 
     def recvfrom(self, bufsize: int, flags: int = 0, /) -> Coro[tuple[bytes, Any]]:
@@ -266,6 +251,12 @@ class _Socket(_SocketWrapper):
 
         return ret
 
+    def recv_many(self, max_msgs: int = 64, bufsize: int = 4096, /) -> Coro[list[tuple[bytes, Any]]]:
+        # NOTE: all the datagrams available up to `max_msgs` get received with a single syscall
+        while (ret := self._recv_many(max_msgs, bufsize)).__class__ is _Waiter:
+            yield ret
+        return ret
+
     if sys.platform != 'win32':
 
         def recvmsg(
@@ -322,27 +313,32 @@ class _Socket(_SocketWrapper):
         if not data:
             return 0
 
-        try:
-            return self._sock.send(data, flags)
-        except BlockingIOError, InterruptedError:
-            pass
-
-        while True:
-            if (waiter := self._io_arm_w()) is not None:
-                yield waiter
-                continue
-
-            try:
-                ret = self._sock.send(data, flags)
-            except InterruptedError:
-                pass
-            except BlockingIOError:
-                self._io_clear_w()
-            except BaseException as exc:
-                raise exc
-            else:
-                break
+        while (ret := self._send(data, flags)).__class__ is _Waiter:
+            yield ret
+        return ret
 
+    def sendfile(self, file: Any, offset: int = 0, count: int | None = None) -> Coro[int]:
+        # NOTE: like the stdlib counterpart, `file` should be a regular file opened in binary mode,
+        #       and its position is moved past the sent data on return
+        fileno = file.fileno()
+        if count is None:
+            count = os.fstat(fileno).st_size - offset
+        total_sent = 0
+        try:
+            while total_sent < count:
+                while (ret := self._sendfile(fileno, offset + total_sent, count - total_sent)).__class__ is _Waiter:
+                    yield ret
+                if not ret:
+                    break
+                total_sent += ret
+        finally:
+            if total_sent > 0 and hasattr(file, 'seek'):
+                file.seek(offset + total_sent)
+        return total_sent
+
+    def sendv(self, buffers: Sequence[Any], index: int = 0, offset: int = 0, /) -> Coro[int]:
+        while (ret := self._sendv(buffers, index, offset)).__class__ is _Waiter:
+            yield ret
         return ret
 
     def sendto(self, data, address) -> Coro[int]:
@@ -373,6 +369,16 @@ class _Socket(_SocketWrapper):
 
         return ret
 
+    def send_many(self, msgs: Sequence[tuple[Any, Any]], /) -> Coro[int]:
+        # NOTE: addresses should be numeric (or `None` on connected sockets), as they're not resolved
+        msgs = list(msgs)
+        total_sent = 0
+        while total_sent < len(msgs):
+            while (ret := self._send_many(msgs, total_sent)).__class__ is _Waiter:
+                yield ret
+            total_sent += ret
+        return total_sent
+
     if sys.platform != 'win32':
 
         def sendmsg(
@@ -408,8 +414,6 @@ class _Socket(_SocketWrapper):
 
             return ret
 
-    # not impl:
-    #   coro def sendfile
     # intentionally omitted:
     #   sendall
     #   makefile
@@ -7,12 +7,15 @@ Heavily inspired by `trio` code.
 """
 
 import contextlib
+import functools
 import ssl as _stdlib_ssl
 import threading
+import weakref
 from typing import Any
 
-from .._sync import Lock
-from .._tonio import ResourceBroken, TLSStream as _TLSStream
+from .._ctl import _wait_blocking
+from .._sync import Lock, Semaphore
+from .._tonio import BlockingExecutor, BufferLease, BufferPool, ResourceBroken, TLSStream as _TLSStream
 from .._types import Coro
 from ._streams import _Stream
 
@@ -21,6 +24,21 @@ def _is_eof(exc: BaseException | None) -> bool:
     return isinstance(exc, _stdlib_ssl.SSLEOFError) or ('UNEXPECTED_EOF_WHILE_READING' in getattr(exc, 'strerror', ()))
 
 
+#: max plaintext size of a TLS record
+_RECORD_SIZE = 16384
+
+
+@functools.cache
+def _recv_pool() -> BufferPool:
+    #: ciphertext receive buffers, shared among TLS streams
+    return BufferPool()
+
+
+def _recv_size(est_size: int) -> int:
+    #: rounds up the given estimate to whole TLS records
+    return -(-est_size // _RECORD_SIZE) * _RECORD_SIZE
+
+
 class _SSLProxy:
     __slots__ = [
         '_ingress',
@@ -34,6 +52,7 @@ class _SSLProxy:
         ssl_context: _stdlib_ssl.SSLContext,
         server_side: bool,
         server_hostname: str | bytes | None,
+        session: _stdlib_ssl.SSLSession | None = None,
     ):
         self._lock = threading.Lock()
         self._ingress = _stdlib_ssl.MemoryBIO()
@@ -43,6 +62,7 @@ class _SSLProxy:
             self._egress,
             server_side=server_side,
             server_hostname=server_hostname,
+            session=session,
         )
 
     @property
@@ -56,6 +76,14 @@ class _SSLProxy:
         with self._lock:
             return self._inner.selected_alpn_protocol()
 
+    def session(self) -> _stdlib_ssl.SSLSession | None:
+        with self._lock:
+            return self._inner.session
+
+    @property
+    def session_reused(self) -> bool:
+        return self._inner.session_reused
+
     def read(self, len: int = 1024, buffer: Any = None) -> bytes:
         with self._lock:
             return self._inner.read(len, buffer)
@@ -77,8 +105,8 @@ class _SSLProxy:
         with self._lock:
             self._ingress.write_eof()
 
-    def _read(self, max_bytes: int) -> tuple[Any, bool, bytes]:
-        return self._step(self._inner.read, max_bytes)
+    def _read(self, max_bytes: int, buffer: Any = None) -> tuple[Any, bool, bytes]:
+        return self._step(self._inner.read, max_bytes, buffer)
 
     def _write(self, data) -> tuple[Any, bool, bytes]:
         return self._step(self._inner.write, data)
@@ -99,6 +127,82 @@ class _SSLProxy:
             return ret, want_read, self._egress.read()
 
 
+class TLSSessionCache:
+    """A bounded LRU of client-side TLS sessions.
+
+    Sessions are only valid within the `SSLContext` which produced them,
+    thus a cache should never be shared among different contexts.
+    """
+
+    __slots__ = ['_lock', '_sessions', 'max_size']
+
+    def __init__(self, max_size: int = 256):
+        self._lock = threading.Lock()
+        self._sessions: dict[Any, _stdlib_ssl.SSLSession] = {}
+        self.max_size = max_size
+
+    @classmethod
+    def for_context(cls, ssl_context: _stdlib_ssl.SSLContext) -> TLSSessionCache:
+        #: the default cache of the given context
+        with _context_caches_lock:
+            if (cache := _context_caches.get(ssl_context)) is None:
+                cache = _context_caches[ssl_context] = cls()
+            return cache
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, key: Any) -> _stdlib_ssl.SSLSession | None:
+        with self._lock:
+            if (session := self._sessions.pop(key, None)) is not None:
+                self._sessions[key] = session
+            return session
+
+    def put(self, key: Any, session: _stdlib_ssl.SSLSession) -> None:
+        with self._lock:
+            self._sessions.pop(key, None)
+            if self.max_size <= 0:
+                return
+            #: dicts keep insertion order, so the first key is the least recently used one
+            while len(self._sessions) >= self.max_size:
+                del self._sessions[next(iter(self._sessions))]
+            self._sessions[key] = session
+
+    def discard(self, key: Any) -> None:
+        with self._lock:
+            self._sessions.pop(key, None)
+
+
+_context_caches: weakref.WeakKeyDictionary[_stdlib_ssl.SSLContext, TLSSessionCache] = weakref.WeakKeyDictionary()
+_context_caches_lock = threading.Lock()
+
+
+class TLSHandshakePool:
+    """Bounds the concurrent handshakes of TLS listeners sharing the pool.
+
+    Listeners take a slot before accepting a connection, and release it once
+    the handshake ends: when all the slots are taken, pending connections stay
+    in the kernel backlog. When `threads` is given, the CPU-heavy handshake
+    steps run on a dedicated executor with up to `threads` threads, instead of
+    the runtime workers.
+    """
+
+    __slots__ = ['_slots', '_executor']
+
+    def __init__(self, max_concurrency: int = 64, threads: int = 0):
+        self._slots = Semaphore(max_concurrency)
+        self._executor = BlockingExecutor(threads) if threads else None
+
+    def _acquire(self) -> Coro[None]:
+        yield self._slots()
+
+    def _release(self) -> None:
+        self._slots.release()
+
+    def _run(self, fn, *args) -> Coro[Any]:
+        return _wait_blocking(*self._executor._spawn(fn, *args))
+
+
 class TLSStream(_Stream, _TLSStream):
     __slots__ = [
         'transport',
@@ -109,6 +213,9 @@ class TLSStream(_Stream, _TLSStream):
         '_recv_count',
         '_recv_est_size',
         '_compat_https',
+        '_session_cache',
+        '_session_key',
+        '_session_pending',
     ]
 
     def __init__(
@@ -119,42 +226,71 @@ class TLSStream(_Stream, _TLSStream):
         server_hostname: str | bytes | None = None,
         server_side: bool = False,
         https_compatible: bool = False,
+        session_cache: TLSSessionCache | None = None,
+        session_key: Any = None,
     ):
         self.transport = transport
         self._compat_https = https_compatible
         self._lock_recv = Lock()
         self._lock_send = Lock()
-        self._egress_stack = bytearray()
+        self._egress_stack = []
         self._recv_count = 0
-        self._recv_est_size = 16384
+        self._recv_est_size = _RECORD_SIZE
+        self._session_cache = None if server_side else session_cache
+        self._session_key = server_hostname if session_key is None else session_key
+        self._session_pending = False
         self._ssl = _SSLProxy(
             ssl_context,
             server_side=server_side,
             server_hostname=server_hostname,
+            session=self._session_cache.get(self._session_key) if self._session_cache is not None else None,
         )
 
+    @property
+    def session_reused(self) -> bool:
+        return self._ssl.session_reused
+
+    def _session_store(self) -> None:
+        self._session_pending = False
+        if (session := self._ssl.session()) is not None:
+            self._session_cache.put(self._session_key, session)
+
     def _recv(self) -> Coro[None]:
         recv_count = self._recv_count
         with (yield self._lock_recv()):
             if recv_count == self._recv_count:
-                data = yield self.transport.receive_some()
-                if not data:
-                    self._ssl._ingress_write_eof()
+                #: when supported, ciphertext lands in a pooled slab, which is released once copied into the BIO
+                if hasattr(self.transport, 'receive_into_pooled'):
+                    with (yield self.transport.receive_into_pooled(_recv_pool())) as data:
+                        self._ingest(data)
                 else:
-                    self._recv_est_size = max(
-                        self._recv_est_size,
-                        len(data),
-                    )
-                    self._ssl._ingress_write(data)
+                    self._ingest((yield self.transport.receive_some()))
                 self._recv_count += 1
 
+    def _ingest(self, data) -> None:
+        if not data:
+            self._ssl._ingress_write_eof()
+            return
+        #: the estimate follows bursts straight away, while decaying slowly on smaller reads,
+        #  down to a single record (the integer decay alone would stall a few bytes above the reads)
+        nbytes, est = len(data), self._recv_est_size
+        self._recv_est_size = nbytes if nbytes > est else max(_RECORD_SIZE, est - ((est - nbytes) >> 3))
+        self._ssl._ingress_write(data)
+
     def _send(self, data) -> Coro[None]:
         with (yield self._lock_send()):
             try:
-                self._egress_stack.extend(data)
-                data = bytes(self._egress_stack)
-                self._egress_stack.clear()
-                yield self.transport.send_all(data)
+                #: ciphertext chunks are sent as produced by the egress BIO, without concatenating them:
+                #  pending ones (deferred TLSv1.3 tickets) go along `data` with a single gather write
+                if not self._egress_stack:
+                    yield self.transport.send_all(data)
+                    return
+                self._egress_stack.append(data)
+                chunks, self._egress_stack = self._egress_stack, []
+                if hasattr(self.transport, 'send_all_many'):
+                    yield self.transport.send_all_many(chunks)
+                else:
+                    yield self.transport.send_all(b''.join(chunks))
             except:
                 self._set_broken()
                 raise
@@ -176,19 +312,26 @@ class TLSStream(_Stream, _TLSStream):
                 return ret
 
     def handshake(self) -> Coro[None]:
+        return self._handshake(None)
+
+    def _handshake(self, pool: TLSHandshakePool | None) -> Coro[None]:
         self._handshake_pre()
 
+        offload = pool is not None and pool._executor is not None
         done = False
         while not done:
             try:
-                _, want_read, to_send = self._ssl._do_handshake()
+                if offload:
+                    _, want_read, to_send = yield pool._run(self._ssl._do_handshake)
+                else:
+                    _, want_read, to_send = self._ssl._do_handshake()
             except (_stdlib_ssl.SSLError, _stdlib_ssl.CertificateError) as exc:
                 self._set_broken()
                 raise ResourceBroken from exc
             done = not want_read
 
-            if not want_read and self._ssl.server_side and self._ssl.version() == 'TLSv1.3':
-                self._egress_stack.extend(to_send)
+            if to_send and not want_read and self._ssl.server_side and self._ssl.version() == 'TLSv1.3':
+                self._egress_stack.append(to_send)
                 to_send = b''
 
             if to_send:
@@ -197,6 +340,12 @@ class TLSStream(_Stream, _TLSStream):
                 yield self._recv()
 
         self._handshake_post()
+        if self._session_cache is not None:
+            #: TLSv1.3 tickets are sent after the handshake, so they land along the first records read
+            if self._ssl.version() == 'TLSv1.3':
+                self._session_pending = True
+            else:
+                self._session_store()
 
     def send_all(self, data: bytes | bytearray | memoryview) -> Coro[None]:
         self._check_ready()
@@ -207,15 +356,36 @@ class TLSStream(_Stream, _TLSStream):
     def receive_some(self, max_bytes: int | None = None) -> Coro[bytes | bytearray]:
         self._check_ready()
         if max_bytes is None:
-            max_bytes = max(self._recv_est_size, self._ssl._ingress_pending)
+            max_bytes = max(_recv_size(self._recv_est_size), self._ssl._ingress_pending)
         try:
             ret = yield self._ssl_dance(self._ssl._read, max_bytes)
+            if self._session_pending:
+                self._session_store()
             return ret
         except ResourceBroken as exc:
             if self._compat_https and _is_eof(exc.__cause__):
                 return b''
             raise
 
+    def receive_into_pooled(self, pool: BufferPool) -> Coro[BufferLease]:
+        self._check_ready()
+        lease = pool.acquire()
+        try:
+            with memoryview(lease) as buf:
+                nbytes = yield self._ssl_dance(self._ssl._read, len(buf), buf)
+        except ResourceBroken as exc:
+            if not (self._compat_https and _is_eof(exc.__cause__)):
+                lease.release()
+                raise
+            nbytes = 0
+        except BaseException:
+            lease.release()
+            raise
+        if self._session_pending:
+            self._session_store()
+        lease.truncate(nbytes)
+        return lease
+
     def close(self) -> Coro[None]:
         if self._state == 4:
             return
@@ -255,6 +425,7 @@ class TLSListener(_Stream):
         'transport',
         '_ssl',
         '_compat_https',
+        '_handshake_pool',
     ]
 
     def __init__(
@@ -263,20 +434,45 @@ class TLSListener(_Stream):
         ssl_context: _stdlib_ssl.SSLContext,
         *,
         https_compatible: bool = False,
+        handshake_pool: TLSHandshakePool | None = None,
     ) -> None:
         self.transport = transport
         self._ssl = ssl_context
         self._compat_https = https_compatible
+        self._handshake_pool = handshake_pool
+
+    def set_ssl_context(self, ssl_context: _stdlib_ssl.SSLContext) -> None:
+        #: used for the connections accepted from now on.
+        #  NOTE: OpenSSL keeps session ticket keys within the context, so this is a hard swap rather than
+        #        a rotation: there's no grace period, and tickets issued with the previous context can't be
+        #        resumed anymore, with clients falling back to a full handshake once.
+        self._ssl = ssl_context
+
+    def _accept_pending(self) -> Coro[TLSStream]:
+        #: takes a handshake slot and accepts a connection, the handshake is left to `_handshake_pending`
+        yield self._handshake_pool._acquire()
+        try:
+            stream = yield self.transport.accept()
+        except BaseException:
+            self._handshake_pool._release()
+            raise
+        return TLSStream(stream, self._ssl, server_side=True, https_compatible=self._compat_https)
+
+    def _handshake_pending(self, stream: TLSStream) -> Coro[None]:
+        try:
+            yield stream._handshake(self._handshake_pool)
+        finally:
+            self._handshake_pool._release()
 
     def accept(self) -> Coro[TLSStream]:
-        stream = yield self.transport.accept()
-        ret = TLSStream(
-            stream,
-            self._ssl,
-            server_side=True,
-            https_compatible=self._compat_https,
-        )
-        yield ret.handshake()
+        if self._handshake_pool is None:
+            stream = yield self.transport.accept()
+            ret = TLSStream(stream, self._ssl, server_side=True, https_compatible=self._compat_https)
+            yield ret.handshake()
+            return ret
+
+        ret = yield self._accept_pending()
+        yield self._handshake_pending(ret)
         return ret
 
     def close(self) -> None:
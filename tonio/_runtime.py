@@ -1,4 +1,6 @@
+import math
 import multiprocessing
+import os
 import socket
 
 from ._colored._events import Event as EventAw
@@ -137,20 +139,51 @@ class Runtime(_Runtime):
         self._stopping = True
 
 
+def _check_cpus(name: str, cpus: list[int] | None) -> list[int]:
+    if not cpus:
+        return []
+    available = os.sched_getaffinity(0) if hasattr(os, 'sched_getaffinity') else range(os.cpu_count() or 1)
+    for cpu in cpus:
+        if not isinstance(cpu, int) or cpu not in available:
+            raise ValueError(f'{name} contains an unavailable CPU: {cpu!r}')
+    return list(cpus)
+
+
 def new(
     context: bool = False,
     signals: list[int] | None = None,
     threads: int | None = None,
     blocking_threadpool_size: int = 128,
     blocking_threadpool_idle_ttl: int = 30,
+    timer_resolution: float | None = None,
+    steal_batch: int = 32,
+    coop_budget: int = 128,
+    io_drivers: int = 0,
+    worker_spin: int = 0,
+    min_threads: int | None = None,
+    threads_idle_ttl: int = 30,
+    worker_cpus: list[int] | None = None,
+    poll_cpus: list[int] | None = None,
 ) -> Runtime:
+    if timer_resolution is not None and not (math.isfinite(timer_resolution) and timer_resolution > 0):
+        raise ValueError(f'timer_resolution should be a positive number of seconds, got {timer_resolution!r}')
     threads = threads or multiprocessing.cpu_count()
+    min_threads = threads if min_threads is None else max(1, min(min_threads, threads))
     runtime = Runtime(
         threads=threads,
+        threads_min=min_threads,
+        threads_timeout=threads_idle_ttl,
         threads_blocking=blocking_threadpool_size,
         threads_blocking_timeout=blocking_threadpool_idle_ttl,
         context=context,
         signals=signals or [],
+        timer_resolution=max(1, round(timer_resolution * 1_000_000)) if timer_resolution else 1,
+        steal_batch=steal_batch,
+        coop_budget=coop_budget,
+        io_drivers=io_drivers,
+        worker_spin=worker_spin,
+        worker_cpus=_check_cpus('worker_cpus', worker_cpus),
+        poll_cpus=_check_cpus('poll_cpus', poll_cpus),
     )
     _set_runtime(runtime)
     return runtime
@@ -163,6 +196,15 @@ def run(
     threads: int | None = None,
     blocking_threadpool_size: int = 128,
     blocking_threadpool_idle_ttl: int = 30,
+    timer_resolution: float | None = None,
+    steal_batch: int = 32,
+    coop_budget: int = 128,
+    io_drivers: int = 0,
+    worker_spin: int = 0,
+    min_threads: int | None = None,
+    threads_idle_ttl: int = 30,
+    worker_cpus: list[int] | None = None,
+    poll_cpus: list[int] | None = None,
 ):
     runtime = new(
         context=context,
@@ -170,5 +212,14 @@ def run(
         threads=threads,
         blocking_threadpool_size=blocking_threadpool_size,
         blocking_threadpool_idle_ttl=blocking_threadpool_idle_ttl,
+        timer_resolution=timer_resolution,
+        steal_batch=steal_batch,
+        coop_budget=coop_budget,
+        io_drivers=io_drivers,
+        worker_spin=worker_spin,
+        min_threads=min_threads,
+        threads_idle_ttl=threads_idle_ttl,
+        worker_cpus=worker_cpus,
+        poll_cpus=poll_cpus,
     )
     return runtime.run_until_complete(coro)
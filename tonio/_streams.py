@@ -1,6 +1,10 @@
 from abc import ABC, abstractmethod
 from types import TracebackType
 
+from ._ctl import spawn
+from ._sync import Lock
+from ._types import Coro
+
 
 class _Stream(ABC):
     def __enter__(self):
@@ -16,3 +20,199 @@ class _Stream(ABC):
 
     @abstractmethod
     def close(self): ...
+
+
+class BufferedReceiveStream(_Stream):
+    __slots__ = ['transport', '_buf', '_pos', '_chunk_size']
+
+    def __init__(self, transport: _Stream, chunk_size: int = 65536):
+        self.transport = transport
+        #: consumed data is tracked by `_pos`, and dropped lazily when the buffer needs to grow
+        self._buf = bytearray()
+        self._pos = 0
+        self._chunk_size = chunk_size
+
+    @property
+    def buffered(self) -> int:
+        return len(self._buf) - self._pos
+
+    def _consume(self, size: int) -> bytes:
+        end = self._pos + size
+        # NOTE: the view should be released before the buffer gets resized
+        with memoryview(self._buf) as view:
+            ret = view[self._pos : end].tobytes()
+        if end == len(self._buf):
+            self._buf.clear()
+            self._pos = 0
+        else:
+            self._pos = end
+        return ret
+
+    def _append(self, data: bytes) -> None:
+        if self._pos and self._pos >= len(self._buf) // 2:
+            del self._buf[: self._pos]
+            self._pos = 0
+        self._buf += data
+
+    def _fill(self) -> Coro[bool]:
+        data = yield self.transport.receive_some(self._chunk_size)
+        if not data:
+            return False
+        self._append(data)
+        return True
+
+    def receive_some(self, max_bytes: int | None = None) -> Coro[bytes]:
+        if not self.buffered:
+            ret = yield self.transport.receive_some(max_bytes)
+            return ret
+        return self._consume(min(max_bytes or self.buffered, self.buffered))
+
+    def receive_exactly(self, size: int) -> Coro[bytes]:
+        while self.buffered < size:
+            if not (yield self._fill()):
+                raise EOFError(f'stream ended after {self.buffered} of {size} bytes')
+        return self._consume(size)
+
+    def _receive_until(self, delimiter: bytes, max_size: int, partial_on_eof: bool) -> Coro[bytes]:
+        searched = 0
+        while (idx := self._buf.find(delimiter, self._pos + searched)) < 0:
+            if self.buffered >= max_size:
+                raise ValueError(f'delimiter not found within {max_size} bytes')
+            #: on the next round, only scan the new data (and a possible delimiter prefix)
+            searched = max(0, self.buffered - len(delimiter) + 1)
+            if not (yield self._fill()):
+                if partial_on_eof:
+                    return self._consume(self.buffered)
+                raise EOFError(f'stream ended before the delimiter, after {self.buffered} bytes')
+        size = idx + len(delimiter) - self._pos
+        if size > max_size:
+            raise ValueError(f'delimiter not found within {max_size} bytes')
+        return self._consume(size)
+
+    def receive_until(self, delimiter: bytes, max_size: int = 65536) -> Coro[bytes]:
+        if not delimiter:
+            raise ValueError('delimiter should not be empty')
+        return self._receive_until(delimiter, max_size, False)
+
+    def readline(self, max_size: int = 65536) -> Coro[bytes]:
+        return self._receive_until(b'\n', max_size, True)
+
+    def send_all(self, data: bytes | bytearray | memoryview) -> Coro[None]:
+        return self.transport.send_all(data)
+
+    def close(self):
+        self.transport.close()
+
+
+class BufferedSendStream(_Stream):
+    __slots__ = [
+        'transport',
+        '_chunks',
+        '_size',
+        '_max_size',
+        '_flush_on_tick',
+        '_flush_scheduled',
+        '_flush_exc',
+        '_sending',
+        '_closed',
+        '_lock',
+    ]
+
+    def __init__(self, transport: _Stream, max_size: int = 65536, flush_on_tick: bool = True):
+        self.transport = transport
+        self._chunks = []
+        self._size = 0
+        self._max_size = max_size
+        self._flush_on_tick = flush_on_tick
+        self._flush_scheduled = False
+        self._flush_exc = None
+        self._sending = False
+        self._closed = False
+        self._lock = Lock()
+
+    @property
+    def buffered(self) -> int:
+        return self._size
+
+    def _buffer(self, data: bytes | bytearray | memoryview) -> bool:
+        self._raise_flush_exc()
+        # NOTE: we need to copy mutable buffers, as callers are free to reuse them once we return
+        data = data if isinstance(data, bytes) else bytes(data)
+        if not data:
+            return False
+        self._chunks.append(data)
+        self._size += len(data)
+        if self._size >= self._max_size:
+            return True
+        if self._flush_on_tick and not self._flush_scheduled:
+            self._flush_scheduled = True
+            self._schedule_flush()
+        return False
+
+    def _schedule_flush(self):
+        #: a task spawned now runs once the current one suspends, at the end of the current tick
+        spawn.without_tracking(self._flush_deferred())
+
+    def _take(self) -> list[bytes]:
+        chunks, self._chunks, self._size = self._chunks, [], 0
+        return chunks
+
+    def _raise_flush_exc(self):
+        if (exc := self._flush_exc) is not None:
+            self._flush_exc = None
+            raise exc
+
+    @property
+    def _pending(self) -> bool:
+        return bool(self._chunks) or self._flush_scheduled or self._sending or self._flush_exc is not None
+
+    def _send(self, chunks: list[bytes]) -> Coro[None]:
+        if len(chunks) > 1 and hasattr(self.transport, 'send_all_many'):
+            yield self.transport.send_all_many(chunks)
+        else:
+            yield self.transport.send_all(b''.join(chunks))
+
+    def send_all(self, data: bytes | bytearray | memoryview) -> Coro[None]:
+        if self._buffer(data):
+            yield self.flush()
+
+    def flush(self) -> Coro[None]:
+        with (yield self._lock()):
+            if self._chunks:
+                self._sending = True
+                try:
+                    yield self._send(self._take())
+                finally:
+                    self._sending = False
+
+    def _flush_deferred(self) -> Coro[None]:
+        self._flush_scheduled = False
+        try:
+            yield self.flush()
+        except Exception as exc:
+            #: re-raised on the next write
+            self._flush_exc = exc
+
+    def receive_some(self, max_bytes: int | None = None) -> Coro[bytes]:
+        return self.transport.receive_some(max_bytes)
+
+    def close(self) -> Coro[None]:
+        #: buffered data gets sent before closing the transport, pending flush errors are raised
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            yield self.flush()
+            self._raise_flush_exc()
+        finally:
+            self.transport.close()
+
+    def __exit__(self, *args, **kwargs) -> None:
+        if self._closed:
+            return
+
+        if self._pending:
+            raise RuntimeError('BufferedSendStream with pending data needs to be manually closed')
+
+        self._closed = True
+        self.transport.close()
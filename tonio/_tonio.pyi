@@ -1,3 +1,4 @@
+from os import PathLike
 from socket import SocketType as _SocketType
 from typing import Any, TypeVar
 
@@ -14,9 +15,24 @@ class Runtime:
     _ssock_r: Any
     _ssock_w: Any
     _stopping: bool
+    _timers_pending: int
 
     def __init__(
-        self, threads: int, threads_blocking: int, threads_blocking_timeout: int, context: bool, signals: list[int]
+        self,
+        threads: int,
+        threads_min: int,
+        threads_timeout: int,
+        threads_blocking: int,
+        threads_blocking_timeout: int,
+        context: bool,
+        signals: list[int],
+        timer_resolution: int,
+        steal_batch: int,
+        coop_budget: int,
+        io_drivers: int,
+        worker_spin: int,
+        worker_cpus: list[int],
+        poll_cpus: list[int],
     ): ...
     def _run(self): ...
     def _spawn_pygen(self, coro): ...
@@ -60,6 +76,10 @@ class PyAsyncGenScope:
 class BlockingTaskCtl:
     def abort(self): ...
 
+class BlockingExecutor:
+    def __init__(self, max_threads: int, idle_timeout: int = 30): ...
+    def _spawn(self, f, *args, **kwargs) -> tuple[BlockingTaskCtl, Event, Result]: ...
+
 class Lock:
     def acquire(self) -> None | Event: ...
     def try_acquire(self): ...
@@ -146,6 +166,21 @@ class ProcFd:
     def _io_arm_r(self) -> Waiter | None: ...
     def _io_close(self): ...
 
+class BufferPool:
+    slab_size: int
+
+    def __init__(self, slab_size: int = 65536, max_free: int = 256): ...
+    def acquire(self) -> BufferLease: ...
+
+class BufferLease:
+    def __buffer__(self, flags: int, /) -> memoryview: ...
+    def __release_buffer__(self, buffer: memoryview, /): ...
+    def __len__(self) -> int: ...
+    def __enter__(self) -> BufferLease: ...
+    def __exit__(self, exc_type, exc_value, exc_tb): ...
+    def truncate(self, nbytes: int): ...
+    def release(self): ...
+
 class Socket:
     _sock: _SocketType
 
@@ -157,6 +192,16 @@ class Socket:
     def _io_clear_r(self): ...
     def _io_clear_w(self): ...
     def _io_close(self): ...
+    def _recv(self, bufsize: int, flags: int = 0) -> bytes | Waiter: ...
+    def _recv_into(self, buffer: Any, nbytes: int = 0, flags: int = 0) -> int | Waiter: ...
+    def _recv_pooled(self, pool: BufferPool, flags: int = 0) -> BufferLease | Waiter: ...
+    def _send(self, data: Any, flags: int = 0) -> int | Waiter: ...
+    def _sendv(self, buffers: Any, index: int = 0, offset: int = 0) -> int | Waiter: ...
+    def _sendfile(self, fd: int, offset: int, count: int) -> int | Waiter: ...
+    def _recv_many(self, max_msgs: int, bufsize: int) -> list[tuple[bytes, Any]] | Waiter: ...
+    def _send_many(self, msgs: Any, offset: int = 0) -> int | Waiter: ...
+    def _accept_many(self, cls: type, max_n: int, stream_opts: bool = False) -> list[tuple[Any, Any]] | Waiter: ...
+    def _attach_reuseport_cbpf(self, group_size: int): ...
 
 class TLSStream:
     _state: int
@@ -167,5 +212,33 @@ class TLSStream:
     def _set_closed(self): ...
     def _check_ready(self): ...
 
+class RustlsConfig:
+    server_side: bool
+
+    @staticmethod
+    def server(
+        certfile: str | PathLike,
+        keyfile: str | PathLike | None = None,
+        alpn_protocols: list[str] | None = None,
+        session_tickets: bool = False,
+    ) -> RustlsConfig: ...
+    @staticmethod
+    def client(
+        cafile: str | PathLike | None = None,
+        alpn_protocols: list[str] | None = None,
+        session_cache_size: int = 256,
+    ) -> RustlsConfig: ...
+
+class RustlsConnection:
+    session_reused: bool
+
+    def __init__(self, config: RustlsConfig, socket: Socket, server_hostname: str | None = None): ...
+    def _handshake(self) -> Waiter | None: ...
+    def _recv(self, max_bytes: int, ragged_eof: bool = False) -> bytes | Waiter: ...
+    def _send(self, data: Any) -> int | Waiter: ...
+    def _flush(self) -> Waiter | None: ...
+    def _close_notify(self): ...
+    def selected_alpn_protocol(self) -> str | None: ...
+
 def get_runtime() -> Runtime: ...
 def set_runtime(runtime: Runtime): ...
@@ -1 +1,6 @@
+from .._colored._streams import (
+    BufferedReceiveStream as BufferedReceiveStream,
+    BufferedSendStream as BufferedSendStream,
+)
 from .._io import register as register
+from .._tonio import BufferLease as BufferLease, BufferPool as BufferPool
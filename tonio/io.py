@@ -1 +1,3 @@
 from ._io import register as register
+from ._streams import BufferedReceiveStream as BufferedReceiveStream, BufferedSendStream as BufferedSendStream
+from ._tonio import BufferLease as BufferLease, BufferPool as BufferPool
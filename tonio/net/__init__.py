@@ -1,11 +1,17 @@
 from .._net._hilvl import (
     open_tcp_listeners as open_tcp_listeners,
     open_tcp_stream as open_tcp_stream,
+    open_udp_endpoint as open_udp_endpoint,
     open_unix_listener as open_unix_listener,
     open_unix_socket as open_unix_socket,
     serve_listeners as serve_listeners,
     serve_tcp as serve_tcp,
+    serve_udp as serve_udp,
     serve_unix as serve_unix,
 )
-from .._net._streams import SocketListener as SocketListener, SocketStream as SocketStream
+from .._net._streams import (
+    DatagramEndpoint as DatagramEndpoint,
+    SocketListener as SocketListener,
+    SocketStream as SocketStream,
+)
 from . import socket as socket, tls as tls
@@ -3,4 +3,14 @@ from .._net._hilvl import (
     open_tls_over_tcp_stream as open_tls_over_tcp_stream,
     serve_tls_over_tcp as serve_tls_over_tcp,
 )
-from .._net._tls import TLSListener as TLSListener, TLSStream as TLSStream
+from .._net._rustls import (
+    RustlsConfig as RustlsConfig,
+    RustlsListener as RustlsListener,
+    RustlsStream as RustlsStream,
+)
+from .._net._tls import (
+    TLSHandshakePool as TLSHandshakePool,
+    TLSListener as TLSListener,
+    TLSSessionCache as TLSSessionCache,
+    TLSStream as TLSStream,
+)